@@ -1,10 +1,19 @@
-from flask import Flask, request
+from flask import Flask, g
 from flask_restx import Api, Resource, fields
+from travel_common.config import configure_proxies, swagger_doc_path
+from travel_common.health import register_health, warm_up_auth, warm_up_request, warm_up_unless_lazy
+from travel_common.lifecycle import register_lifecycle
+from travel_common.request_validation import configure_body_limits, validate_body
+from travel_common.serialization import register_json_representation
 from services.user_service import UserService
-from services.auth_service import AuthService
+from utils.authorization import current_claims, require_auth
 from services.destination_service import DestinationService
 
 app = Flask(__name__)
+# Client addresses from X-Forwarded-For when behind the gateway (TRUSTED_PROXIES)
+configure_proxies(app)
+# Body size limits (MAX_CONTENT_LENGTH, MAX_JSON_BODY_BYTES) checked before parsing
+configure_body_limits(app)
 
 # Initialize Flask-RESTX API with Swagger UI enabled
 api = Api(
@@ -12,7 +21,7 @@ api = Api(
     version="1.0",
     title="Authentication Service",
     description="Travel API Microservices",
-    doc="/swagger",  # Custom Swagger UI endpoint
+    doc=swagger_doc_path("/swagger"),  # Custom Swagger UI endpoint (TRAVEL_SWAGGER_DOCS=0 disables)
     security='BearerAuth'  # Add security definitions
 )
 
@@ -26,6 +35,9 @@ api.authorizations = {
     }
 }
 
+# Encode responses with the fastest available JSON backend
+register_json_representation(api)
+
 # Initialize services
 user_service = UserService()
 destination_service = DestinationService()
@@ -81,22 +93,15 @@ destination_model = api.model(
 # User Profile Route
 @user_ns.route("/profile")
 class UserProfile(Resource):
+    @require_auth(
+        missing=("Authorization token required (format :<token>)", 401),
+        invalid=("Invalid or expired token", 401),
+    )
     def get(self):
         """Get user profile"""
-        token = request.headers.get("Authorization")
-        if not token:
-            return {"error": "Authorization token required (format :<token>)"}, 401
-
-        # token = token.split(" ")[1]  # Extract the token part
-        # print(token)
         try:
-            # Verify the token
-            payload = AuthService.verify_token(token)
-            if not payload:
-                return {"error": "Invalid or expired token"}, 401
-
             # Retrieve user profile using the email from the token
-            email = payload.get("email")
+            email = current_claims().get("email")
             print(email)
             if not email:
                 return {"error": "Email missing in token payload"}, 401
@@ -116,26 +121,16 @@ class UserProfile(Resource):
 @destination_ns.route("")
 class DestinationList(Resource):
     @api.expect(destination_model)
+    @require_auth("destinations:write", missing=("Token required", 401))
+    @validate_body(destination_model)
     def post(self):
         """Add a new destination (Admin only)"""
-        auth_header = request.headers.get("Authorization")
-        # If the header is missing or doesn't start with 'Bearer', return an error
-        if not auth_header:
-            return {"error": "Token required"}, 401
-        # Extract the token from the Authorization header (after 'Bearer ')
-        token = auth_header
-        # print(token)
-
-        # Check if the admin access is valid
-        if not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
-
         try:
-            data = request.json
+            data = g.payload
             destination = destination_service.add_destination(
                 data["name"], data["description"], data["location"]
             )
-            return vars(destination), 201
+            return destination.to_dict(), 201
         except ValueError as e:
             return {"error": str(e)}, 400
 
@@ -143,12 +138,9 @@ class DestinationList(Resource):
 # Destination Resource Route (For deleting destinations)
 @destination_ns.route("/<int:dest_id>")
 class DestinationResource(Resource):
+    @require_auth("destinations:write", forbidden=("Admin access required..", 403))
     def delete(self, dest_id):
         """Delete a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if not AuthService.check_admin_access(token):
-            return {"error": "Admin access required.."}, 403
-
         try:
             destination_service.delete_destination(dest_id)
             return {"message": "Destination deleted successfully"}, 200
@@ -156,40 +148,54 @@ class DestinationResource(Resource):
             return {"error": str(e)}, 404
 
     @api.expect(destination_model)
+    @require_auth("destinations:write")
+    @validate_body(destination_model)
     def put(self, dest_id):
         """Replace a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if not token or not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
-
-        data = request.json
+        data = g.payload
         try:
             updated_destination = destination_service.update_destination(
                 dest_id, data["name"], data["description"], data["location"]
             )
-            return vars(updated_destination), 200
+            return updated_destination.to_dict(), 200
         except ValueError as e:
             return {"error": str(e)}, 404
 
     @api.expect(destination_model, validate=False)
+    @require_auth("destinations:write")
+    @validate_body(destination_model, partial=True)
     def patch(self, dest_id):
         """Partially update a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if not token or not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
-
-        data = request.json
+        data = g.payload
         try:
             updated_destination = destination_service.partial_update_destination(
                 dest_id, data
             )
-            return vars(updated_destination), 200
+            return updated_destination.to_dict(), 200
         except ValueError as e:
             return {"error": str(e)}, 404
 
 
+# /healthz and /readyz; ready once the service is warmed up
+readiness = register_health(app)
+readiness.add_step("stores", lambda: (len(user_service.users), len(destination_service.destinations)))
+# The email indexes are built from the store keys; destination indexes decode every record
+readiness.add_step("indexes", lambda: user_service.indexes)
+readiness.add_step("destination_indexes", warm_up_unless_lazy(destination_service, lambda: destination_service.indexes))
+readiness.add_step("profile_cache", user_service.prime_profile_cache)
+readiness.add_step("auth", warm_up_auth)
+readiness.add_step("request", warm_up_request(app, "/swagger.json"))
+
+# On SIGTERM: drain requests, then flush both stores
+lifecycle = register_lifecycle(app)
+lifecycle.add_flush("users", user_service.flush)
+lifecycle.add_flush("destinations", destination_service.flush)
+
+
 if __name__ == "__main__":
     # Seed some initial data for testing
     destination_service.add_destination('Paris', 'Beautiful city of lights', 'France')
     destination_service.add_destination('Tokyo', 'Vibrant metropolitan city', 'Japan')
+    readiness.start()
+    lifecycle.install()
     app.run(debug=True, port=5001)
@@ -28,7 +28,7 @@ def test_login_user(user_service):
 
 def test_invalid_password(user_service):
     user_service.register_user("John Doe", "john@example.com", "Password123")
-    with pytest.raises(ValueError, match="Invalid password"):
+    with pytest.raises(ValueError, match="Invalid email or password"):
         user_service.login_user("john@example.com", "WrongPassword")
 
 
@@ -0,0 +1,8 @@
+# utils/authorization.py
+from travel_common.authorization import (  # noqa: F401
+    POLICY,
+    compile_policy,
+    current_claims,
+    is_allowed,
+    require_auth,
+)
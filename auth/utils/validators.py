@@ -1,22 +1,9 @@
 # utils/validators.py
-import re
-
-
-def validate_email(email):
-    """Validate email format."""
-    email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_regex, email) is not None
-
-
-def validate_password(password):
-    """Validate password strength."""
-    # At least 8 characters, one uppercase, one lowercase, one number
-    if len(password) < 8:
-        return False
-    if not re.search(r'[A-Z]', password):
-        return False
-    if not re.search(r'[a-z]', password):
-        return False
-    if not re.search(r'\d', password):
-        return False
-    return True
\ No newline at end of file
+from travel_common.validators import (  # noqa: F401
+    DEFAULT_PASSWORD_POLICY,
+    PasswordPolicy,
+    validate_email,
+    validate_emails,
+    validate_password,
+    validate_passwords,
+)
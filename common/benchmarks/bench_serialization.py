@@ -0,0 +1,65 @@
+"""
+Compare the JSON backends on a synthetic users store.
+
+Run from the common/ directory:
+    python benchmarks/bench_serialization.py [record_count]
+"""
+import importlib.util
+import json
+import sys
+import timeit
+
+from travel_common import serialization
+from travel_common.models import User
+
+
+def build_users(count):
+    return {
+        f"user{i}@example.com": User(
+            f"User {i}", f"user{i}@example.com",
+            "$2b$12$bvM/4z6fbmMKt8jtS8qs5uxFIfw3a3QEx5hky3cbQ8Nw3zHIpQP/i",
+            "admin" if i % 50 == 0 else "user",
+        )
+        for i in range(count)
+    }
+
+
+def legacy_save(users):
+    return json.dumps({email: vars_like(user) for email, user in users.items()}, indent=4)
+
+
+def vars_like(user):
+    return {"name": user.name, "email": user.email, "password": user.password, "role": user.role}
+
+
+def legacy_load(data):
+    return {email: User(**details) for email, details in json.loads(data).items()}
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    users = build_users(count)
+    legacy_data = legacy_save(users)
+
+    print(f"{count} users")
+    print(f"{'backend':<22}{'save (s)':>10}{'load (s)':>10}")
+    print(f"{'legacy json indent=4':<22}{best_of(lambda: legacy_save(users)):>10.3f}"
+          f"{best_of(lambda: legacy_load(legacy_data)):>10.3f}")
+
+    for name in ("json", "msgspec", "orjson"):
+        if name != "json" and importlib.util.find_spec(name) is None:
+            continue
+        serialization.set_backend(name)
+        data = serialization.dumps({e: u.to_dict() for e, u in users.items()}, pretty=True)
+        save = best_of(lambda: serialization.dumps(
+            {e: u.to_dict() for e, u in users.items()}, pretty=True))
+        load = best_of(lambda: serialization.decode_mapping(data, User))
+        print(f"{name:<22}{save:>10.3f}{load:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare cold-start load time of a JSON store and a binary snapshot.
+
+Run from the common/ directory:
+    python benchmarks/bench_snapshot.py [record_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from travel_common import serialization, snapshot
+from travel_common.models import Destination
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    destinations = {
+        i: Destination(i, f"Destination {i}", "A place worth visiting " * 4, f"Country {i % 200}")
+        for i in range(1, count + 1)
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "destinations.json")
+        snap_path = os.path.join(directory, "destinations.snap")
+        with open(json_path, "wb") as file:
+            file.write(serialization.dumps(
+                {key: value.to_dict() for key, value in destinations.items()}, pretty=True))
+        snapshot.save_snapshot(snap_path, destinations)
+
+        start = time.perf_counter()
+        with open(json_path, "rb") as file:
+            serialization.decode_mapping(file.read(), Destination, key_type=int)
+        json_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records = snapshot.load_snapshot(snap_path, Destination)
+        snapshot_open = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records[count // 2]
+        first_read = time.perf_counter() - start
+
+        print(f"{count} destinations ({serialization.backend} backend)")
+        print(f"json size     {os.path.getsize(json_path) / 1e6:8.1f} MB")
+        print(f"snapshot size {os.path.getsize(snap_path) / 1e6:8.1f} MB")
+        print(f"json load     {json_load:8.3f} s")
+        print(f"snapshot open {snapshot_open:8.3f} s (checksum verified)")
+        print(f"first record  {first_read * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the validators with the original per-call regex implementation.
+
+Run from the common/ directory:
+    python benchmarks/bench_validators.py [row_count]
+"""
+import re
+import sys
+import timeit
+
+from travel_common.validators import (
+    validate_email, validate_emails, validate_password, validate_passwords,
+)
+
+
+def legacy_validate_email(email):
+    email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(email_regex, email) is not None
+
+
+def legacy_validate_password(password):
+    if len(password) < 8:
+        return False
+    if not re.search(r'[A-Z]', password):
+        return False
+    if not re.search(r'[a-z]', password):
+        return False
+    if not re.search(r'\d', password):
+        return False
+    return True
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    emails = (["john@example.com", "invalid-email", "a.b+c@sub.domain.org", "x@y.z"]
+              * (rows // 4))
+    passwords = (["Password123", "weak", "alllowercase1", "CorrectHorse9Battery"]
+                 * (rows // 4))
+
+    print(f"{len(emails)} rows")
+    print(f"{'check':<28}{'legacy (s)':>12}{'new (s)':>10}{'batch (s)':>11}")
+    print(f"{'validate_email':<28}"
+          f"{best_of(lambda: [legacy_validate_email(e) for e in emails]):>12.3f}"
+          f"{best_of(lambda: [validate_email(e) for e in emails]):>10.3f}"
+          f"{best_of(lambda: validate_emails(emails)):>11.3f}")
+    print(f"{'validate_password':<28}"
+          f"{best_of(lambda: [legacy_validate_password(p) for p in passwords]):>12.3f}"
+          f"{best_of(lambda: [validate_password(p) for p in passwords]):>10.3f}"
+          f"{best_of(lambda: validate_passwords(passwords)):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import pytest
+from travel_common.auth_service import AuthService
+from travel_common.models.user import User
+
+
+@pytest.mark.parametrize("user", [
+    {"email": "dict@example.com", "role": "user"},
+    User("Object User", "dict@example.com", "hashed", "user"),
+])
+def test_generate_token_accepts_dicts_and_objects(user):
+    payload = AuthService.verify_token(AuthService.generate_token(user))
+    assert payload["email"] == "dict@example.com"
+    assert payload["role"] == "user"
+
+
+def test_verify_invalid_token():
+    assert AuthService.verify_token("not-a-token") is None
+
+
+def test_verify_password_accepts_str_and_bytes():
+    hashed = AuthService.hash_password("Password123")
+    assert AuthService.verify_password("Password123", hashed)
+    assert AuthService.verify_password("Password123", hashed.decode("utf-8"))
+    assert not AuthService.verify_password("WrongPass123", hashed)
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("admin", True),
+    ("Admin", True),
+    ("user", False),
+])
+def test_check_admin_access(role, expected):
+    token = AuthService.generate_token({"email": "a@example.com", "role": role})
+    assert AuthService.check_admin_access(token) is expected
@@ -0,0 +1,51 @@
+from travel_common.cache import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_values_are_cached_until_they_expire():
+    clock, loads = FakeClock(), []
+    cache = TTLCache(ttl=10, negative_ttl=1, clock=clock)
+
+    def loader(key):
+        loads.append(key)
+        return key.upper() if key != "gone" else MISSING
+
+    assert cache.get("a", loader) == "A"
+    assert cache.get("a", loader) == "A"
+    assert cache.get("gone", loader) is MISSING
+    assert cache.get("gone", loader) is MISSING
+    assert loads == ["a", "gone"]
+
+    clock.now = 5  # the miss expired, the value did not
+    cache.get("a", loader), cache.get("gone", loader)
+    assert loads == ["a", "gone", "gone"]
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 3}
+
+
+def test_invalidate_and_eviction():
+    cache = TTLCache(ttl=10, max_entries=2, clock=FakeClock())
+    cache.get("a", str.upper), cache.get("b", str.upper), cache.get("c", str.upper)
+    assert cache.stats()["entries"] == 2
+
+    values = iter(["old", "new"])
+    cache.get("x", lambda key: next(values))
+    cache.invalidate("x")
+    assert cache.get("x", lambda key: next(values)) == "new"
+
+
+def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = TTLCache(ttl=10, clock=FakeClock())
+
+    def stale_loader(key):
+        cache.invalidate(key)  # a writer changed the record while it was being loaded
+        return "stale"
+
+    assert cache.get("a", stale_loader) == "stale"
+    assert cache.get("a", lambda key: "fresh") == "fresh"
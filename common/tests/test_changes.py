@@ -0,0 +1,45 @@
+import threading
+import pytest
+from travel_common.changes import CREATED, DELETED, ChangeLog
+
+
+def test_events_after_a_sequence_number():
+    log = ChangeLog(capacity=8)
+    for dest_id in (1, 2, 3):
+        log.publish(CREATED, dest_id, {"id": dest_id})
+
+    events, reset = log.since(1)
+    assert not reset
+    assert [(event.seq, event.id) for event in events] == [(2, 2), (3, 3)]
+    assert log.since(3) == ([], False)
+    assert [event.seq for event in log.since(0, limit=2)[0]] == [1, 2]
+
+
+def test_overwritten_events_ask_for_a_reset():
+    log = ChangeLog(capacity=3)
+    for dest_id in range(1, 6):
+        log.publish(DELETED, dest_id)
+
+    assert log.oldest_seq == 3
+    assert log.since(1) == ([], True)
+    assert [event.seq for event in log.since(2)[0]] == [3, 4, 5]
+    # A client holding a seq from before a restart is also told to reset
+    assert log.since(99) == ([], True)
+
+
+def test_wait_returns_as_soon_as_an_event_is_published():
+    log = ChangeLog()
+    timer = threading.Timer(0.05, log.publish, args=(CREATED, 1))
+    timer.start()
+    events, reset = log.wait(0, timeout=5)
+    timer.join()
+    assert [event.id for event in events] == [1]
+
+
+def test_wait_times_out_without_events():
+    assert ChangeLog().wait(0, timeout=0.01) == ([], False)
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        ChangeLog(capacity=0)
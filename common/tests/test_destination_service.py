@@ -0,0 +1,306 @@
+import sys
+import threading
+import time
+import pytest
+from travel_common import snapshot
+from travel_common.destination_service import DestinationService, VersionConflictError
+from travel_common.geo import haversine_km
+from travel_common.indexes import DuplicateKeyError
+
+
+@pytest.fixture
+def destination_service(tmp_path):
+    return DestinationService(destinations_file=str(tmp_path / "destinations.json"))
+
+
+def test_service_is_a_singleton(destination_service):
+    assert DestinationService() is destination_service
+
+
+def test_add_persists_and_reloads(destination_service):
+    destination_service.add_destination("Paris", "City of Lights", "France")
+
+    reloaded = DestinationService(destinations_file=destination_service.destinations_file)
+    assert reloaded.destinations[1].name == "Paris"
+    assert reloaded.next_id == 2
+
+
+def test_update_missing_destination(destination_service):
+    with pytest.raises(ValueError, match="Destination not found"):
+        destination_service.update_destination(999, "Nowhere", "Missing", "None")
+
+
+def test_add_destinations_saves_once(destination_service, monkeypatch):
+    saves = []
+    monkeypatch.setattr(destination_service, "_save_destinations_to_file", lambda: saves.append(1))
+    created = destination_service.add_destinations([
+        {"name": "Paris", "description": "City of Lights", "location": "France"},
+        {"name": "Tokyo", "description": "Vibrant city", "location": "Japan"},
+    ])
+    assert [dest.id for dest in created] == [1, 2]
+    assert saves == [1]
+
+
+def test_edits_go_on_while_a_save_is_writing(destination_service, monkeypatch):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    write_atomic = snapshot.write_atomic
+    writing, release, writes = threading.Event(), threading.Event(), []
+
+    def slow_write(path, chunks):
+        if path != destination_service.versions_file:
+            writes.append(path)
+            writing.set()
+            release.wait(5)
+        write_atomic(path, chunks)
+
+    monkeypatch.setattr(snapshot, "write_atomic", slow_write)
+    first = threading.Thread(target=destination_service.partial_update_destination,
+                             args=(paris.id, {"description": "Lights"}))
+    first.start()
+    assert writing.wait(5)
+
+    # Edits are applied (and published) while the first save is still writing
+    start = destination_service.changes.last_seq
+    others = [threading.Thread(target=destination_service.add_destination, args=(f"City {n}", "", "Somewhere"))
+              for n in range(5)]
+    for thread in others:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while destination_service.changes.last_seq < start + 5:
+        assert time.monotonic() < deadline, "edits waited for the save"
+        time.sleep(0.01)
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    # The five queued edits shared one save, and none of them was lost
+    assert len(writes) == 2
+    reloaded = DestinationService(destinations_file=destination_service.destinations_file)
+    assert len(reloaded.destinations) == 6
+    assert reloaded.get_destination(paris.id).description == "Lights"
+
+
+def test_mutations_publish_change_events(destination_service):
+    start = destination_service.changes.last_seq
+    destination = destination_service.add_destination("Paris", "City of Lights", "France")
+    destination_service.partial_update_destination(destination.id, {"description": "Lights"})
+    destination_service.delete_destination(destination.id)
+
+    events, _ = destination_service.changes.since(start)
+    assert [(event.type, event.id) for event in events] == [
+        ("created", destination.id), ("updated", destination.id), ("deleted", destination.id),
+    ]
+    assert events[1].data["description"] == "Lights"
+    assert events[2].data is None
+
+
+def test_feed_order_matches_the_order_edits_were_applied(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    start = destination_service.changes.last_seq
+
+    def edit(worker):
+        for n in range(25):
+            destination_service.partial_update_destination(paris.id, {"description": f"{worker}-{n}"})
+
+    threads = [threading.Thread(target=edit, args=(worker,)) for worker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # A feed client replaying the events ends up with the stored state
+    events, _ = destination_service.changes.since(start)
+    assert len(events) == 150
+    assert events[-1].data == destination_service.get_destination(paris.id).to_dict()
+
+
+def test_changes_since_version(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    tokyo = destination_service.add_destination("Tokyo", "Vibrant city", "Japan")
+    version = destination_service.versions.version
+
+    tokyo = destination_service.partial_update_destination(tokyo.id, {"description": "Neon"})
+    destination_service.delete_destination(paris.id)
+    delta = destination_service.changes_since(version)
+    assert delta["changed"] == [tokyo]
+    assert delta["deleted"] == [paris.id]
+    assert delta["version"] == version + 2
+
+    # Versions survive a reload from disk
+    reloaded = DestinationService(destinations_file=destination_service.destinations_file)
+    assert reloaded.changes_since(version)["deleted"] == [paris.id]
+
+
+def test_catalogue_version_never_skips_a_concurrent_change(destination_service, monkeypatch):
+    destination_service.add_destination("Paris", "City of Lights", "France")
+    list_all = destination_service.get_all_destinations
+
+    def list_while_another_request_adds():
+        destinations = list_all()
+        destination_service.add_destination("Tokyo", "Vibrant city", "Japan")
+        return destinations
+
+    monkeypatch.setattr(destination_service, "get_all_destinations", list_while_another_request_adds)
+    destinations, version = destination_service.get_catalogue()
+    monkeypatch.undo()
+    assert [dest.name for dest in destinations] == ["Paris"]
+    assert [dest.name for dest in destination_service.changes_since(version)["changed"]] == ["Tokyo"]
+
+
+def test_get_destinations_by_id(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    assert destination_service.get_destination(paris.id) is paris
+    assert destination_service.get_destinations([paris.id, 42]) == ([paris], [42])
+    with pytest.raises(ValueError, match="Destination not found"):
+        destination_service.get_destination(42)
+
+
+def test_expected_version_is_checked(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    version = destination_service.versions.version_of(paris.id)
+    destination_service.partial_update_destination(paris.id, {"description": "Lights"}, expected_version=version)
+
+    with pytest.raises(VersionConflictError) as conflict:
+        destination_service.update_destination(paris.id, "Paris", "Old", "France", expected_version=version)
+    assert conflict.value.current_version == version + 1
+    assert destination_service.get_destination(paris.id).description == "Lights"
+
+
+def test_concurrent_conditional_updates_only_one_wins(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    version = destination_service.versions.version_of(paris.id)
+    results = []
+
+    def edit(description):
+        try:
+            destination_service.partial_update_destination(
+                paris.id, {"description": description}, expected_version=version
+            )
+            results.append(description)
+        except VersionConflictError:
+            results.append(None)
+
+    threads = [threading.Thread(target=edit, args=(f"Edit {n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [result for result in results if result is not None]
+    assert len(winners) == 1
+    assert destination_service.get_destination(paris.id).description == winners[0]
+
+
+def test_versioned_results_describe_the_edit_just_made(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    results = []
+
+    def edit(description):
+        results.append((description, destination_service.partial_update_destination(
+            paris.id, {"description": description}, versioned=True
+        )))
+
+    threads = [threading.Thread(target=edit, args=(f"Edit {n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each caller gets its own edit and version, never a later one
+    assert all(record["description"] == description for description, (record, _) in results)
+    assert len({version for _, (_, version) in results}) == 8
+    record, version = destination_service.get_destination(paris.id, versioned=True)
+    assert version == max(version for _, (_, version) in results)
+    assert record == next(r for _, (r, v) in results if v == version)
+    with pytest.raises(ValueError, match="Destination not found"):
+        destination_service.get_destination(42, versioned=True)
+
+
+def test_secondary_indexes_follow_mutations(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    lyon = destination_service.add_destination("Lyon", "Food", "france")
+    destination_service.add_destination("Tokyo", "Vibrant city", "Japan")
+
+    assert destination_service.find_by_location("FRANCE") == [paris, lyon]
+    lyon = destination_service.partial_update_destination(lyon.id, {"location": "Rhône", "name": "Lyons"})
+    destination_service.delete_destination(paris.id)
+    assert destination_service.find_by_location("France") == []
+    assert destination_service.find_by_location("rhône") == [lyon]
+    assert destination_service.find_by_name_prefix("ly") == [lyon]
+
+
+def test_unique_names(destination_service, monkeypatch):
+    monkeypatch.setattr(destination_service, "unique_names", True)
+    monkeypatch.setattr(destination_service, "_indexes", None)
+    paris = destination_service.add_destination("Paris", "City of Lights", "France")
+    tokyo = destination_service.add_destination("Tokyo", "Vibrant city", "Japan")
+
+    with pytest.raises(DuplicateKeyError):
+        destination_service.add_destination(" PARIS ", "Again", "France")
+    with pytest.raises(DuplicateKeyError):
+        destination_service.partial_update_destination(tokyo.id, {"name": "paris"})
+    with pytest.raises(DuplicateKeyError):
+        destination_service.add_destinations([
+            {"name": "Rome", "description": "", "location": "Italy"},
+            {"name": "rome", "description": "", "location": "Italy"},
+        ])
+    assert destination_service.find_by_name_prefix("rome") == []
+    # Renaming a destination to its own (normalized) name is fine
+    destination_service.update_destination(paris.id, "paris", "City of Lights", "France")
+
+
+def test_index_reads_while_destinations_change(destination_service, monkeypatch):
+    monkeypatch.setattr(destination_service, "_save_destinations_to_file", lambda: None)
+    for n in range(200):
+        destination_service.add_destination(f"City {n}", "", "Somewhere", n % 90, n % 180)
+    stop, errors = threading.Event(), []
+
+    def write():
+        n = 0
+        while not stop.is_set():
+            destination = destination_service.add_destination(f"City x{n}", "", "Somewhere", -(n % 90), -(n % 180))
+            destination_service.delete_destination(destination.id)
+            n += 1
+
+    def read():
+        try:
+            for _ in range(1000):
+                for dest, distance in destination_service.find_nearby(0, 0, 20_000):
+                    assert abs(haversine_km(0, 0, dest.latitude, dest.longitude) - distance) < 1e-6
+                destination_service.find_by_name_prefix("city", 50)
+        except Exception as error:
+            errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    writer = threading.Thread(target=write)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often, so reads overlap writes
+    try:
+        writer.start()
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_find_nearby(destination_service):
+    paris = destination_service.add_destination("Paris", "City of Lights", "France", 48.8566, 2.3522)
+    london = destination_service.add_destination("London", "Big Ben", "UK", 51.5074, -0.1278)
+    destination_service.add_destination("Nowhere", "No coordinates", "Unknown")
+
+    nearby = destination_service.find_nearby(48.86, 2.35, 500)
+    assert [dest for dest, _ in nearby] == [paris, london]
+    assert destination_service.find_nearby(48.86, 2.35, 500, limit=1)[0][0] is paris
+
+    london = destination_service.partial_update_destination(london.id, {"latitude": 48.85, "longitude": 2.34})
+    assert [dest for dest, _ in destination_service.find_nearby(48.86, 2.35, 5)] == [paris, london]
+    with pytest.raises(ValueError):
+        destination_service.partial_update_destination(paris.id, {"latitude": 100})
+
+    reloaded = DestinationService(destinations_file=destination_service.destinations_file)
+    assert reloaded.get_destination(paris.id).latitude == 48.8566
@@ -0,0 +1,156 @@
+import time
+
+import pytest
+from flask import Flask, request
+
+from travel_common.auth_service import AuthService
+from travel_common.authorization import (
+    FORWARDED_CLAIMS_HEADER, current_claims, require_auth, set_token_check, sign_claims,
+    verify_forwarded_claims,
+)
+from travel_common.gateway import create_gateway
+from travel_common.http_pool import ConnectionPool, UpstreamError
+from travel_common.stub_server import StubServer
+
+
+def make_service(name):
+    """Tiny stand-in for a service: echoes what it received."""
+    app = Flask(name)
+    app.received = []
+
+    @app.route("/<path:path>", methods=["GET", "POST"])
+    @require_auth(missing=("Token required", 401), invalid=("Invalid or expired token", 401))
+    def echo(path):
+        app.received.append(dict(request.headers))
+        return {"service": name, "path": request.path, "query": request.args.to_dict(),
+                "body": request.get_data(as_text=True), "email": current_claims()["email"]}
+
+    return app
+
+
+@pytest.fixture
+def services():
+    return {"users": make_service("users"), "auth": make_service("auth")}
+
+
+@pytest.fixture
+def gateway(services):
+    app = create_gateway([("/users", services["users"], False), ("/auth", services["auth"], True)])
+    return app.test_client()
+
+
+def token_for(email="john@example.com", role="user"):
+    return AuthService.generate_token({"email": email, "role": role})
+
+
+def test_routes_by_prefix_and_forwards_verified_claims(gateway, services, monkeypatch):
+    token = token_for()
+    response = gateway.post("/users/profile?x=1", data="hello", headers={"Authorization": token})
+    assert response.json == {"service": "users", "path": "/users/profile", "query": {"x": "1"},
+                             "body": "hello", "email": "john@example.com"}
+    forwarded = services["users"].received[-1][FORWARDED_CLAIMS_HEADER]
+    assert verify_forwarded_claims(forwarded, token)["email"] == "john@example.com"
+
+    # The service trusts the signed claims instead of decoding the token again
+    decoded = []
+    verify_token = AuthService.verify_token
+    monkeypatch.setattr(AuthService, "verify_token", staticmethod(lambda token: decoded.append(token)
+                                                                  or verify_token(token)))
+    assert gateway.get("/auth/profile", headers={"Authorization": token}).json["path"] == "/profile"
+    assert len(decoded) == 1
+
+
+def test_rejects_bad_tokens_at_the_edge(gateway, services):
+    assert gateway.get("/users/profile", headers={"Authorization": "garbage"}).status_code == 401
+    assert services["users"].received == []
+    assert gateway.get("/unknown").status_code == 404
+
+    # A client cannot smuggle in claims of its own
+    token = token_for()
+    forged = sign_claims({"email": "admin@example.com", "role": "admin"}, token, secret="guessed")
+    response = gateway.get("/users/profile", headers={
+        "Authorization": token, FORWARDED_CLAIMS_HEADER: forged})
+    assert response.json["email"] == "john@example.com"
+
+
+def test_revoked_tokens_are_rejected_for_every_service():
+    revoked = set()
+    users, destinations = make_service("users"), make_service("destinations")
+    set_token_check(users, lambda claims: claims["email"] not in revoked)
+    gateway = create_gateway([("/users", users, False), ("/destinations", destinations, False)]).test_client()
+    token = token_for("old@example.com")
+
+    assert gateway.post("/destinations/1", headers={"Authorization": token}).status_code == 200
+    revoked.add("old@example.com")
+    assert gateway.post("/destinations/1", headers={"Authorization": token}).status_code == 200  # cached
+    # A new gateway (or one past GATEWAY_TOKEN_CHECK_TTL) asks the users service again
+    gateway = create_gateway([("/users", users, False), ("/destinations", destinations, False)]).test_client()
+    assert gateway.post("/destinations/1", headers={"Authorization": token}).status_code == 401
+    assert len(destinations.received) == 2
+
+
+def test_token_check_fails_closed():
+    gateway = create_gateway([("/users", "http://127.0.0.1:9", False)]).test_client()
+    assert gateway.get("/users/profile", headers={"Authorization": token_for()}).status_code == 502
+
+
+def test_forwarded_claims_signature():
+    claims = {"email": "a@example.com", "exp": 2000}
+    value = sign_claims(claims, "token-a", now=1000)
+    assert verify_forwarded_claims(value, "token-a", now=1010) == claims
+    payload, _, signature = value.partition(".")
+    assert verify_forwarded_claims(payload + "x." + signature, "token-a", now=1010) is None
+    assert verify_forwarded_claims("not-a-header", "token-a", now=1010) is None
+
+    assert verify_forwarded_claims(value, "token-b", now=1010) is None  # bound to the token
+    assert verify_forwarded_claims(value, "", now=1010) is None
+    assert verify_forwarded_claims(value, "token-a", now=1000 + 31) is None  # stale header
+    late = sign_claims(claims, "token-a", now=2000)
+    assert verify_forwarded_claims(late, "token-a", now=2000) is None  # expired token
+
+
+def test_services_reject_replayed_claims_headers(services):
+    token = token_for(role="admin")
+    expired = sign_claims(dict(AuthService.verify_token(token), exp=time.time() - 3600), token,
+                          now=time.time() - 3600)
+    client = services["users"].test_client()
+    assert client.get("/users/profile", headers={
+        "Authorization": "garbage", FORWARDED_CLAIMS_HEADER: expired}).status_code == 401
+    assert client.get("/users/profile", headers={
+        "Authorization": token, FORWARDED_CLAIMS_HEADER: expired}).status_code == 401
+    fresh = sign_claims(AuthService.verify_token(token), token)
+    assert client.get("/users/profile", headers={
+        "Authorization": "garbage", FORWARDED_CLAIMS_HEADER: fresh}).status_code == 401
+    assert client.get("/users/profile", headers={
+        "Authorization": token, FORWARDED_CLAIMS_HEADER: fresh}).status_code == 200
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.add("GET", "/users/profile", lambda request: {
+            "path": request.path, "claims": request.headers.get(FORWARDED_CLAIMS_HEADER)})
+        stub.add("GET", "/users/stream", lambda request: (200, (f"chunk {n}\n".encode() for n in range(3))))
+        yield stub.url
+
+
+def test_pooled_connections_are_reused(server):
+    app = create_gateway([("/users", server, False)])
+    client = app.test_client()
+    token = token_for()
+    for _ in range(3):
+        response = client.get("/users/profile", headers={"Authorization": token})
+        assert response.json["path"] == "/users/profile"
+        assert verify_forwarded_claims(response.json["claims"], token)["email"] == "john@example.com"
+    assert client.get("/users/stream").data == b"chunk 0\nchunk 1\nchunk 2\n"
+
+    pool = app.extensions["gateway_routes"][0].transport
+    assert pool.created == 1 and pool.reused == 3
+
+
+def test_unreachable_upstream():
+    pool = ConnectionPool("http://127.0.0.1:9", timeout=1)
+    with pytest.raises(UpstreamError):
+        pool.request("GET", "/")
+    app = create_gateway([("/users", "http://127.0.0.1:9", False)])
+    assert app.test_client().get("/users/profile").status_code == 502
@@ -0,0 +1,65 @@
+import random
+import pytest
+from travel_common import geo
+from travel_common.geo import CoordinateError, GridIndex, haversine_km, validate_coordinates
+from travel_common.models import Destination
+
+PARIS = (48.8566, 2.3522)
+LONDON = (51.5074, -0.1278)
+
+
+def place(dest_id, latitude, longitude):
+    return Destination(dest_id, f"Place {dest_id}", "", "Earth", latitude, longitude)
+
+
+def brute_force(points, latitude, longitude, radius_km, limit):
+    distances = sorted(
+        (haversine_km(latitude, longitude, lat, lon), dest_id) for dest_id, (lat, lon) in points.items()
+    )
+    return [dest_id for distance, dest_id in distances if distance <= radius_km][:limit]
+
+
+def test_haversine():
+    assert haversine_km(*PARIS, *LONDON) == pytest.approx(343.5, abs=1)
+    assert haversine_km(0, 179.9, 0, -179.9) == pytest.approx(22.2, abs=0.1)
+
+
+def test_validate_coordinates():
+    validate_coordinates(None, None)
+    validate_coordinates(*PARIS)
+    for latitude, longitude in [(48.8, None), (91, 0), (0, -181)]:
+        with pytest.raises(CoordinateError):
+            validate_coordinates(latitude, longitude)
+
+
+@pytest.mark.parametrize("cell_degrees", [0.5, 1.0, 10.0])
+def test_grid_matches_brute_force(cell_degrees):
+    rng = random.Random(42)
+    points = {dest_id: (rng.uniform(-89, 89), rng.uniform(-180, 180)) for dest_id in range(2000)}
+    index = GridIndex(cell_degrees)
+    for dest_id, (lat, lon) in points.items():
+        index.add(dest_id, place(dest_id, lat, lon))
+
+    for latitude, longitude, radius_km in [(48.8, 2.3, 500), (0, 179.5, 1500), (88, 10, 800), (-10, -60, 20000)]:
+        found = [dest_id for dest_id, _ in index.nearby(latitude, longitude, radius_km, limit=10)]
+        assert found == brute_force(points, latitude, longitude, radius_km, 10)
+
+
+def test_grid_remove():
+    index = GridIndex()
+    paris = place(1, *PARIS)
+    index.add(1, paris)
+    index.add(2, place(2, *LONDON))
+    index.remove(1, paris)
+    assert [dest_id for dest_id, _ in index.nearby(*PARIS, 1000)] == [2]
+    assert len(index) == 1
+    index.add(3, place(3, None, None))  # records without coordinates are not indexed
+    assert len(index) == 1
+
+
+def test_vectorized_distances_match():
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(geo.VECTORIZE_THRESHOLD * 2)]
+    vectorized = geo.haversine_many_km(*PARIS, points)
+    assert vectorized == pytest.approx([haversine_km(*PARIS, lat, lon) for lat, lon in points])
@@ -0,0 +1,54 @@
+from flask import Flask
+
+from travel_common.health import Readiness, register_health, warm_up_request, warm_up_unless_lazy
+
+
+def test_readiness_runs_steps_once_in_order():
+    calls = []
+    readiness = Readiness()
+    readiness.add_step("load", lambda: calls.append("load"))
+    readiness.add_step("index", lambda: calls.append("index"))
+
+    assert readiness.state == "cold"
+    assert readiness.warm_up() and readiness.warm_up()
+    assert calls == ["load", "index"]
+    assert list(readiness.to_dict()["warmup_seconds"]) == ["load", "index"]
+
+
+def test_failed_step_keeps_service_unready():
+    readiness = Readiness()
+    readiness.add_step("load", lambda: 1 / 0)
+    assert not readiness.warm_up()
+    assert readiness.to_dict()["status"] == "failed"
+    assert readiness.error.startswith("load:")
+
+
+def test_probes():
+    app = Flask(__name__)
+    hits = []
+    app.add_url_rule("/ping", "ping", lambda: hits.append(1) or "pong")
+    readiness = register_health(app)
+    readiness.add_step("request", warm_up_request(app, "/ping"))
+    client = app.test_client()
+
+    assert client.get("/healthz").json == {"status": "ok"}
+    # The first probe starts the warm-up in the background
+    first = client.get("/readyz")
+    assert readiness.wait(5)
+    assert first.status_code in (200, 503)
+    response = client.get("/readyz")
+    assert response.status_code == 200 and response.json["status"] == "ready"
+    assert hits == [1]
+
+
+def test_steps_that_decode_the_store_are_skipped_for_snapshots():
+    class Service:
+        storage_format = "snapshot"
+
+    calls = []
+    service = Service()
+    step = warm_up_unless_lazy(service, lambda: calls.append("built"))
+    step()
+    service.storage_format = "json"
+    step()
+    assert calls == ["built"]
@@ -0,0 +1,78 @@
+import pytest
+from travel_common.indexes import DuplicateKeyError, GroupedSortedIndex, HashIndex, SortedIndex, normalize
+from travel_common.models import Destination
+
+
+def make(dest_id, name, location="France"):
+    return Destination(dest_id, name, "", location)
+
+
+def test_normalize():
+    assert normalize("  New   YORK ") == "new york"
+    assert normalize("Straße") == normalize("STRASSE")
+    assert normalize(None) is None
+
+
+def test_hash_index_add_remove():
+    index = HashIndex(lambda dest: normalize(dest.location))
+    paris, lyon = make(1, "Paris"), make(2, "Lyon")
+    index.add(1, paris)
+    index.add(2, lyon)
+    assert index.get("france") == [1, 2]
+
+    index.remove(1, paris)
+    assert index.get("france") == [2]
+    index.remove(2, lyon)
+    assert "france" not in index
+
+
+def test_unique_hash_index_check():
+    index = HashIndex(lambda dest: normalize(dest.name), unique=True, label="name")
+    index.add(1, make(1, "Paris"))
+    index.check(1, "paris")  # the record itself may keep its key
+    with pytest.raises(DuplicateKeyError, match="Duplicate name: 'paris'") as duplicate:
+        index.check(2, "paris")
+    assert duplicate.value.existing_id == 1
+
+
+def test_sorted_index_prefix_and_range():
+    index = SortedIndex(lambda dest: normalize(dest.name))
+    for dest_id, name in enumerate(["Paris", "Tokyo", "Pisa", "Perth", "Oslo"], 1):
+        index.add(dest_id, make(dest_id, name))
+
+    assert index.prefix("p") == [1, 4, 3]  # paris, perth, pisa
+    assert index.prefix("p", limit=2) == [1, 4]
+    assert index.range("o", "q") == [5, 1, 4, 3]
+
+    index.remove(4, make(4, "Perth"))
+    assert index.prefix("pe") == []
+    assert len(index) == 4
+
+
+def test_grouped_sorted_index():
+    index = GroupedSortedIndex(lambda dest: dest.location, lambda dest: normalize(dest.name))
+    for dest_id, name, location in [(1, "Paris", "France"), (2, "Lyon", "France"), (3, "Oslo", "Norway")]:
+        index.add(dest_id, make(dest_id, name, location=location))
+
+    assert index.range("France", "", "\U0010ffff") == [2, 1]
+    assert index.prefix("France", "p") == [1]
+    assert index.count("France") == 2 and index.count("Spain") == 0
+
+    index.remove(3, make(3, "Oslo", location="Norway"))
+    assert index.prefix("Norway", "") == [] and index.count("Norway") == 0
+
+
+def test_build_matches_incremental_adds():
+    records = [(dest_id, make(dest_id, name, location=location)) for dest_id, name, location in
+               [(3, "Pisa", "Italy"), (1, "Paris", "France"), (2, "Lyon", "France"), (4, "Paris", "Texas")]]
+    built, added = SortedIndex(lambda dest: normalize(dest.name)), SortedIndex(lambda dest: normalize(dest.name))
+    built.build(records)
+    for dest_id, record in records:
+        added.add(dest_id, record)
+    assert built.range("", "\U0010ffff") == added.range("", "\U0010ffff") == [2, 1, 4, 3]
+
+    grouped = GroupedSortedIndex(lambda dest: dest.location, lambda dest: normalize(dest.name))
+    grouped.build(records)
+    assert grouped.prefix("France", "") == [2, 1] and grouped.count("Texas") == 1
+    grouped.add(5, make(5, "Nice", location="France"))  # still updated incrementally afterwards
+    assert grouped.prefix("France", "") == [2, 5, 1]
@@ -0,0 +1,165 @@
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from travel_common.health import register_health
+from travel_common.lifecycle import register_lifecycle
+
+
+def make_app(release, drain_timeout=5):
+    """App whose /write requests block until release is set."""
+    app = Flask(__name__)
+    app.writes = []
+
+    @app.route("/write", methods=["POST"])
+    def write():
+        release.wait(5)
+        app.writes.append(1)
+        return {"ok": True}
+
+    register_health(app).state = "ready"
+    lifecycle = register_lifecycle(app, drain_timeout=drain_timeout)
+    lifecycle.add_flush("store", lambda: app.flushed.append(len(app.writes)))
+    app.flushed = []
+    return app, lifecycle
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_shutdown_drains_in_flight_requests_before_flushing():
+    release = threading.Event()
+    app, lifecycle = make_app(release)
+    responses = []
+    burst = [threading.Thread(target=lambda: responses.append(app.test_client().post("/write").status_code))
+             for _ in range(5)]
+    for thread in burst:
+        thread.start()
+    wait_until(lambda: lifecycle.in_flight == 5)
+
+    result = []
+    stopper = threading.Thread(target=lambda: result.append(lifecycle.shutdown()))
+    stopper.start()
+    wait_until(lambda: lifecycle.draining)
+
+    # New requests are turned away; probes still answer
+    client = app.test_client()
+    rejected = client.post("/write")
+    assert rejected.status_code == 503 and rejected.headers["Retry-After"] == "1"
+    assert client.get("/readyz").status_code == 503 and client.get("/readyz").json == {"status": "draining"}
+    assert client.get("/healthz").status_code == 200
+    assert app.flushed == []
+
+    release.set()
+    stopper.join(5)
+    for thread in burst:
+        thread.join(5)
+    assert result == [True]
+    assert responses == [200] * 5
+    assert app.flushed == [5]  # flushed once, after every in-flight write
+    assert lifecycle.shutdown() and app.flushed == [5]
+
+
+def test_flush_runs_after_drain_timeout_and_failures_are_reported():
+    release = threading.Event()
+    app, lifecycle = make_app(release, drain_timeout=0.1)
+    calls = []
+    lifecycle.add_flush("broken", lambda: 1 / 0)
+    lifecycle.add_flush("after", lambda: calls.append("after"))
+    stuck = threading.Thread(target=lambda: app.test_client().post("/write"))
+    stuck.start()
+    wait_until(lambda: lifecycle.in_flight == 1)
+
+    assert lifecycle.shutdown() is False
+    assert app.flushed == [0] and calls == ["after"]
+    release.set()
+    stuck.join(5)
+    assert lifecycle.in_flight == 0
+
+
+SERVER = textwrap.dedent("""
+    import sys, time
+    from flask import Flask, request
+    from werkzeug.serving import make_server
+    from travel_common.lifecycle import register_lifecycle
+    from travel_common.user_service import UserService
+
+    service = UserService(users_file=sys.argv[1])
+    app = Flask("burst")
+
+    @app.route("/rename/<email>", methods=["POST"])
+    def rename(email):
+        time.sleep(0.01)
+        service.update_profile(email, name=request.get_data(as_text=True))
+        return {"ok": True}
+
+    lifecycle = register_lifecycle(app, drain_timeout=10)
+    lifecycle.add_flush("users", service.flush)
+    lifecycle.install()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    print(server.port, flush=True)
+    server.serve_forever()
+""")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGTERM")
+def test_sigterm_mid_burst_keeps_every_acknowledged_write(tmp_path):
+    users_file = tmp_path / "users.json"
+    emails = [f"user{n}@example.com" for n in range(8)]
+    users_file.write_text(json.dumps({email: {"name": "start", "email": email, "password": "x", "role": "user"}
+                                      for email in emails}))
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    process = subprocess.Popen([sys.executable, str(script), str(users_file)], stdout=subprocess.PIPE,
+                               text=True, env=dict(os.environ, PYTHONUNBUFFERED="1"))
+    try:
+        port = int(process.stdout.readline())
+        acknowledged = {email: -1 for email in emails}
+        attempted = {email: -1 for email in emails}
+
+        def writer(email):
+            for n in range(200):
+                attempted[email] = n
+                try:
+                    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                    connection.request("POST", f"/rename/{email}", body=f"name {n}")
+                    status = connection.getresponse().status
+                    connection.close()
+                except OSError:
+                    return
+                if status != 200:
+                    return
+                acknowledged[email] = n
+
+        writers = [threading.Thread(target=writer, args=(email,)) for email in emails]
+        for thread in writers:
+            thread.start()
+        wait_until(lambda: sum(n + 1 for n in acknowledged.values()) >= 40)
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(20) == 0
+        for thread in writers:
+            thread.join(10)
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+
+    # The journal was folded into users.json, and no acknowledged write was lost
+    assert not os.path.exists(tmp_path / "users.journal")
+    saved = json.loads(users_file.read_text())
+    for email in emails:
+        n = int(saved[email]["name"].split()[1]) if saved[email]["name"] != "start" else -1
+        assert acknowledged[email] <= n <= attempted[email]
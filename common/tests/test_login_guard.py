@@ -0,0 +1,67 @@
+import time
+import pytest
+from unittest.mock import patch
+from travel_common.auth_service import AuthService
+from travel_common.login_guard import LoginGuard, dummy_password_hash
+from travel_common.user_service import UserService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_dummy_hash_is_created_once():
+    assert dummy_password_hash() is dummy_password_hash()
+
+
+def test_average_tracks_real_checks():
+    guard = LoginGuard(smoothing=0.5)
+    guard.record(0.2)
+    guard.record(0.4)
+    assert guard.average_seconds == pytest.approx(0.3)
+
+
+def test_unknown_users_over_budget_sleep_instead_of_hashing():
+    clock, sleeps = FakeClock(), []
+    guard = LoginGuard(dummy_rate="2/1", clock=clock, sleep=sleeps.append)
+    guard.record(0.25)
+
+    with patch.object(AuthService, "verify_password", return_value=False) as verify:
+        for _ in range(5):
+            guard.reject_unknown_user("guess")
+
+    assert verify.call_count == 2
+    assert sleeps == [guard.average_seconds] * 3
+    assert guard.stats()["dummy_checks"] == 2
+    assert guard.stats()["throttled"] == 3
+
+
+def test_unknown_user_costs_about_as_much_as_a_wrong_password(tmp_path):
+    service = UserService(users_file=str(tmp_path / "users.json"))
+    service.register_user("John Doe", "john@example.com", "Password123")
+    dummy_password_hash()  # created at start-up in production (warm-up)
+
+    def timed_login(email):
+        start = time.perf_counter()
+        with pytest.raises(ValueError):
+            service.login_user(email, "WrongPass123")
+        return time.perf_counter() - start
+
+    known = min(timed_login("john@example.com") for _ in range(2))
+    unknown = min(timed_login("nobody@example.com") for _ in range(2))
+    assert unknown > known * 0.5
+
+
+def test_unknown_user_and_wrong_password_fail_alike(tmp_path):
+    service = UserService(users_file=str(tmp_path / "users.json"))
+    service.register_user("John Doe", "john@example.com", "Password123")
+    messages = set()
+    for email in ("john@example.com", "nobody@example.com"):
+        with pytest.raises(ValueError) as error:
+            service.login_user(email, "WrongPass123")
+        messages.add(str(error.value))
+    assert messages == {"Invalid email or password"}
@@ -0,0 +1,36 @@
+import json
+from travel_common.models import Destination, User
+
+
+def test_models_have_no_instance_dict():
+    destination = Destination(1, "Paris", "City of Lights", "France")
+    user = User("John Doe", "john@example.com", "hashed")
+    assert not hasattr(destination, "__dict__")
+    assert not hasattr(user, "__dict__")
+
+
+def test_destination_to_dict_and_json():
+    destination = Destination(1, "Paris", "City of Lights", "France")
+    expected = {"id": 1, "name": "Paris", "description": "City of Lights", "location": "France"}
+    assert destination.to_dict() == expected
+    assert json.loads(destination.to_json()) == expected
+    assert Destination(**destination.to_dict()).to_dict() == expected
+
+
+def test_user_to_dict_and_profile():
+    user = User("John Doe", "john@example.com", "hashed", "admin")
+    assert user.to_dict() == {
+        "name": "John Doe", "email": "john@example.com", "password": "hashed", "role": "admin",
+    }
+    assert user.to_profile() == {"name": "John Doe", "email": "john@example.com", "role": "admin"}
+    assert json.loads(user.to_json())["role"] == "admin"
+
+
+def test_repeated_strings_are_interned():
+    first = User("A", "a@example.com", "hashed", "".join(["ad", "min"]))
+    second = User("B", "b@example.com", "hashed", "".join(["adm", "in"]))
+    assert first.role is second.role
+
+    paris = Destination(1, "Paris", "", "".join(["Fra", "nce"]))
+    nice = Destination(2, "Nice", "", "".join(["Fr", "ance"]))
+    assert paris.location is nice.location
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import MagicMock
+from travel_common.rate_limit import (
+    InMemoryBackend, RateLimiter, RedisBackend, create_backend, parse_rate,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_parse_rate():
+    assert parse_rate("5/60") == (5, 5 / 60)
+    with pytest.raises(ValueError):
+        parse_rate("0/60")
+
+
+def test_bucket_refills_over_time(clock):
+    backend = InMemoryBackend(clock=clock)
+    results = [backend.consume("k", 2, 1.0)[0] for _ in range(3)]
+    assert results == [True, True, False]
+
+    clock.now += 1.0
+    assert backend.consume("k", 2, 1.0)[0]
+    assert not backend.consume("k", 2, 1.0)[0]
+
+
+def test_least_recently_used_keys_are_evicted(clock):
+    backend = InMemoryBackend(max_keys=2, clock=clock)
+    backend.consume("a", 1, 0.001)
+    backend.consume("b", 1, 0.001)
+    backend.consume("c", 1, 0.001)
+    assert backend.consume("a", 1, 0.001)[0]  # "a" was evicted, so it starts full again
+    assert not backend.consume("c", 1, 0.001)[0]
+
+
+def test_limiter_counts_rejections_per_rule(clock):
+    limiter = RateLimiter({"ip": "3/60", "email": "1/60"}, backend=InMemoryBackend(clock=clock))
+    assert limiter.check(ip="10.0.0.1", email="a@example.com") is None
+
+    limited = limiter.check(ip="10.0.0.1", email="a@example.com")
+    assert limited.rule == "email"
+    assert limited.retry_after == 60
+
+    assert limiter.check(ip="10.0.0.1", email="b@example.com") is None
+    assert limiter.check(ip="10.0.0.1", email="c@example.com").rule == "ip"
+    assert limiter.stats() == {
+        "allowed": 2, "rejected": 2, "rejected_by_rule": {"email": 1, "ip": 1},
+    }
+
+
+def test_missing_keys_are_skipped():
+    limiter = RateLimiter({"ip": "1/60", "email": "1/60"})
+    assert limiter.check(ip=None, email=None) is None
+    assert limiter.check(ip=None, email=None) is None
+
+
+def test_redis_backend_runs_script_with_bucket_arguments():
+    client = MagicMock()
+    client.register_script.return_value.return_value = [1, "4.0"]
+    backend = RedisBackend(client, clock=lambda: 50.0)
+
+    assert backend.consume("login:ip:1.2.3.4", 5, 0.5) == (True, 4.0)
+    client.register_script.return_value.assert_called_once_with(
+        keys=["ratelimit:login:ip:1.2.3.4"], args=[5, 0.5, 50.0, 1]
+    )
+
+
+def test_create_backend():
+    assert isinstance(create_backend("memory"), InMemoryBackend)
+    with pytest.raises(ValueError):
+        create_backend("memcached://localhost")
@@ -0,0 +1,136 @@
+import io
+import pytest
+from flask import Flask, g
+from flask_restx import Model, fields
+from travel_common.request_validation import (
+    compile_model, configure_body_limits, validate_body, validate_items,
+)
+
+MODEL = Model("Trip", {
+    "name": fields.String(required=True),
+    "days": fields.Integer,
+    "price": fields.Float(),
+    "kind": fields.String(enum=["city", "beach"]),
+})
+
+
+def test_model_is_compiled_once():
+    assert compile_model(MODEL) is compile_model(MODEL)
+
+
+def test_validate_reports_every_error():
+    payload, errors = compile_model(MODEL).validate(
+        {"name": "", "days": True, "price": "cheap", "kind": "ski"}
+    )
+    assert errors == [
+        "'name' is a required field",
+        "'days' must be an integer",
+        "'price' must be a number",
+        "'kind' must be one of: beach, city",
+    ]
+
+
+def test_validate_keeps_only_model_fields():
+    payload, errors = compile_model(MODEL).validate({"name": "Paris", "price": 10, "id": 3})
+    assert errors == []
+    assert payload == {"name": "Paris", "price": 10}
+
+
+def test_partial_skips_required_fields():
+    payload, errors = compile_model(MODEL).validate({"days": 2}, partial=True)
+    assert errors == []
+    assert payload == {"days": 2}
+
+
+def test_partial_rejects_blanking_required_fields():
+    model = compile_model(MODEL)
+    for blank in (None, ""):
+        assert model.validate({"name": blank}, partial=True)[1] == ["'name' cannot be empty"]
+    # Optional fields may still be cleared
+    assert model.validate({"price": None}, partial=True) == ({"price": None}, [])
+
+
+def test_non_object_body_is_rejected():
+    assert compile_model(MODEL).validate([1, 2])[1] == ["Request body must be a JSON object"]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["MAX_JSON_BODY_BYTES"] = 64
+
+    @app.route("/trips", methods=["POST"])
+    @validate_body(MODEL)
+    def create_trip():
+        return g.payload, 201
+
+    return app
+
+
+def test_decorator_passes_validated_payload(app):
+    response = app.test_client().post("/trips", json={"name": "Rome", "extra": 1})
+    assert response.status_code == 201
+    assert response.json == {"name": "Rome"}
+
+
+@pytest.mark.parametrize("kwargs, status", [
+    ({"json": {"name": "x" * 100}}, 413),
+    ({"data": "{not json", "content_type": "application/json"}, 400),
+    ({"data": "name=Rome"}, 415),
+    ({"json": {}}, 400),
+])
+def test_decorator_rejects_bad_requests(app, kwargs, status):
+    response = app.test_client().post("/trips", **kwargs)
+    assert response.status_code == status
+    assert "error" in response.json
+
+
+@pytest.fixture
+def bulk_app():
+    app = Flask(__name__)
+    app.config.update(MAX_CONTENT_LENGTH=2000, MAX_JSON_BODY_BYTES=100, MAX_BULK_ITEMS=3)
+    configure_body_limits(app)
+
+    @app.route("/trips/bulk", methods=["POST"])
+    @validate_items(MODEL)
+    def create_trips():
+        return {"trips": g.payload}, 201
+
+    return app
+
+
+def test_validate_items_collects_payloads(bulk_app):
+    response = bulk_app.test_client().post("/trips/bulk", json=[{"name": "Rome"}, {"name": "Oslo", "days": 2}])
+    assert response.status_code == 201
+    assert response.json == {"trips": [{"name": "Rome"}, {"name": "Oslo", "days": 2}]}
+
+
+@pytest.mark.parametrize("body, status, error", [
+    ([{"name": "Rome"}, {"days": 1}], 400, "Item 1: 'name' is a required field"),
+    ([{"name": "x" * 200}], 400, None),
+    ([{"name": "Rome"}] * 4, 413, "Too many items (at most 3)"),
+    ([{"name": "x" * 90}] * 30, 413, "Request body exceeds 2000 bytes"),
+])
+def test_validate_items_rejects_bad_uploads(bulk_app, body, status, error):
+    response = bulk_app.test_client().post("/trips/bulk", json=body)
+    assert response.status_code == status
+    if error:
+        assert response.json["error"] == error
+
+
+def test_validate_items_rejects_data_after_the_array(bulk_app):
+    response = bulk_app.test_client().post(
+        "/trips/bulk", data=b'[{"name": "Rome"}]garbage', content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert response.json["error"].startswith("Malformed JSON body")
+
+
+def test_body_limit_applies_without_content_length(bulk_app):
+    body = b"[" + (b'{"name": "' + b"x" * 50 + b'"},') * 50 + b'{"name": "end"}]'
+    # A chunked upload: no Content-Length, the server reads until the stream ends
+    response = bulk_app.test_client().post(
+        "/trips/bulk", input_stream=io.BytesIO(body), content_type="application/json",
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+    assert response.status_code == 413
@@ -0,0 +1,95 @@
+import importlib.util
+import io
+import json
+import pytest
+from travel_common import serialization
+from travel_common.models import Destination, User
+
+BACKENDS = [
+    name for name, module in [("orjson", "orjson"), ("msgspec", "msgspec"), ("json", "json")]
+    if importlib.util.find_spec(module) is not None
+]
+
+DATA = {
+    1: {"id": 1, "name": "Zürich", "description": "", "location": "Switzerland"},
+    2: {"id": 2, "name": "Tokyo", "description": "Vibrant city", "location": "Japan"},
+}
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = serialization.backend
+    serialization.set_backend(request.param)
+    yield request.param
+    serialization.set_backend(previous)
+
+
+def test_backends_match_stdlib_output(backend):
+    assert serialization.dumps(DATA, pretty=True) == json.dumps(
+        DATA, indent=2, ensure_ascii=False).encode("utf-8")
+    assert serialization.dumps(DATA) == json.dumps(
+        DATA, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def test_floats_round_trip_across_backends(backend):
+    # The notation of small and large floats differs between backends; the values do not
+    record = {"id": 3, "latitude": -0.0025, "longitude": 8.5e-05, "area": 1e20}
+    assert json.loads(serialization.dumps(record)) == record
+    assert serialization.loads(json.dumps(record)) == record
+    assert serialization.loads(serialization.dumps(record, pretty=True)) == record
+
+
+def test_loads_accepts_bytes_and_str(backend):
+    encoded = serialization.dumps(DATA)
+    assert serialization.loads(encoded) == serialization.loads(encoded.decode("utf-8"))
+
+
+def test_invalid_json_raises(backend):
+    with pytest.raises(serialization.SerializationError):
+        serialization.loads(b"Invalid JSON")
+
+
+def test_decode_mapping_builds_models(backend):
+    destinations = serialization.decode_mapping(serialization.dumps(DATA), Destination, int)
+    assert isinstance(destinations[1], Destination)
+    assert destinations[1].name == "Zürich"
+    assert destinations[2].to_dict() == DATA[2]
+
+
+def test_decode_mapping_rejects_bad_records(backend):
+    with pytest.raises(serialization.SerializationError, match="Invalid User record"):
+        serialization.decode_mapping(b'{"a@example.com": {"name": "A"}}', User)
+    with pytest.raises(serialization.SerializationError):
+        serialization.decode_mapping(b"[]", User)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        serialization.set_backend("yaml")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+def test_iter_array_streams_items(chunk_size):
+    items = list(DATA.values()) + [12345, -2.5e-3, "Zürich", None, True, []]
+    raw = json.dumps(items, ensure_ascii=False).encode("utf-8")
+    assert list(serialization.iter_array(io.BytesIO(raw), chunk_size=chunk_size)) == items
+
+
+@pytest.mark.parametrize("raw", [b"", b"{}", b"[1,", b"[1 2]", b"[1,]", b"[x]", b"[1]garbage", b"[] \n []",
+                                 b"[1]  \xff"])
+def test_iter_array_rejects_malformed_input(raw):
+    with pytest.raises(serialization.SerializationError):
+        list(serialization.iter_array(io.BytesIO(raw), chunk_size=2))
+
+
+def test_iter_array_allows_trailing_whitespace():
+    assert list(serialization.iter_array(io.BytesIO(b" [1, 2] \r\n\t "), chunk_size=2)) == [1, 2]
+
+
+def test_iter_array_stops_at_oversized_item():
+    stream = io.BytesIO(b'[1, "' + b"x" * 10_000 + b'"]')
+    items = serialization.iter_array(stream, chunk_size=16, max_item_size=100)
+    assert next(items) == 1
+    with pytest.raises(serialization.SerializationError, match="exceeds 100"):
+        next(items)
+    assert stream.tell() < 200  # the rest of the body was never read
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from travel_common.http_pool import UpstreamError
+from travel_common.service_client import (
+    CircuitBreaker, CircuitOpenError, DestinationsClient, ServiceError, UsersClient,
+)
+from travel_common.stub_server import StubServer
+
+PARIS = {"id": 1, "name": "Paris", "description": "City of lights", "location": "France",
+         "latitude": 48.8566, "longitude": 2.3522}
+
+
+@pytest.fixture
+def stub():
+    with StubServer() as server:
+        yield server
+
+
+def make_client(cls, stub, **kwargs):
+    delays = []
+    kwargs.setdefault("sleep", delays.append)
+    client = cls(stub.url, jitter=lambda: 1.0, **kwargs)
+    client.delays = delays
+    return client
+
+
+def test_typed_calls_reuse_one_connection(stub):
+    stub.add("GET", "/destinations/nearby", [dict(PARIS, distance_km=1.5)])
+    stub.add("GET", "/destinations", {"destinations": [PARIS], "missing": [7]})
+    client = make_client(DestinationsClient, stub)
+
+    [(paris, distance)] = client.nearby(48.85, 2.35, radius_km=10)
+    assert (paris.name, paris.latitude, distance) == ("Paris", 48.8566, 1.5)
+    found, missing = client.get_many([1, 7])
+    assert [d.id for d in found] == [1] and missing == [7]
+    assert stub.requests[-1].query == {"ids": ["1,7"]}
+    assert client.transport.created == 1 and client.transport.reused == 1
+
+
+def test_idempotent_requests_are_retried_with_backoff(stub):
+    stub.add("GET", "/users/profile", [(503, {"error": "busy"}), (502, "bad gateway"), (200, {"email": "a@b.c"})])
+    client = make_client(UsersClient, stub, backoff=0.1)
+    assert client.profile("token") == {"email": "a@b.c"}
+    assert client.delays == [0.1, 0.2]
+    assert stub.requests[0].headers["Authorization"] == "token"
+
+    stub.add("POST", "/users/login", [(503, {"error": "busy"}), (200, {"token": "t"})])
+    with pytest.raises(ServiceError) as error:
+        client.login("a@b.c", "secret")  # not idempotent: never sent twice
+    assert error.value.status == 503 and stub.calls("POST", "/users/login") == 1
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.add("GET", "/users/profile", (401, {"error": "Invalid or expired token"}))
+    client = make_client(UsersClient, stub)
+    assert client.verify_token("expired") is None
+    assert stub.calls("GET", "/users/profile") == 1
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_fails_fast_then_probes(stub):
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    stub.add("GET", "/destinations/1", (500, {"error": "down"}))
+    client = make_client(DestinationsClient, stub, retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(ServiceError):
+            client.get(1)
+    with pytest.raises(CircuitOpenError):
+        client.get(1)
+    assert stub.calls("GET", "/destinations/1") == 2
+
+    now[0] = 10  # after reset_timeout one trial request goes through
+    stub.add("GET", "/destinations/1", PARIS)
+    assert client.get(1).name == "Paris"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_concurrent_identical_gets_are_coalesced(stub):
+    def slow(request):
+        time.sleep(0.2)
+        return {"email": "a@b.c"}
+
+    stub.add("GET", "/users/profile", slow)
+    client = make_client(UsersClient, stub)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.profile("token"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"email": "a@b.c"}] * 5
+    assert stub.calls("GET", "/users/profile") == 1
+
+
+def test_timeout(stub):
+    stub.add("GET", "/users/profile", lambda request: time.sleep(1) or {})
+    client = make_client(UsersClient, stub, timeout=0.1, retries=0)
+    with pytest.raises(UpstreamError):
+        client.profile("token")
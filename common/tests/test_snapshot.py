@@ -0,0 +1,120 @@
+import struct
+import pytest
+from travel_common import serialization, snapshot
+from travel_common.destination_service import DestinationService
+from travel_common.models import Destination, User
+
+
+@pytest.fixture
+def destinations():
+    return {
+        1: Destination(1, "Paris", "City of Lights", "France"),
+        2: Destination(2, "Tokyo", "Vibrant city", "Japan"),
+        3: Destination(3, "Zürich", "", "Switzerland"),
+    }
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, destinations):
+    path = str(tmp_path / "destinations.snap")
+    snapshot.save_snapshot(path, destinations)
+    return path
+
+
+def test_round_trip_is_lazy(snapshot_path, destinations):
+    records = snapshot.load_snapshot(snapshot_path, Destination)
+    assert list(records) == [1, 2, 3]
+    assert 2 in records and 4 not in records
+    assert records.decoded_count() == 0
+
+    assert records[3].to_dict() == destinations[3].to_dict()
+    assert records.decoded_count() == 1
+    assert records.get(4) is None
+
+
+def test_mutations_and_resave(tmp_path, snapshot_path):
+    records = snapshot.load_snapshot(snapshot_path, Destination)
+    records[4] = Destination(4, "Cairo", "Pyramids", "Egypt")
+    records[1].name = "Paris, France"
+    del records[2]
+
+    path = str(tmp_path / "resaved.snap")
+    snapshot.save_snapshot(path, records)
+    reloaded = snapshot.load_snapshot(path, Destination)
+    assert [d.name for d in reloaded.values()] == ["Paris, France", "Zürich", "Cairo"]
+
+
+def test_corrupt_snapshot_fails_checksum(snapshot_path):
+    with open(snapshot_path, "r+b") as file:
+        file.seek(-2, 2)
+        file.write(b"!!")
+    with pytest.raises(snapshot.SnapshotError, match="checksum"):
+        snapshot.SnapshotReader(snapshot_path)
+
+
+def test_checksum_on_load_can_be_skipped(snapshot_path, monkeypatch):
+    with open(snapshot_path, "r+b") as file:
+        file.seek(-2, 2)
+        file.write(b"!!")
+    monkeypatch.setattr(snapshot, "VERIFY_ON_LOAD", False)
+    records = snapshot.load_snapshot(snapshot_path, Destination)
+    assert records[1].name == "Paris"  # Only the damaged record fails, when decoded
+    with pytest.raises(serialization.SerializationError):
+        records[3]
+
+
+def test_resave_over_a_snapshot_read_into_memory(snapshot_path, monkeypatch):
+    # How snapshots are opened on Windows, where a mapped file cannot be replaced
+    monkeypatch.setattr(snapshot, "MEMORY_MAP", False)
+    records = snapshot.load_snapshot(snapshot_path, Destination)
+    records[4] = Destination(4, "Cairo", "Pyramids", "Egypt")
+    snapshot.save_snapshot(snapshot_path, records)
+
+    assert [d.name for d in records.values()] == ["Paris", "Tokyo", "Zürich", "Cairo"]
+    reloaded = snapshot.load_snapshot(snapshot_path, Destination)
+    assert [d.name for d in reloaded.values()] == ["Paris", "Tokyo", "Zürich", "Cairo"]
+
+
+def test_unknown_version_is_rejected(snapshot_path):
+    with open(snapshot_path, "r+b") as file:
+        file.seek(8)
+        file.write(struct.pack("<H", snapshot.FORMAT_VERSION + 1))
+    with pytest.raises(snapshot.SnapshotError, match="Unsupported snapshot version"):
+        snapshot.SnapshotReader(snapshot_path)
+
+
+@pytest.mark.parametrize("data", [b"", b"TRVSNAP", b"not a snapshot file at all, really!!!!"])
+def test_invalid_files_are_rejected(tmp_path, data):
+    path = tmp_path / "bad.snap"
+    path.write_bytes(data)
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.SnapshotReader(str(path))
+
+
+def test_json_import_and_export(tmp_path):
+    json_path = tmp_path / "users.json"
+    json_path.write_bytes(serialization.dumps({
+        "a@example.com": {"name": "A", "email": "a@example.com", "password": "x", "role": "admin"},
+    }, pretty=True))
+    snap_path = str(tmp_path / "users.snap")
+
+    assert snapshot.json_to_snapshot(str(json_path), snap_path, User) == 1
+    assert snapshot.load_snapshot(snap_path, User)["a@example.com"].role == "admin"
+
+    exported = tmp_path / "exported.json"
+    snapshot.main(["export", snap_path, str(exported)])
+    assert exported.read_bytes() == json_path.read_bytes()
+
+
+def test_destination_service_snapshot_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(DestinationService, "storage_format", "snapshot")
+    json_path = str(tmp_path / "destinations.json")
+
+    service = DestinationService(destinations_file=json_path)
+    service.add_destination("Paris", "City of Lights", "France")
+    assert not (tmp_path / "destinations.json").exists()
+
+    reloaded = DestinationService(destinations_file=json_path)
+    assert isinstance(reloaded.destinations, snapshot.LazyRecords)
+    assert reloaded.next_id == 2
+    assert reloaded.get_all_destinations()[0].name == "Paris"
@@ -0,0 +1,47 @@
+import sys
+from travel_common import config
+from travel_common.lazy import lazy_import
+from travel_common.startup import parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     jwt.api_jwt
+import time:       200 |       1100 |   jwt
+import time:       400 |       1500 | app
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(IMPORTTIME)
+    assert [(r.module, r.depth) for r in records] == [
+        ("_io", 1), ("jwt.api_jwt", 2), ("jwt", 1), ("app", 0),
+    ]
+    assert records[-1].cumulative_us == 1500
+
+
+def test_lazy_import_defers_module_body(tmp_path, monkeypatch):
+    (tmp_path / "slow_module.py").write_text("LOADED = True\nimport sys\nsys.slow_loaded = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_module", raising=False)
+
+    module = lazy_import("slow_module")
+    assert not hasattr(sys, "slow_loaded")
+    assert module.LOADED
+    assert sys.slow_loaded
+    del sys.slow_loaded
+
+
+def test_environment_is_loaded_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(config, "_environment_loaded", False)
+    monkeypatch.setattr("dotenv.load_dotenv", lambda *args, **kwargs: calls.append(args))
+    config.load_environment()
+    config.load_environment()
+    assert len(calls) == 1
+
+
+def test_swagger_docs_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TRAVEL_SWAGGER_DOCS", "0")
+    assert config.swagger_doc_path() is False
+    monkeypatch.setenv("TRAVEL_SWAGGER_DOCS", "1")
+    assert config.swagger_doc_path("/docs") == "/docs"
@@ -0,0 +1,273 @@
+import sys
+import threading
+
+import pytest
+from travel_common import serialization
+from travel_common.auth_service import AuthService
+from travel_common.user_service import UserService
+
+
+@pytest.fixture
+def user_service(tmp_path):
+    return UserService(users_file=str(tmp_path / "users.json"))
+
+
+def test_missing_file_loads_empty(user_service):
+    assert user_service.users == {}
+
+
+def test_register_persists_and_reloads(user_service):
+    user_service.register_user("John Doe", "john@example.com", "Password123")
+
+    reloaded = UserService(users_file=user_service.users_file)
+    assert reloaded.users["john@example.com"].name == "John Doe"
+    assert reloaded.users["john@example.com"].role == "user"
+    assert reloaded.login_user("john@example.com", "Password123")
+
+
+def test_invalid_file_raises(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text("Invalid JSON")
+    with pytest.raises(ValueError, match="Error decoding the users file"):
+        UserService(users_file=str(path))
+
+
+def _add_users(service, users):
+    # Bypass registration (bcrypt) for listing tests; the index sees the users on first use
+    from travel_common.models.user import User
+    for name, email, role in users:
+        service.users[email] = User(name, email, "x", role)
+
+
+def test_list_users_pages_in_email_order(user_service):
+    _add_users(user_service, [(f"User {n}", f"u{n:02d}@example.com", "user") for n in range(25)]
+               + [("Admin", "admin@example.com", "admin")])
+
+    users, cursor = user_service.list_users(limit=10)
+    assert [u.email for u in users] == [f"u{n:02d}@example.com" for n in range(10)]
+    users, cursor = user_service.list_users(after=cursor, limit=10)
+    assert users[0].email == "u10@example.com"
+    users, cursor = user_service.list_users(after=cursor, limit=10)
+    assert len(users) == 5 and cursor is None
+    assert [u.email for u in user_service.list_users(role="admin")[0]] == ["admin@example.com"]
+
+
+def test_list_users_prefixes_and_registration(user_service):
+    _add_users(user_service, [("Alice", "Alice@example.com", "user"), ("Bob", "bob@example.com", "user"),
+                              ("alina", "ali@test.com", "user")])
+    assert [u.name for u in user_service.list_users(email_prefix="AL")[0]] == ["alina", "Alice"]
+    assert [u.name for u in user_service.list_users(name_prefix="ALI", limit=1)[0]] == ["alina"]
+    users, cursor = user_service.list_users(name_prefix="ali", limit=1)
+    assert [u.name for u in user_service.list_users(after=cursor, name_prefix="ali")[0]] == ["Alice"]
+
+    user_service.register_user("Carol", "carol@example.com", "Password123")
+    assert user_service.list_users(email_prefix="carol")[0][0].name == "Carol"
+    assert [u.email for u in user_service.iter_users(page_size=2)] == [
+        "ali@test.com", "Alice@example.com", "bob@example.com", "carol@example.com"]
+
+
+def test_email_lookup_ignores_case(user_service):
+    user_service.register_user("John Doe", "John@Example.com", "Password123")
+
+    assert user_service.login_user("john@example.com", "Password123")
+    with pytest.raises(ValueError, match="Email already registered"):
+        user_service.register_user("Other John", "JOHN@example.com", "Password123")
+
+    _add_users(user_service, [("Jane", "jane@example.com", "admin"), ("Bob", "bob@example.com", "user")])
+    user_service._indexes = None  # Rebuilt with the users added behind its back
+    assert [u.email for u in user_service.search_users("J")] == ["jane@example.com", "John@Example.com"]
+    assert [u.email for u in user_service.search_users("j", limit=1)] == ["jane@example.com"]
+
+    user_service.delete_user("john@example.com")
+    assert user_service.search_users("jo") == []
+    assert user_service.find_user("John@Example.com") is None
+    assert "John@Example.com" not in UserService(users_file=user_service.users_file).users
+
+
+def test_profile_json_is_cached_and_invalidated(user_service):
+    with pytest.raises(ValueError, match="User not found"):
+        user_service.get_profile_json("john@example.com")
+
+    # Registering drops the cached miss
+    user_service.register_user("John Doe", "John@example.com", "Password123")
+    assert serialization.loads(user_service.get_profile_json("john@example.com")) == {
+        "name": "John Doe", "email": "John@example.com", "role": "user"}
+    assert user_service.get_profile_json("JOHN@example.com") is user_service.get_profile_json("john@example.com")
+
+    user_service.delete_user("John@example.com")
+    with pytest.raises(ValueError, match="User not found"):
+        user_service.get_profile_json("john@example.com")
+
+
+def test_changes_are_journaled_and_replayed(user_service, tmp_path):
+    user_service.register_user("John Doe", "john@example.com", "Password123")
+    user_service.register_user("Jane Doe", "jane@example.com", "Password123")
+    assert not (tmp_path / "users.json").exists()  # only the journal was written
+
+    user_service.update_profile("john@example.com", name="Johnny")
+    user_service.delete_user("jane@example.com")
+    with open(user_service.journal_file, "ab") as journal:
+        journal.write(b'{"email": "torn')  # a write cut short by a crash
+
+    reloaded = UserService(users_file=user_service.users_file)
+    assert list(reloaded.users) == ["john@example.com"]
+    assert reloaded.users["john@example.com"].name == "Johnny"
+    assert open(reloaded.journal_file, "rb").read().endswith(b"\n")
+
+
+def test_journal_is_compacted_into_the_users_file(user_service, monkeypatch, tmp_path):
+    monkeypatch.setattr(UserService, "journal_compact_entries", 2)
+    _add_users(user_service, [("A", "a@example.com", "user"), ("B", "b@example.com", "user")])
+    user_service.update_profile("a@example.com", name="A1")
+    user_service.update_profile("b@example.com", name="B1")
+    user_service.update_profile("a@example.com", name="A2")  # journal full: everything is rewritten
+
+    assert not (tmp_path / "users.journal").exists()
+    reloaded = UserService(users_file=user_service.users_file)
+    assert [user.name for user in reloaded.users.values()] == ["A2", "B1"]
+
+
+def test_change_password_revokes_old_tokens(user_service):
+    first_version = user_service.register_user("John Doe", "john@example.com", "Password123").token_version
+    old_claims = AuthService.verify_token(user_service.login_user("john@example.com", "Password123"))
+    assert user_service.token_is_current(old_claims)
+
+    with pytest.raises(ValueError, match="Invalid password"):
+        user_service.change_password("john@example.com", "WrongPass123", "NewPassword123")
+    token = user_service.change_password("john@example.com", "Password123", "NewPassword123")
+
+    assert not user_service.token_is_current(old_claims)
+    assert user_service.token_is_current(AuthService.verify_token(token))
+    reloaded = UserService(users_file=user_service.users_file)
+    assert reloaded.users["john@example.com"].token_version == first_version + 1
+    assert reloaded.login_user("john@example.com", "NewPassword123")
+
+
+def test_registrations_during_compaction_all_succeed(user_service, monkeypatch):
+    monkeypatch.setattr(UserService, "journal_compact_entries", 0)  # every write rewrites the store
+    monkeypatch.setattr(AuthService, "hash_password", staticmethod(lambda password: b"hashed"))
+    _add_users(user_service, [("User", f"existing{n}@example.com", "user") for n in range(2000)])
+    errors = []
+
+    def register(worker):
+        for n in range(30):
+            try:
+                user_service.register_user("User", f"user{worker}-{n}@example.com", "Password123")
+            except Exception as error:
+                errors.append(error)
+
+    threads = [threading.Thread(target=register, args=(worker,)) for worker in range(8)]
+    # Switch threads often, so registrations land while a compaction walks the store
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(UserService(users_file=user_service.users_file).users) == 2240
+
+
+def test_concurrent_password_changes_from_the_same_password(user_service):
+    user_service.register_user("John Doe", "john@example.com", "Password123")
+    first_version = user_service.find_user("john@example.com").token_version
+    results = []
+
+    def change(new_password):
+        try:
+            user_service.change_password("john@example.com", "Password123", new_password)
+            results.append(new_password)
+        except ValueError:
+            results.append(None)
+
+    threads = [threading.Thread(target=change, args=(f"NewPassword{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Only the first change knew the current password; the others were rejected
+    winners = [result for result in results if result is not None]
+    assert len(winners) == 1
+    assert user_service.find_user("john@example.com").token_version == first_version + 1
+    assert user_service.login_user("john@example.com", winners[0])
+
+
+def test_tokens_of_a_deleted_account_do_not_work_for_a_new_one(user_service):
+    user_service.register_user("Old Admin", "boss@example.com", "Password123", "admin")
+    old_claims = AuthService.verify_token(user_service.login_user("boss@example.com", "Password123"))
+    user_service.delete_user("boss@example.com")
+    assert not user_service.token_is_current(old_claims)
+
+    user_service.register_user("New User", "boss@example.com", "Password123", "user")
+    assert not user_service.token_is_current(old_claims)
+    reloaded = UserService(users_file=user_service.users_file)
+    assert not reloaded.token_is_current(old_claims)
+    new_claims = AuthService.verify_token(reloaded.login_user("boss@example.com", "Password123"))
+    assert reloaded.token_is_current(new_claims) and new_claims["role"] == "user"
+
+
+def test_indexes_are_built_once_under_concurrent_first_use(user_service):
+    _add_users(user_service, [(f"User {n}", f"u{n:04d}@example.com", "admin" if n % 10 == 0 else "user")
+                              for n in range(2000, 0, -1)])
+    built = []
+    threads = [threading.Thread(target=lambda: built.append(user_service.indexes)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(indexes is built[0] for indexes in built)
+    assert [u.email for u in user_service.search_users("u000", 3)] == [
+        "u0001@example.com", "u0002@example.com", "u0003@example.com"]
+    assert user_service.list_users(role="admin", limit=2)[0][1].email == "u0020@example.com"
+
+
+def test_email_lookups_do_not_decode_a_snapshot(tmp_path, monkeypatch):
+    from travel_common import snapshot
+    from travel_common.models.user import User
+    monkeypatch.setattr(UserService, "storage_format", "snapshot")
+    snapshot.save_snapshot(str(tmp_path / "users.snap"),
+                           {f"u{n}@x.com": User(f"User {n}", f"u{n}@x.com", "x") for n in range(1000)})
+    service = UserService(users_file=str(tmp_path / "users.json"))
+
+    assert service.find_user("U5@x.com").name == "User 5"
+    assert service.find_user("nobody@x.com") is None
+    assert [u.email for u in service.search_users("u99", 2)] == ["u990@x.com", "u991@x.com"]
+    assert service.users.decoded_count() == 3  # only the users returned
+
+
+def test_priming_profiles_from_a_snapshot_decodes_only_the_primed_users(tmp_path, monkeypatch):
+    from travel_common import snapshot
+    from travel_common.models.user import User
+    monkeypatch.setattr(UserService, "storage_format", "snapshot")
+    snapshot.save_snapshot(str(tmp_path / "users.snap"),
+                           {f"u{n}@x.com": User(f"User {n}", f"u{n}@x.com", "x") for n in range(1000)})
+    service = UserService(users_file=str(tmp_path / "users.json"))
+
+    service.indexes  # the readiness steps
+    assert service.prime_profile_cache(limit=10) == 10
+    assert service.users.decoded_count() == 10
+
+
+def test_crash_during_compaction_keeps_the_old_users_file(user_service, monkeypatch):
+    from travel_common import snapshot
+    user_service.register_user("John Doe", "john@example.com", "Password123")
+    user_service.flush()  # users.json now holds John
+    user_service.update_profile("john@example.com", name="Johnny")
+
+    def crash(fd):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(snapshot.os, "fsync", crash)
+    with pytest.raises(OSError):
+        user_service.flush()
+    monkeypatch.undo()
+
+    # The rename never happened: the old file and the journal are intact
+    reloaded = UserService(users_file=user_service.users_file)
+    assert reloaded.users["john@example.com"].name == "Johnny"
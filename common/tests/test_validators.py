@@ -0,0 +1,45 @@
+import pytest
+from travel_common.validators import (
+    PasswordPolicy, validate_email, validate_emails, validate_password, validate_passwords,
+)
+
+
+@pytest.mark.parametrize("email, expected", [
+    ("john@example.com", True),
+    ("a.b+c@sub.domain.org", True),
+    ("invalid-email", False),
+    ("x@y.z", False),
+    ("john@example.com\n", False),
+    (None, False),
+])
+def test_validate_email(email, expected):
+    assert validate_email(email) is expected
+
+
+@pytest.mark.parametrize("password, expected", [
+    ("Password123", True),
+    ("weak", False),
+    ("alllowercase1", False),
+    ("ALLUPPERCASE1", False),
+    ("NoDigitsHere", False),
+    ("Unicode٣Digit", True),
+    (None, False),
+])
+def test_validate_password(password, expected):
+    assert validate_password(password) is expected
+
+
+def test_policy_violations_and_options():
+    policy = PasswordPolicy(min_length=10, max_length=16, require_special=True)
+    assert policy.violations("short") == ["min_length", "upper", "digit", "special"]
+    assert policy.violations("LongEnough123!") == []
+    assert policy.violations("WayTooLongPassword123!") == ["max_length"]
+    assert not policy.check("LongEnough123")
+    assert PasswordPolicy(require_upper=False).check("lowercase1")
+
+
+def test_batch_validation_matches_single():
+    emails = ["john@example.com", "bad", None, "a@b.co"]
+    passwords = ["Password123", "weak", None, "CorrectHorse9"]
+    assert validate_emails(emails) == [validate_email(e) for e in emails]
+    assert validate_passwords(passwords) == [validate_password(p) for p in passwords]
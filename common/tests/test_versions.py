@@ -0,0 +1,56 @@
+from travel_common.versions import VersionTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_changes_since_returns_only_newer_records():
+    tracker = VersionTracker()
+    for record_id in (1, 2, 3):
+        tracker.touch(record_id)
+    tracker.touch(1)
+    tracker.delete(2)
+
+    assert tracker.version == 5
+    assert tracker.version_of(1) == 4
+    assert tracker.changes_since(3) == ([1], [2], False, 5)
+    assert tracker.changes_since(0) == ([3, 1], [2], False, 5)
+    assert tracker.changes_since(5) == ([], [], False, 5)
+    assert tracker.changes_since(6) == ([], [], True, 5)
+
+
+def test_tombstones_are_compacted_after_retention():
+    clock = FakeClock()
+    tracker = VersionTracker(retention_seconds=60, clock=clock)
+    tracker.touch(1)
+    tracker.touch(2)
+    tracker.delete(1)  # version 3
+    clock.now += 30
+    tracker.delete(2)  # version 4
+
+    clock.now += 40
+    assert tracker.compact() == 1
+    assert list(tracker.tombstones) == [2]
+    # Version 2 predates the dropped tombstone of id 1, so the client must reset
+    assert tracker.changes_since(2) == ([], [], True, 4)
+    assert tracker.changes_since(3) == ([], [2], False, 4)
+
+
+def test_round_trip_and_reconcile():
+    tracker = VersionTracker()
+    tracker.touch(1)
+    tracker.touch(2)
+    tracker.delete(2)
+    restored = VersionTracker.from_dict({
+        key: ({str(k): v for k, v in value.items()} if isinstance(value, dict) else value)
+        for key, value in tracker.to_dict().items()
+    })
+    assert restored.to_dict() == tracker.to_dict()
+
+    restored.reconcile([2, 3])  # 1 vanished, 2 and 3 appeared
+    assert restored.changes_since(3) == ([2, 3], [1], False, 6)
@@ -0,0 +1 @@
+"""Shared code for the Travel API microservices (auth, destination, users)."""
@@ -0,0 +1,110 @@
+# travel_common/auth_service.py
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from travel_common.config import load_environment
+from travel_common.lazy import lazy_import
+
+# jwt and bcrypt are only loaded when a token or password is first handled
+jwt = lazy_import("jwt")
+bcrypt = lazy_import("bcrypt")
+
+# Load environment variables from .env
+load_environment()
+
+# Threads doing bcrypt work for request handlers. bcrypt releases the GIL, so
+# hashes run in parallel, and the pool size caps how many run at once.
+HASH_WORKERS = int(os.getenv("TRAVEL_HASH_WORKERS", str(os.cpu_count() or 2)))
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    """The shared bcrypt thread pool, created on first use."""
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_pool
+
+
+class AuthService:
+    # Load the secret key from the environment variable
+    SECRET_KEY = os.getenv('JWT_Secret_Key', 'fallback_secret')  # Fallback for safety during testing
+
+    @staticmethod
+    def generate_token(user, exp_minutes=120):
+        """
+        Generate JWT token for the user.
+        :param user: An object or dict with 'email' and 'role' attributes
+        :param exp_minutes: Expiration time in minutes (default is 120 minutes)
+        """
+        if isinstance(user, dict):
+            email, role = user.get('email'), user.get('role')
+            token_version = user.get('token_version', 0)
+        else:
+            email, role = user.email, user.role
+            token_version = getattr(user, 'token_version', 0)
+        payload = {
+            'email': email,
+            'role': role,
+            'tv': token_version,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(minutes=exp_minutes)
+        }
+        return jwt.encode(payload, AuthService.SECRET_KEY, algorithm='HS256')
+
+    @staticmethod
+    def verify_token(token):
+        """
+        Verify and decode JWT token.
+        :param token: The JWT token to verify
+        :return: Decoded payload if valid, or None if invalid/expired
+        """
+        try:
+            return jwt.decode(token, AuthService.SECRET_KEY, algorithms=['HS256'])
+        except jwt.InvalidTokenError:  # Also covers ExpiredSignatureError
+            return None
+
+    @staticmethod
+    def hash_password(password):
+        """
+        Hash password using bcrypt.
+        :param password: Plain text password
+        :return: Hashed password
+        """
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+
+    @staticmethod
+    def verify_password(plain_password, hashed_password):
+        """
+        Verify password against hashed password.
+        :param plain_password: User-provided password
+        :param hashed_password: Stored hashed password (str or bytes)
+        :return: Boolean indicating if the passwords match
+        """
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode('utf-8')
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
+
+    @staticmethod
+    def hash_password_pooled(password):
+        """hash_password() run on the bcrypt pool; blocks until the hash is ready."""
+        return hash_pool().submit(AuthService.hash_password, password).result()
+
+    @staticmethod
+    def verify_password_pooled(plain_password, hashed_password):
+        """verify_password() run on the bcrypt pool; blocks until the check is done."""
+        return hash_pool().submit(AuthService.verify_password, plain_password, hashed_password).result()
+
+    @staticmethod
+    def check_admin_access(token):
+        """
+        Check if the provided token belongs to an admin user.
+        :param token: JWT token
+        :return: Boolean indicating if the user is an admin
+        """
+        payload = AuthService.verify_token(token)
+        role = payload.get('role') if payload else None
+        return isinstance(role, str) and role.lower() == 'admin'
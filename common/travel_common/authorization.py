@@ -0,0 +1,164 @@
+# travel_common/authorization.py
+import base64
+import hashlib
+import hmac
+import os
+import time
+from functools import wraps
+
+from flask import current_app, g, request
+
+from travel_common import serialization
+from travel_common.auth_service import AuthService
+
+# Claims of a token the gateway already verified, signed with the JWT secret
+FORWARDED_CLAIMS_HEADER = "X-Forwarded-Claims"
+# Seconds a signed claims header is accepted after the gateway created it
+FORWARDED_CLAIMS_MAX_AGE = float(os.getenv("TRAVEL_FORWARDED_CLAIMS_MAX_AGE", "30"))
+
+# Role -> permissions granted. Role names are matched case-insensitively so
+# 'admin' and 'Admin' tokens are treated the same.
+POLICY = {
+    "admin": ("destinations:write", "users:read"),
+    "user": (),
+}
+
+_NO_PERMISSIONS = frozenset()
+
+
+def compile_policy(policy):
+    """
+    Compile a role/permission table into frozensets keyed by normalized role.
+    :param policy: Mapping of role name to an iterable of permission names
+    :return: Dict of lowercased role name to frozenset of permissions
+    """
+    return {role.lower(): frozenset(permissions) for role, permissions in policy.items()}
+
+
+_COMPILED_POLICY = compile_policy(POLICY)
+
+
+def is_allowed(claims, permission):
+    """
+    Check whether the claims of a decoded token grant a permission.
+    :param claims: Decoded JWT payload (or None)
+    :param permission: Permission name from the policy table
+    :return: Boolean indicating if the role grants the permission
+    """
+    if not claims:
+        return False
+    role = claims.get("role")
+    if not isinstance(role, str):
+        return False
+    return permission in _COMPILED_POLICY.get(role.lower(), _NO_PERMISSIONS)
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _token_hash(token):
+    return _b64(hashlib.sha256(token.encode("utf-8")).digest()[:16]).decode("ascii")
+
+
+def sign_claims(claims, token, secret=None, now=None):
+    """
+    Encode verified claims for FORWARDED_CLAIMS_HEADER, bound to the token they
+    were decoded from and stamped with the gateway's clock.
+    :return: "<base64 JSON>.<base64 HMAC-SHA256>" string
+    """
+    key = (secret or AuthService.SECRET_KEY).encode("utf-8")
+    envelope = {"claims": claims, "token": _token_hash(token), "ts": int(time.time() if now is None else now)}
+    payload = _b64(serialization.dumps(envelope))
+    return (payload + b"." + _b64(hmac.new(key, payload, hashlib.sha256).digest())).decode("ascii")
+
+
+def verify_forwarded_claims(value, token, secret=None, now=None, max_age=None):
+    """
+    Decode a FORWARDED_CLAIMS_HEADER value.
+    :param token: The request's Authorization header; must be the token the claims were signed for
+    :param max_age: Seconds the header stays valid (FORWARDED_CLAIMS_MAX_AGE by default)
+    :return: The claims, or None if the signature does not match, the header is
+        stale, it belongs to another token, or the token has expired
+    """
+    payload, _, signature = value.encode("ascii", "replace").partition(b".")
+    key = (secret or AuthService.SECRET_KEY).encode("utf-8")
+    if not hmac.compare_digest(_b64(hmac.new(key, payload, hashlib.sha256).digest()), signature):
+        return None
+    try:
+        envelope = serialization.loads(base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4)))
+        claims, token_hash, stamped = envelope["claims"], envelope["token"], envelope["ts"]
+    except (ValueError, TypeError, KeyError, serialization.SerializationError):
+        return None
+    now = time.time() if now is None else now
+    max_age = FORWARDED_CLAIMS_MAX_AGE if max_age is None else max_age
+    if not token or not hmac.compare_digest(token_hash, _token_hash(token)):
+        return None
+    # A little slack for clock skew between the gateway and the service
+    if not -5 <= now - stamped <= max_age:
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    if not isinstance(exp, (int, float)) or exp <= now:
+        return None
+    return claims
+
+
+def current_claims():
+    """
+    Decode the Authorization header once per request.
+    The result is stashed on flask.g so later checks reuse it. Claims the
+    gateway already verified (FORWARDED_CLAIMS_HEADER) are used without
+    decoding the token again. If the app set a token check (see
+    set_token_check), tokens it rejects count as invalid.
+    :return: Decoded payload, or None if the token is missing or invalid
+    """
+    if "auth_claims" not in g:
+        token = request.headers.get("Authorization")
+        forwarded = request.headers.get(FORWARDED_CLAIMS_HEADER)
+        if forwarded and token:
+            claims = verify_forwarded_claims(forwarded, token)
+        else:
+            claims = AuthService.verify_token(token) if token else None
+        check = current_app.extensions.get("token_check")
+        if claims is not None and check is not None and not check(claims):
+            claims = None
+        g.auth_token = token
+        g.auth_claims = claims
+    return g.auth_claims
+
+
+def set_token_check(app, check):
+    """
+    Reject tokens that verify but were revoked, e.g. by a password change.
+    :param check: Callable taking the decoded claims, returning False for revoked tokens
+    """
+    app.extensions["token_check"] = check
+
+
+def require_auth(permission=None, missing=None, invalid=None,
+                 forbidden=("Admin access required", 403)):
+    """
+    Decorate a resource method so it only runs for authorized callers.
+    :param permission: Permission the caller's role must grant, or None for any valid token
+    :param missing: (message, status) when no Authorization header is sent; defaults to invalid
+    :param invalid: (message, status) when the token cannot be decoded; defaults to forbidden
+    :param forbidden: (message, status) when the role lacks the permission
+    """
+    invalid = invalid or forbidden
+    missing = missing or invalid
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            claims = current_claims()
+            if claims is None:
+                message, status = missing if not g.auth_token else invalid
+                return {"error": message}, status
+            if permission is not None and not is_allowed(claims, permission):
+                message, status = forbidden
+                return {"error": message}, status
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,79 @@
+# travel_common/cache.py
+"""
+Read-through cache with per-entry expiry, for values that are read far more
+often than they change (e.g. encoded user profiles).
+
+Misses are cached too (negative caching), for a shorter time, so repeated
+requests for something that does not exist do not reach the store either.
+Writers call invalidate() after a change so readers never see stale data for
+longer than it takes to reload. Least recently used entries are evicted past
+max_entries.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Cached in place of a value the loader reported missing
+MISSING = object()
+
+
+class TTLCache:
+
+    def __init__(self, ttl=30.0, negative_ttl=5.0, max_entries=10_000, clock=time.monotonic):
+        """
+        :param ttl: Seconds a loaded value is served from the cache
+        :param negative_ttl: Seconds a miss is remembered (0 disables negative caching)
+        :param max_entries: Entries kept before the least recently used are evicted
+        :param clock: Monotonic clock used for expiry
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = 0
+        # Bumped by every invalidation, so a load that overlapped one is not stored
+        self._generation = 0
+
+    def get(self, key, loader):
+        """
+        Cached value for key, calling loader(key) when it is absent or expired.
+        :param loader: Returns the value, or MISSING if there is none
+        :return: The value, or MISSING
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            generation = self._generation
+
+        # Loaded outside the lock so one slow load does not block other keys
+        value = loader(key)
+        ttl = self.negative_ttl if value is MISSING else self.ttl
+        if ttl > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return value
+                self._entries[key] = (value, now + ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
@@ -0,0 +1,102 @@
+# travel_common/changes.py
+"""
+In-process change log (change data capture) for the destination catalogue.
+
+Every mutation is published as a ChangeEvent with a sequence number into a
+fixed-size ring buffer. Clients remember the last sequence they saw and ask
+for the events after it instead of downloading the whole catalogue again.
+When a client falls further behind than the buffer holds, it is told to
+reset (re-fetch the full list) instead of silently missing changes.
+"""
+import threading
+import time
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class ChangeEvent:
+    __slots__ = ("seq", "type", "id", "data", "timestamp")
+
+    def __init__(self, seq, type, id, data=None, timestamp=None):
+        self.seq = seq
+        self.type = type
+        self.id = id
+        self.data = data
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def to_dict(self):
+        return {
+            "seq": self.seq,
+            "type": self.type,
+            "id": self.id,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+    def __repr__(self):
+        return f"ChangeEvent(seq={self.seq}, type={self.type!r}, id={self.id!r})"
+
+
+class ChangeLog:
+    """Ring buffer of the most recent change events; safe to use from many threads."""
+
+    def __init__(self, capacity=1024):
+        """
+        :param capacity: Number of events kept; older events are overwritten
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._last_seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    @property
+    def oldest_seq(self):
+        """Sequence number of the oldest event still in the buffer."""
+        return max(1, self._last_seq - self.capacity + 1)
+
+    def publish(self, type, id, data=None):
+        """
+        Append an event and wake up waiting readers.
+        :return: The published ChangeEvent
+        """
+        with self._condition:
+            self._last_seq += 1
+            event = ChangeEvent(self._last_seq, type, id, data)
+            self._slots[event.seq % self.capacity] = event
+            self._condition.notify_all()
+        return event
+
+    def since(self, seq, limit=None):
+        """
+        Events published after seq, oldest first.
+        :param seq: Last sequence number the client has seen (0 for none)
+        :param limit: Maximum number of events returned
+        :return: (events, reset) where reset is True when events after seq were
+            already overwritten and the client has to re-fetch everything
+        """
+        with self._condition:
+            return self._since(seq, limit)
+
+    def _since(self, seq, limit):
+        # A seq from the future means this process restarted and numbering began again
+        if seq < self.oldest_seq - 1 or seq > self._last_seq:
+            return [], True
+        end = self._last_seq if limit is None else min(self._last_seq, seq + limit)
+        slots, capacity = self._slots, self.capacity
+        return [slots[n % capacity] for n in range(seq + 1, end + 1)], False
+
+    def wait(self, seq, timeout=None, limit=None):
+        """
+        Like since(), but block up to timeout seconds until there is an event after seq.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_seq != seq, timeout)
+            return self._since(seq, limit)
@@ -0,0 +1,45 @@
+# travel_common/config.py
+import os
+
+_environment_loaded = False
+
+
+def load_environment():
+    """
+    Load the service's .env file into os.environ, once per process.
+    The file is looked up from the working directory the service runs in.
+    """
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv(usecwd=True))
+    _environment_loaded = True
+
+
+def swagger_doc_path(default="/swagger"):
+    """
+    Path for the Swagger UI, or False when TRAVEL_SWAGGER_DOCS=0 turns it off.
+    flask_restx builds the spec itself on the first /swagger.json request.
+    """
+    load_environment()
+    if os.getenv("TRAVEL_SWAGGER_DOCS", "1").lower() in ("0", "false", "no"):
+        return False
+    return default
+
+
+def configure_proxies(app):
+    """
+    Trust X-Forwarded-For from the TRUSTED_PROXIES proxies in front of the app
+    (the gateway counts as one), so request.remote_addr is the client's address
+    and per-IP limits apply per client. Keep it at 0 (the default) when clients
+    can reach the app directly, or they could send any address they like.
+    """
+    if app.config.get("TRUSTED_PROXIES") is None:
+        load_environment()
+        app.config["TRUSTED_PROXIES"] = int(os.getenv("TRUSTED_PROXIES", "0"))
+    if app.config["TRUSTED_PROXIES"]:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["TRUSTED_PROXIES"])
@@ -0,0 +1,420 @@
+# travel_common/destination_service.py
+import os
+import threading
+from travel_common import serialization, snapshot
+from travel_common.changes import CREATED, DELETED, UPDATED, ChangeLog
+from travel_common.geo import GridIndex, validate_coordinates
+from travel_common.indexes import DuplicateKeyError, HashIndex, SortedIndex, normalize
+from travel_common.models.destination import Destination
+from travel_common.versions import VersionTracker
+
+
+class VersionConflictError(ValueError):
+    """Raised when an If-Match precondition does not hold (the destination changed meanwhile)."""
+
+    def __init__(self, dest_id, current_version):
+        super().__init__("Destination was modified by another request")
+        self.dest_id = dest_id
+        self.current_version = current_version
+
+
+def _name_key(destination):
+    return normalize(destination.name) or ""
+
+
+def _location_key(destination):
+    return normalize(destination.location) or ""
+
+
+class DestinationService:
+    _instance = None
+    # Number of per-destination locks; ids are spread over them by hash
+    lock_stripes = 64
+
+    # Path to the JSON file; each service points this at its own data file
+    destinations_file = "destinations.json"
+    # Persistence format: "json", or "snapshot" for a lazily decoded binary file
+    storage_format = os.getenv("TRAVEL_STORAGE_FORMAT", "json")
+    # Number of change events kept for clients syncing incrementally
+    change_log_capacity = int(os.getenv("TRAVEL_CHANGE_LOG_SIZE", "1024"))
+    # Seconds tombstones of deleted destinations are kept for delta sync (default 7 days)
+    tombstone_retention = float(os.getenv("TRAVEL_TOMBSTONE_RETENTION", str(7 * 24 * 3600)))
+    # Reject a second destination whose normalized name matches an existing one
+    unique_names = os.getenv("TRAVEL_UNIQUE_DESTINATION_NAMES", "").lower() in ("1", "true", "yes")
+    # Cell size of the spatial index, in degrees (1 degree of latitude is about 111 km)
+    geo_cell_degrees = float(os.getenv("TRAVEL_GEO_CELL_DEGREES", "1.0"))
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(DestinationService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, destinations_file=None):
+        if destinations_file is not None:
+            self.destinations_file = destinations_file
+        self.destinations = self._load_destinations_from_file()
+        self.next_id = self._get_next_id()
+        self.versions = self._load_versions()
+        # Catalogue version the files on disk are known to cover
+        self._saved_version = self.versions.version
+        # Secondary indexes are built on first use, so a lazily loaded snapshot stays lazy
+        self._indexes = None
+        # The singleton is re-initialised on every DestinationService() call; keep
+        # the change log so sequence numbers handed to clients stay valid
+        if getattr(self, "changes", None) is None:
+            self.changes = ChangeLog(self.change_log_capacity)
+            # Edits of one destination are checked and applied under its stripe lock,
+            # so edits of different destinations do not wait for each other. The
+            # save lock only covers the in-memory change; the files are written
+            # after it is released, under the write lock.
+            self._locks = tuple(threading.Lock() for _ in range(self.lock_stripes))
+            self._save_lock = threading.RLock()
+            self._write_lock = threading.Lock()
+
+    @property
+    def snapshot_file(self):
+        """Path of the binary snapshot kept next to the JSON file."""
+        return os.path.splitext(self.destinations_file)[0] + ".snap"
+
+    @property
+    def versions_file(self):
+        """Path of the per-record versions and tombstones kept next to the JSON file."""
+        return os.path.splitext(self.destinations_file)[0] + ".versions.json"
+
+    def _load_destinations_from_file(self):
+        """Load destinations from the snapshot or JSON file if it exists."""
+        if self.storage_format == "snapshot" and os.path.exists(self.snapshot_file):
+            # Records are decoded on first access instead of all up front
+            return snapshot.load_snapshot(self.snapshot_file, Destination)
+        if os.path.exists(self.destinations_file):
+            with open(self.destinations_file, "rb") as file:
+                # Decode the records straight into Destination objects
+                return serialization.decode_mapping(file.read(), Destination, key_type=int)
+        return {}
+
+    def _load_versions(self):
+        """Load the version tracker and match it to the loaded destinations."""
+        versions = VersionTracker(self.tombstone_retention)
+        if os.path.exists(self.versions_file):
+            with open(self.versions_file, "rb") as file:
+                try:
+                    versions = VersionTracker.from_dict(
+                        serialization.loads(file.read()), retention_seconds=self.tombstone_retention
+                    )
+                except serialization.SerializationError:
+                    pass  # Start over; clients holding old versions are told to reset
+        versions.reconcile(self.destinations.keys())
+        return versions
+
+    def _save_destinations_to_file(self, force=False):
+        """
+        Save destinations to the snapshot or JSON file, and their versions.
+
+        Called after an edit, outside the edit's locks. Concurrent callers share
+        saves: a call returns once a save covering every change made before it
+        has finished, so while one save is writing, the edits queued behind it
+        are all covered by the next one.
+        :param force: Write even if the files already cover the current version
+        """
+        wanted = self.versions.version
+        with self._write_lock:
+            if not force and self._saved_version >= wanted:
+                return
+            with self._save_lock:
+                # Records are replaced, never changed in place, so a shallow copy is a consistent view
+                version = self.versions.version
+                versions = self.versions.to_dict()
+                records = self.destinations.copy()
+            if self.storage_format == "snapshot":
+                snapshot.save_snapshot(self.snapshot_file, records)
+            else:
+                data = serialization.dumps(
+                    {dest_id: dest.to_dict() for dest_id, dest in records.items()}, pretty=True
+                )
+                snapshot.write_atomic(self.destinations_file, (data,))
+            snapshot.write_atomic(self.versions_file, (serialization.dumps(versions),))
+            self._saved_version = version
+
+    def flush(self):
+        """Write the destinations and their versions out in full (at shutdown)."""
+        self._save_destinations_to_file(force=True)
+
+    @property
+    def indexes(self):
+        """Secondary indexes: name (hash), name_sorted (sorted), location (hash) and geo (grid)."""
+        if self._indexes is None:
+            with self._save_lock:
+                if self._indexes is None:
+                    indexes = {
+                        "name": HashIndex(_name_key, unique=self.unique_names, label="destination name"),
+                        "name_sorted": SortedIndex(_name_key),
+                        "location": HashIndex(_location_key),
+                        "geo": GridIndex(self.geo_cell_degrees),
+                    }
+                    for dest_id, destination in self.destinations.items():
+                        for name in ("name", "location", "geo"):
+                            indexes[name].add(dest_id, destination)
+                    indexes["name_sorted"].build(self.destinations.items())
+                    self._indexes = indexes
+        return self._indexes
+
+    def _index(self, dest_id, destination):
+        if self._indexes is not None:
+            for index in self._indexes.values():
+                index.add(dest_id, destination)
+
+    def _unindex(self, dest_id, destination):
+        if self._indexes is not None:
+            for index in self._indexes.values():
+                index.remove(dest_id, destination)
+
+    def _check_unique_name(self, dest_id, name):
+        """
+        Enforce unique names when enabled.
+        :raises DuplicateKeyError: If another destination has the same normalized name
+        """
+        if self.unique_names:
+            self.indexes["name"].check(dest_id, normalize(name) or "")
+
+    def _lock_for(self, dest_id):
+        return self._locks[hash(dest_id) % len(self._locks)]
+
+    def _check_exists(self, dest_id, expected_version):
+        """
+        Check a destination exists and, if expected_version is given, still has that version.
+        Must be called with the destination's lock held.
+        """
+        if dest_id not in self.destinations:
+            raise ValueError("Destination not found")
+        if expected_version is not None:
+            current_version = self.versions.version_of(dest_id)
+            if current_version != expected_version:
+                raise VersionConflictError(dest_id, current_version)
+
+    def _get_next_id(self):
+        """Get the next ID based on the existing destinations."""
+        return max(self.destinations.keys(), default=0) + 1
+
+    def add_destination(self, name, description, location, latitude=None, longitude=None):
+        """Add a new destination."""
+        validate_coordinates(latitude, longitude)
+        with self._save_lock:
+            self._check_unique_name(self.next_id, name)
+            destination = Destination(
+                id=self.next_id,
+                name=name,
+                description=description,
+                location=location,
+                latitude=latitude,
+                longitude=longitude
+            )
+            self.destinations[self.next_id] = destination
+            self._index(destination.id, destination)
+            self.versions.touch(destination.id)
+            self.next_id += 1
+            # Published under the save lock so the feed lists changes in the order they were applied
+            self.changes.publish(CREATED, destination.id, destination.to_dict())
+        self._save_destinations_to_file()  # Save after adding
+        return destination
+
+    def add_destinations(self, records):
+        """
+        Add many destinations and save the file once.
+        :param records: Iterable of dicts with name, description, location and
+            optionally latitude and longitude
+        :return: List of the created destinations
+        """
+        created = []
+        with self._save_lock:
+            records = list(records)
+            for record in records:
+                validate_coordinates(record.get("latitude"), record.get("longitude"))
+            if self.unique_names:
+                # Check the whole batch first so a duplicate adds nothing
+                seen = set()
+                for record in records:
+                    key = normalize(record["name"]) or ""
+                    self._check_unique_name(None, key)
+                    if key in seen:
+                        raise DuplicateKeyError(key, None, "destination name")
+                    seen.add(key)
+            for record in records:
+                destination = Destination(
+                    id=self.next_id,
+                    name=record["name"],
+                    description=record["description"],
+                    location=record["location"],
+                    latitude=record.get("latitude"),
+                    longitude=record.get("longitude")
+                )
+                self.destinations[self.next_id] = destination
+                self._index(destination.id, destination)
+                self.versions.touch(destination.id)
+                self.next_id += 1
+                created.append(destination)
+            for destination in created:
+                self.changes.publish(CREATED, destination.id, destination.to_dict())
+        if created:
+            self._save_destinations_to_file()
+        return created
+
+    def update_destination(self, dest_id, name, description, location,
+                           latitude=None, longitude=None, expected_version=None, versioned=False):
+        """
+        Replace a destination entirely.
+        :param expected_version: Version the caller last saw (If-Match); None skips the check
+        :param versioned: Return (record dict, version) taken under the destination's lock instead
+        :raises VersionConflictError: If the destination changed since expected_version
+        """
+        validate_coordinates(latitude, longitude)
+        with self._lock_for(dest_id):
+            self._check_exists(dest_id, expected_version)
+            destination = Destination(
+                id=dest_id, name=name, description=description, location=location,
+                latitude=latitude, longitude=longitude
+            )
+            with self._save_lock:
+                self._check_unique_name(dest_id, name)
+                self._unindex(dest_id, self.destinations[dest_id])
+                self.destinations[dest_id] = destination
+                self._index(dest_id, destination)
+                version = self.versions.touch(dest_id)
+                record = destination.to_dict()
+                self.changes.publish(UPDATED, dest_id, record)
+        self._save_destinations_to_file()
+        if versioned:
+            return record, version
+        return destination
+
+    def partial_update_destination(self, dest_id, updates, expected_version=None, versioned=False):
+        """
+        Partially update a destination.
+        :param expected_version: Version the caller last saw (If-Match); None skips the check
+        :param versioned: Return (record dict, version) taken under the destination's lock instead
+        :raises VersionConflictError: If the destination changed since expected_version
+        """
+        with self._lock_for(dest_id):
+            self._check_exists(dest_id, expected_version)
+            current = self.destinations[dest_id]
+            validate_coordinates(updates.get("latitude", current.latitude),
+                                 updates.get("longitude", current.longitude))
+            # Build a new object rather than changing the stored one, so a save
+            # copying the store meanwhile sees either version whole
+            fields = current.to_dict()
+            fields.update((key, value) for key, value in updates.items() if key in Destination.__slots__)
+            destination = Destination.from_dict(fields)
+            with self._save_lock:
+                if "name" in updates:
+                    self._check_unique_name(dest_id, updates["name"])
+                # Index entries are keyed by the old values
+                self._unindex(dest_id, current)
+                self.destinations[dest_id] = destination
+                self._index(dest_id, destination)
+
+                version = self.versions.touch(dest_id)
+                record = destination.to_dict()
+                self.changes.publish(UPDATED, dest_id, record)
+        self._save_destinations_to_file()
+        if versioned:
+            return record, version
+        return destination
+
+    def get_destination(self, dest_id, versioned=False):
+        """
+        Retrieve one destination by id.
+        :param versioned: Return (record dict, version) taken under the destination's lock
+            instead, so the record and its version (ETag) describe the same edit
+        """
+        if versioned:
+            with self._lock_for(dest_id):
+                self._check_exists(dest_id, None)
+                return self.destinations[dest_id].to_dict(), self.versions.version_of(dest_id)
+        destination = self.destinations.get(dest_id)
+        if destination is None:
+            raise ValueError("Destination not found")
+        return destination
+
+    def get_destinations(self, dest_ids):
+        """
+        Retrieve many destinations by id in one call.
+        :return: (destinations in the requested order, ids that do not exist)
+        """
+        found, missing = [], []
+        for dest_id in dest_ids:
+            destination = self.destinations.get(dest_id)
+            if destination is None:
+                missing.append(dest_id)
+            else:
+                found.append(destination)
+        return found, missing
+
+    def find_by_location(self, location):
+        """Destinations whose normalized location matches, in id order."""
+        with self._save_lock:
+            ids = self.indexes["location"].get(normalize(location) or "")
+        return [dest for dest in map(self.destinations.get, sorted(ids)) if dest is not None]
+
+    def find_by_name_prefix(self, prefix, limit=None):
+        """Destinations whose normalized name starts with prefix, in name order."""
+        # Read under the save lock, which every change of the indexes holds
+        with self._save_lock:
+            ids = self.indexes["name_sorted"].prefix(normalize(prefix) or "", limit)
+        return [dest for dest in map(self.destinations.get, ids) if dest is not None]
+
+    def find_nearby(self, latitude, longitude, radius_km, limit=None):
+        """
+        Destinations with coordinates within radius_km of a point, nearest first.
+        :return: List of (destination, distance_km)
+        """
+        validate_coordinates(latitude, longitude)
+        nearby = self.indexes["geo"].nearby(latitude, longitude, radius_km, limit, lock=self._save_lock)
+        # A destination deleted since the index was read is left out
+        found = [(self.destinations.get(dest_id), distance) for dest_id, distance in nearby]
+        return [(dest, distance) for dest, distance in found if dest is not None]
+
+    def get_all_destinations(self):
+        """Retrieve all destinations."""
+        return list(self.destinations.values())
+
+    def get_catalogue(self):
+        """
+        Retrieve all destinations with the catalogue version they cover.
+        :return: (destinations, version); the version is read first, so a change
+            landing meanwhile is in the list and also in the next delta, never missed
+        """
+        # Every write changes the records before bumping the version
+        version = self.versions.version
+        return self.get_all_destinations(), version
+
+    def changes_since(self, version):
+        """
+        Destinations changed and deleted after a catalogue version (delta sync).
+        :param version: Catalogue version the client last synced at
+        :return: Dict with the current version, changed destinations, deleted ids
+            and a reset flag; on reset, changed holds every destination
+        """
+        changed, deleted, reset, current = self.versions.changes_since(version)
+        if reset:
+            return {"version": current, "changed": self.get_all_destinations(),
+                    "deleted": [], "reset": True}
+        return {
+            "version": current,
+            "changed": [dest for dest in map(self.destinations.get, changed) if dest is not None],
+            "deleted": deleted,
+            "reset": False,
+        }
+
+    def delete_destination(self, dest_id, expected_version=None):
+        """
+        Delete a specific destination.
+        :param expected_version: Version the caller last saw (If-Match); None skips the check
+        :raises VersionConflictError: If the destination changed since expected_version
+        """
+        with self._lock_for(dest_id):
+            self._check_exists(dest_id, expected_version)
+            with self._save_lock:
+                self._unindex(dest_id, self.destinations.pop(dest_id))
+                self.versions.delete(dest_id)
+                self.changes.publish(DELETED, dest_id)
+        self._save_destinations_to_file()  # Save after deletion
+        return True
@@ -0,0 +1,154 @@
+# travel_common/gateway.py
+"""
+API gateway in front of the three services.
+
+Requests are routed by path prefix (/users, /destinations, /auth) to the
+owning service over pooled keep-alive connections. The JWT is verified once
+here: a request with an invalid token is answered with 401 without reaching a
+service, and a valid token's claims are passed on in a signed header so the
+service does not decode the token again. The users service is also asked
+whether the token was revoked (password change, deleted account), with the
+answer cached for GATEWAY_TOKEN_CHECK_TTL seconds, so every service honours
+revocation and not only the users service. Bodies are streamed in both directions,
+so bulk uploads and Server-Sent Events pass through unbuffered.
+
+Targets are URLs, or WSGI apps to run the whole stack in one process (tests).
+"""
+import os
+
+from flask import Flask, Response, request
+
+from travel_common.auth_service import AuthService
+from travel_common.authorization import FORWARDED_CLAIMS_HEADER, sign_claims
+from travel_common.cache import MISSING, TTLCache
+from travel_common.config import configure_proxies
+from travel_common.http_pool import HOP_BY_HOP_HEADERS, UpstreamError, transport_for
+from travel_common.service_client import ServiceError, UsersClient
+
+
+def default_routes():
+    """(path prefix, upstream, strip prefix) for each service, from the environment."""
+    return [
+        ("/users", os.getenv("TRAVEL_USERS_URL", "http://127.0.0.1:5003"), False),
+        ("/destinations", os.getenv("TRAVEL_DESTINATIONS_URL", "http://127.0.0.1:5002"), False),
+        # The auth service also serves /users and /destinations paths, so it sits under /auth
+        ("/auth", os.getenv("TRAVEL_AUTH_URL", "http://127.0.0.1:5001"), True),
+    ]
+
+
+# Request headers the gateway sets itself
+_DROPPED_REQUEST_HEADERS = HOP_BY_HOP_HEADERS | {"host", FORWARDED_CLAIMS_HEADER.lower()}
+# Response headers recomputed by the gateway's own server
+_DROPPED_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {"content-length", "date", "server"}
+
+
+class Route:
+    __slots__ = ("prefix", "transport", "strip_prefix")
+
+    def __init__(self, prefix, transport, strip_prefix=False):
+        self.prefix = prefix.rstrip("/")
+        self.transport = transport
+        self.strip_prefix = strip_prefix
+
+    def matches(self, path):
+        return path == self.prefix or path.startswith(self.prefix + "/")
+
+    def upstream_path(self, path):
+        return (path[len(self.prefix):] or "/") if self.strip_prefix else path
+
+
+def revocation_check(users_target, ttl=5.0, timeout=5.0):
+    """
+    A check asking the users service whether a token is still current.
+    :param users_target: URL or WSGI app of the users service
+    :param ttl: Seconds an answer (either way) is cached per token
+    :return: Callable taking a token, returning False for revoked tokens; raises
+        UpstreamError or ServiceError when the users service cannot answer
+    """
+    client = UsersClient(users_target, timeout=timeout, retries=1)
+    answers = TTLCache(ttl, ttl)
+
+    def load(token):
+        return True if client.verify_token(token) is not None else MISSING
+
+    def check(token):
+        return answers.get(token, load) is not MISSING
+
+    return check
+
+
+def create_gateway(routes=None, config=None, token_check=None):
+    """
+    Build the gateway app.
+    :param routes: (prefix, URL or WSGI app, strip prefix) tuples; defaults to default_routes()
+    :param config: Optional config object (GATEWAY_POOL_SIZE, GATEWAY_TIMEOUT,
+        GATEWAY_TOKEN_CHECK_TTL, TRUSTED_PROXIES)
+    :param token_check: Callable taking a token, False if it was revoked; by default
+        a revocation_check() against the /users route (none without that route)
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(
+        # Idle keep-alive connections kept per service
+        GATEWAY_POOL_SIZE=int(os.getenv("GATEWAY_POOL_SIZE", "20")),
+        # Seconds to connect and between reads; above the longest long-poll (30 s)
+        GATEWAY_TIMEOUT=float(os.getenv("GATEWAY_TIMEOUT", "60")),
+        # Seconds the users service's answer on whether a token was revoked is reused
+        GATEWAY_TOKEN_CHECK_TTL=float(os.getenv("GATEWAY_TOKEN_CHECK_TTL", "5")),
+    )
+    if config:
+        app.config.from_object(config)
+    # When the gateway itself sits behind a load balancer
+    configure_proxies(app)
+
+    routes = routes if routes is not None else default_routes()
+    pool_options = {"max_size": app.config["GATEWAY_POOL_SIZE"], "timeout": app.config["GATEWAY_TIMEOUT"]}
+    route_table = [Route(prefix, transport_for(target, **pool_options), strip) for prefix, target, strip in routes]
+    app.extensions["gateway_routes"] = route_table
+    if token_check is None:
+        users_target = next((target for prefix, target, strip in routes if prefix.rstrip("/") == "/users"), None)
+        if users_target is not None:
+            token_check = revocation_check(users_target, app.config["GATEWAY_TOKEN_CHECK_TTL"])
+
+    @app.route("/", defaults={"path": ""}, methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+    @app.route("/<path:path>", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+    def proxy(path):
+        route = next((r for r in route_table if r.matches(request.path)), None)
+        if route is None:
+            return {"error": "Not found"}, 404
+
+        headers = {name: value for name, value in request.headers.items()
+                   if name.lower() not in _DROPPED_REQUEST_HEADERS}
+        token = request.headers.get("Authorization")
+        if token:
+            claims = AuthService.verify_token(token)
+            if claims is None:
+                return {"error": "Invalid or expired token"}, 401
+            if token_check is not None:
+                try:
+                    current = token_check(token)
+                except (UpstreamError, ServiceError) as e:
+                    # Fail closed: a revoked token must not get through while the users service is down
+                    app.logger.warning("Token check unavailable: %s", e)
+                    return {"error": "Service unavailable"}, 502
+                if not current:
+                    return {"error": "Invalid or expired token"}, 401
+            headers[FORWARDED_CLAIMS_HEADER] = sign_claims(claims, token)
+        headers["X-Forwarded-For"] = request.remote_addr or ""
+
+        upstream_path = route.upstream_path(request.path)
+        if request.query_string:
+            upstream_path += "?" + request.query_string.decode("latin-1")
+        # Stream the request body unless it is known to be empty
+        body = request.stream if request.content_length or "Transfer-Encoding" in request.headers else None
+        try:
+            upstream = route.transport.request(request.method, upstream_path, body=body, headers=headers)
+        except UpstreamError as e:
+            app.logger.warning("Upstream unavailable: %s", e)
+            return {"error": "Service unavailable"}, 502
+
+        response_headers = [(name, value) for name, value in upstream.headers
+                            if name.lower() not in _DROPPED_RESPONSE_HEADERS]
+        return Response(upstream.iter_chunks(), status=upstream.status, headers=response_headers,
+                        direct_passthrough=True)
+
+    return app
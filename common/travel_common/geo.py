@@ -0,0 +1,163 @@
+# travel_common/geo.py
+"""
+Great-circle distances and a grid spatial index for "nearby" queries.
+
+GridIndex buckets points into cells of cell_degrees x cell_degrees. A query
+only visits the cells overlapping the search radius (or, for very large
+radii, only the occupied cells), then computes exact haversine distances for
+the candidates found there. With numpy installed and enough candidates, the
+distances are computed in one vectorized pass; otherwise in plain Python.
+"""
+import heapq
+import importlib.util
+import math
+from contextlib import nullcontext
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Below this many candidates numpy's call overhead outweighs the vectorized loop
+VECTORIZE_THRESHOLD = 64
+
+_numpy = None
+
+
+def _get_numpy():
+    """numpy if installed (imported on first use so it never slows start-up), else None."""
+    global _numpy
+    if _numpy is None:
+        if importlib.util.find_spec("numpy") is None:
+            _numpy = False
+        else:
+            import numpy
+
+            _numpy = numpy
+    return _numpy or None
+
+
+class CoordinateError(ValueError):
+    """Raised for a missing half of a coordinate pair or an out-of-range value."""
+
+
+def validate_coordinates(latitude, longitude):
+    """
+    Check a latitude/longitude pair; both must be given or both omitted.
+    :raises CoordinateError: If only one is given or a value is out of range
+    """
+    if latitude is None and longitude is None:
+        return
+    if latitude is None or longitude is None:
+        raise CoordinateError("Both latitude and longitude are required")
+    if not -90 <= latitude <= 90:
+        raise CoordinateError("Latitude must be between -90 and 90")
+    if not -180 <= longitude <= 180:
+        raise CoordinateError("Longitude must be between -180 and 180")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_many_km(latitude, longitude, points):
+    """
+    Distances from one point to many (lat, lon) points, in kilometres.
+    Vectorized with numpy when it is installed and there are enough points.
+    """
+    np = _get_numpy() if len(points) >= VECTORIZE_THRESHOLD else None
+    if np is None:
+        return [haversine_km(latitude, longitude, lat, lon) for lat, lon in points]
+    coords = np.radians(np.asarray(points, dtype=float))
+    phi1 = math.radians(latitude)
+    a = (np.sin((coords[:, 0] - phi1) / 2) ** 2
+         + math.cos(phi1) * np.cos(coords[:, 0])
+         * np.sin((coords[:, 1] - math.radians(longitude)) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))).tolist()
+
+
+class GridIndex:
+    """Points bucketed into a latitude/longitude grid."""
+
+    def __init__(self, cell_degrees=1.0):
+        """
+        :param cell_degrees: Cell size; roughly the typical search radius works best
+        """
+        self.cell_degrees = cell_degrees
+        self._lon_cells = math.ceil(360 / cell_degrees)
+        self._cells = {}
+        self._size = 0
+
+    def _cell(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_degrees),
+                math.floor((longitude + 180) / self.cell_degrees) % self._lon_cells)
+
+    def add(self, record_id, record):
+        """Index a record with latitude/longitude attributes (records without them are skipped)."""
+        if record.latitude is None or record.longitude is None:
+            return
+        cell = self._cells.setdefault(self._cell(record.latitude, record.longitude), {})
+        if record_id not in cell:
+            self._size += 1
+        cell[record_id] = (record.latitude, record.longitude)
+
+    def remove(self, record_id, record):
+        if record.latitude is None or record.longitude is None:
+            return
+        key = self._cell(record.latitude, record.longitude)
+        cell = self._cells.get(key)
+        if cell is not None and cell.pop(record_id, None) is not None:
+            self._size -= 1
+            if not cell:
+                del self._cells[key]
+
+    def _candidate_cells(self, latitude, longitude, radius_km):
+        dlat = radius_km / KM_PER_DEGREE
+        lat_low, lat_high = max(-90.0, latitude - dlat), min(90.0, latitude + dlat)
+        # Longitude degrees shrink towards the poles; near them every longitude is in range
+        widest = max(abs(lat_low), abs(lat_high))
+        cos_lat = math.cos(math.radians(widest))
+        dlon = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+
+        row_low, row_high = (math.floor(lat_low / self.cell_degrees),
+                             math.floor(lat_high / self.cell_degrees))
+        if dlon >= 180:
+            columns = range(self._lon_cells)
+        else:
+            col_low = math.floor((longitude - dlon + 180) / self.cell_degrees)
+            col_high = math.floor((longitude + dlon + 180) / self.cell_degrees)
+            columns = [col % self._lon_cells for col in range(col_low, col_high + 1)]
+            columns = list(dict.fromkeys(columns))
+
+        if (row_high - row_low + 1) * len(columns) > len(self._cells):
+            # Fewer occupied cells than cells in range: filter the occupied ones instead
+            rows = range(row_low, row_high + 1)
+            wanted = set(columns)
+            return [key for key in self._cells if key[0] in rows and key[1] in wanted]
+        return [(row, col) for row in range(row_low, row_high + 1) for col in columns]
+
+    def nearby(self, latitude, longitude, radius_km, limit=None, lock=None):
+        """
+        The points within radius_km of a point, nearest first.
+        :param limit: Maximum number of results (k nearest)
+        :param lock: Lock the index's writers hold; held while the candidates are
+            gathered, but not while their distances are computed
+        :return: List of (record_id, distance_km)
+        """
+        candidates = []
+        with lock or nullcontext():
+            for key in self._candidate_cells(latitude, longitude, radius_km):
+                cell = self._cells.get(key)
+                if cell:
+                    candidates.extend(cell.items())
+        ids = [record_id for record_id, _ in candidates]
+        points = [point for _, point in candidates]
+        distances = haversine_many_km(latitude, longitude, points)
+        within = [(distance, record_id) for record_id, distance in zip(ids, distances)
+                  if distance <= radius_km]
+        nearest = heapq.nsmallest(limit, within) if limit is not None else sorted(within)
+        return [(record_id, distance) for distance, record_id in nearest]
+
+    def __len__(self):
+        return self._size
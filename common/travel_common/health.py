@@ -0,0 +1,125 @@
+# travel_common/health.py
+"""
+Liveness and readiness probes with a warm-up phase.
+
+/healthz answers 200 as long as the process serves requests. /readyz answers
+503 until every warm-up step has run (stores loaded, indexes built, caches
+primed, a request served in process), so an orchestrator only routes traffic
+to a warm process. Warm-up runs once, in a background thread, started by the
+first readiness probe or explicitly with Readiness.start() (the services call
+it before app.run). Once a shutdown starts (travel_common.lifecycle) /readyz
+reports "draining" again.
+"""
+import threading
+import time
+
+
+class Readiness:
+
+    def __init__(self):
+        self.steps = []
+        self.state = "cold"  # cold -> warming -> ready (or failed)
+        self.timings = {}
+        self.error = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def add_step(self, name, func):
+        """Add a warm-up step; steps run in the order they were added."""
+        self.steps.append((name, func))
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def warm_up(self):
+        """Run the warm-up steps in this thread (once); later calls wait for the first."""
+        with self._lock:
+            first = self.state == "cold"
+            if first:
+                self.state = "warming"
+        if not first:
+            self._done.wait()
+            return self.ready
+        try:
+            for name, func in self.steps:
+                started = time.perf_counter()
+                func()
+                self.timings[name] = round(time.perf_counter() - started, 4)
+            self.state = "ready"
+        except Exception as e:
+            self.error = f"{name}: {e}"
+            self.state = "failed"
+        finally:
+            self._done.set()
+        return self.ready
+
+    def start(self):
+        """Start warming up in a background thread, unless already started."""
+        if self.state == "cold":
+            threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+    def wait(self, timeout=None):
+        """Block until warm-up finished. :return: Whether the service is ready"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def to_dict(self):
+        data = {"status": self.state, "warmup_seconds": self.timings}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+def warm_up_request(app, *paths):
+    """A warm-up step sending a GET to each path through the whole app, in process."""
+    def step():
+        with app.test_client() as client:
+            for path in paths:
+                client.get(path).close()
+    return step
+
+
+def warm_up_unless_lazy(service, func):
+    """
+    A warm-up step calling func(), skipped when the service loads a snapshot:
+    its records are decoded on first access, and building indexes or encoding
+    the catalogue up front would decode the whole store.
+    """
+    def step():
+        if service.storage_format != "snapshot":
+            func()
+    return step
+
+
+def warm_up_auth():
+    """A warm-up step importing jwt and bcrypt and computing the dummy hash for unknown logins."""
+    from travel_common.auth_service import AuthService
+    from travel_common.login_guard import dummy_password_hash
+
+    AuthService.verify_token(AuthService.generate_token({"email": "warm-up@localhost", "role": "user"}))
+    dummy_password_hash()
+
+
+def register_health(app, readiness=None):
+    """
+    Add /healthz and /readyz to an app.
+    :param readiness: Readiness with the service's warm-up steps (a new, empty one by default)
+    :return: The Readiness, also stored as app.extensions["readiness"]
+    """
+    readiness = readiness if readiness is not None else Readiness()
+    app.extensions["readiness"] = readiness
+
+    def healthz():
+        return {"status": "ok"}, 200
+
+    def readyz():
+        lifecycle = app.extensions.get("lifecycle")
+        if lifecycle is not None and lifecycle.draining:
+            return {"status": "draining"}, 503
+        readiness.start()
+        return readiness.to_dict(), 200 if readiness.ready else 503
+
+    app.add_url_rule("/healthz", "healthz", healthz)
+    app.add_url_rule("/readyz", "readyz", readyz)
+    return readiness
@@ -0,0 +1,218 @@
+# travel_common/http_pool.py
+"""
+Keep-alive HTTP/1.1 connection pools for calls between the services.
+
+Opening a TCP (and TLS) connection per request costs more than most of the
+requests themselves. A ConnectionPool keeps up to max_size idle connections to
+one upstream and hands them out again; a connection the upstream has closed in
+the meantime is detected before reuse and replaced. LocalTransport has the same
+interface but calls a WSGI app in the same process, for tests.
+"""
+import http.client
+import select
+import threading
+from urllib.parse import urlsplit
+
+from werkzeug.test import Client
+
+# Headers that only describe one connection and must not be passed on by a proxy
+HOP_BY_HOP_HEADERS = frozenset((
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade",
+))
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream cannot be reached or does not answer in time."""
+
+
+def _connection_dropped(conn):
+    """Whether an idle connection was closed by the other side (it became readable)."""
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)  # Idle connections only become readable at EOF
+
+
+class PooledResponse:
+    """An upstream response; its connection goes back to the pool once the body is read."""
+
+    def __init__(self, pool, conn, response):
+        self._pool = pool
+        self._conn = conn
+        self._response = response
+        self._complete = False
+        self.status = response.status
+        self.headers = response.getheaders()
+
+    def read(self):
+        """
+        :raises UpstreamError: If the connection fails or times out while reading
+        """
+        try:
+            data = self._response.read()
+            self._complete = True
+            return data
+        except (OSError, http.client.HTTPException) as e:
+            raise UpstreamError(f"{self._pool.base_url}: {e}") from e
+        finally:
+            self.release()
+
+    def iter_chunks(self, size=16 * 1024):
+        """Yield the body as it arrives (for streamed responses such as Server-Sent Events)."""
+        try:
+            while True:
+                try:
+                    chunk = self._response.read1(size)
+                except (OSError, http.client.HTTPException) as e:
+                    raise UpstreamError(f"{self._pool.base_url}: {e}") from e
+                if not chunk:
+                    self._complete = True
+                    return
+                yield chunk
+        finally:
+            self.release()
+
+    def release(self):
+        """Return the connection to the pool, or close it if the body was not fully read."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._complete and not self._response.will_close:
+            # Marks the response finished so the connection accepts the next request
+            self._response.close()
+            self._pool._put(conn)
+        else:
+            conn.close()
+
+    close = release
+
+
+class ConnectionPool:
+
+    def __init__(self, base_url, max_size=10, timeout=30.0):
+        """
+        :param base_url: Upstream root, e.g. "http://127.0.0.1:5003"
+        :param max_size: Idle connections kept for reuse
+        :param timeout: Seconds allowed to connect and for each read
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported upstream URL: {base_url}")
+        self.base_url = base_url
+        self._connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                                  else http.client.HTTPConnection)
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = self.reused = 0
+
+    def _get(self):
+        """An idle live connection, or a new one. :return: (connection, reused)"""
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if not _connection_dropped(conn):
+                    self.reused += 1
+                    return conn, True
+                conn.close()
+            self.created += 1
+        return self._connection_class(self._host, self._port, timeout=self.timeout), False
+
+    def _put(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request on a pooled connection.
+        :param path: Path (and query string) relative to base_url
+        :param body: bytes, a file-like object (sent as read), or None
+        :return: PooledResponse; read() or iter_chunks() it to free the connection
+        :raises UpstreamError: If the upstream cannot be reached or times out
+        """
+        headers = dict(headers or {})
+        while True:
+            conn, reused = self._get()
+            try:
+                conn.request(method, self._prefix + path, body=body, headers=headers)
+                return PooledResponse(self, conn, conn.getresponse())
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                conn.close()
+                # A kept-alive connection may close just as it is reused: try a fresh one,
+                # unless part of a streamed body was already sent
+                if reused and (body is None or isinstance(body, bytes)):
+                    continue
+                raise UpstreamError(f"{self.base_url}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise UpstreamError(f"{self.base_url}: {e}") from e
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class LocalResponse:
+    """PooledResponse lookalike for a response produced in process."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status = response.status_code
+        self.headers = list(response.headers.items())
+
+    def read(self):
+        try:
+            return b"".join(self.iter_chunks())
+        finally:
+            self.release()
+
+    def iter_chunks(self, size=None):
+        try:
+            for chunk in self._response.response:
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        finally:
+            self.release()
+
+    def release(self):
+        self._response.close()
+
+    close = release
+
+
+class LocalTransport:
+    """Calls a WSGI app directly instead of over the network."""
+
+    def __init__(self, wsgi_app):
+        self.base_url = f"local://{getattr(wsgi_app, 'name', 'app')}"
+        self._client = Client(wsgi_app)
+
+    def request(self, method, path, body=None, headers=None):
+        path, _, query = path.partition("?")
+        data = body.read() if hasattr(body, "read") else body
+        # The test client sets these itself from the data and the app
+        headers = {name: value for name, value in (headers or {}).items()
+                   if name.lower() not in ("content-length", "host")}
+        response = self._client.open(path, method=method, query_string=query, data=data,
+                                     headers=headers, buffered=False)
+        return LocalResponse(response)
+
+    def close(self):
+        pass
+
+
+def transport_for(target, **kwargs):
+    """A ConnectionPool for a URL (kwargs are its options), or a LocalTransport for a WSGI app."""
+    return ConnectionPool(target, **kwargs) if isinstance(target, str) else LocalTransport(target)
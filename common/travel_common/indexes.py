@@ -0,0 +1,182 @@
+# travel_common/indexes.py
+"""
+Secondary indexes kept next to an id -> record dict.
+
+HashIndex answers "which ids have this key" in O(1) (O(k) to list them) and can
+enforce uniqueness. SortedIndex keeps (key, id) pairs in order for prefix and
+range queries with bisect. Both are updated incrementally: callers remove a
+record with its old field values before changing it and add it back after.
+A SortedIndex is first filled with build(), one sort instead of an insort per
+record (which is quadratic).
+Uniqueness is checked separately (check()) before a record is changed, so a
+rejected change leaves the record and its indexes untouched.
+"""
+import unicodedata
+from bisect import bisect_left, insort
+
+
+def normalize(text):
+    """Normalize text for lookups: Unicode NFKC, case folded, inner whitespace collapsed."""
+    if not isinstance(text, str):
+        return text
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class DuplicateKeyError(ValueError):
+    """Raised when a unique index already holds the key for another record."""
+
+    def __init__(self, key, existing_id, label="key"):
+        super().__init__(f"Duplicate {label}: {key!r}")
+        self.key = key
+        self.existing_id = existing_id
+
+
+class HashIndex:
+
+    def __init__(self, key_func, unique=False, label="key"):
+        """
+        :param key_func: Callable returning the index key of a record
+        :param unique: Whether check() rejects a second record with the same key
+        :param label: What the key is, for error messages
+        """
+        self.key_func = key_func
+        self.unique = unique
+        self.label = label
+        self._buckets = {}
+
+    def check(self, record_id, key):
+        """
+        Raise DuplicateKeyError if giving record_id this key would break uniqueness.
+        Does nothing for non-unique indexes.
+        """
+        if not self.unique:
+            return
+        bucket = self._buckets.get(key)
+        if bucket:
+            for existing_id in bucket:
+                if existing_id != record_id:
+                    raise DuplicateKeyError(key, existing_id, self.label)
+
+    def add(self, record_id, record):
+        self.add_key(record_id, self.key_func(record))
+
+    def add_key(self, record_id, key):
+        """Add a record by its already computed key (e.g. without decoding the record)."""
+        # A dict is used as an insertion-ordered set of ids
+        self._buckets.setdefault(key, {})[record_id] = None
+
+    def remove(self, record_id, record):
+        key = self.key_func(record)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(record_id, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def get(self, key):
+        """Ids of the records with this key."""
+        return list(self._buckets.get(key, ()))
+
+    def __contains__(self, key):
+        return key in self._buckets
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SortedIndex:
+
+    def __init__(self, key_func):
+        """
+        :param key_func: Callable returning a sortable (e.g. string) key of a record
+        """
+        self.key_func = key_func
+        self._entries = []
+
+    def build(self, items):
+        """Replace the contents with (record_id, record) pairs, sorted once."""
+        key_func = self.key_func
+        self.build_keys((key_func(record), record_id) for record_id, record in items)
+
+    def build_keys(self, entries):
+        """Replace the contents with already computed (key, record_id) pairs, sorted once."""
+        self._entries = sorted(entries)
+
+    def add(self, record_id, record):
+        insort(self._entries, (self.key_func(record), record_id))
+
+    def remove(self, record_id, record):
+        entry = (self.key_func(record), record_id)
+        pos = bisect_left(self._entries, entry)
+        if pos < len(self._entries) and self._entries[pos] == entry:
+            del self._entries[pos]
+
+    def range(self, low, high, limit=None):
+        """Ids with low <= key < high, in key order."""
+        entries = self._entries
+        pos = bisect_left(entries, (low,))
+        ids = []
+        while pos < len(entries) and (limit is None or len(ids) < limit):
+            key, record_id = entries[pos]
+            if key >= high:
+                break
+            ids.append(record_id)
+            pos += 1
+        return ids
+
+    def prefix(self, prefix, limit=None):
+        """Ids whose key starts with prefix, in key order."""
+        return self.range(prefix, prefix + "\U0010ffff", limit)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GroupedSortedIndex:
+    """One SortedIndex per group (e.g. per role), so a group is listed in key order without a scan."""
+
+    def __init__(self, group_func, key_func):
+        """
+        :param group_func: Callable returning the group of a record
+        :param key_func: Callable returning the sort key of a record within its group
+        """
+        self.group_func = group_func
+        self.key_func = key_func
+        self._groups = {}
+
+    def build(self, items):
+        """Replace the contents with (record_id, record) pairs, sorting each group once."""
+        grouped = {}
+        for record_id, record in items:
+            grouped.setdefault(self.group_func(record), []).append((record_id, record))
+        self._groups = {}
+        for group, group_items in grouped.items():
+            index = self._groups[group] = SortedIndex(self.key_func)
+            index.build(group_items)
+
+    def add(self, record_id, record):
+        group = self.group_func(record)
+        index = self._groups.get(group)
+        if index is None:
+            index = self._groups[group] = SortedIndex(self.key_func)
+        index.add(record_id, record)
+
+    def remove(self, record_id, record):
+        group = self.group_func(record)
+        index = self._groups.get(group)
+        if index is not None:
+            index.remove(record_id, record)
+            if not len(index):
+                del self._groups[group]
+
+    def range(self, group, low, high, limit=None):
+        index = self._groups.get(group)
+        return index.range(low, high, limit) if index is not None else []
+
+    def prefix(self, group, prefix, limit=None):
+        index = self._groups.get(group)
+        return index.prefix(prefix, limit) if index is not None else []
+
+    def count(self, group):
+        index = self._groups.get(group)
+        return len(index) if index is not None else 0
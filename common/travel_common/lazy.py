@@ -0,0 +1,23 @@
+# travel_common/lazy.py
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Import a module whose body only runs on first attribute access.
+    Keeps heavy dependencies (jwt, bcrypt, ...) off the service start-up path.
+    :param name: Absolute module name
+    :return: The module (already loaded, or a lazy placeholder)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,143 @@
+# travel_common/lifecycle.py
+"""
+Graceful shutdown: stop taking requests, drain the ones in flight, flush the stores.
+
+On SIGTERM (or at interpreter exit) the service starts draining: new requests
+get 503 with Retry-After and /readyz reports "draining" so the load balancer
+stops routing to it, while requests already running finish, up to
+TRAVEL_DRAIN_TIMEOUT seconds (default 30). The flush steps then run (a full
+write of each store, folding in the users journal), and the process exits.
+Long-lived streams (change feed SSE) are not counted as in flight; they end
+when the process exits.
+"""
+import atexit
+import logging
+import os
+import signal
+import threading
+import time
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT = float(os.getenv("TRAVEL_DRAIN_TIMEOUT", "30"))
+
+# Probes keep answering while draining, so the orchestrator sees "draining"
+PROBE_ENDPOINTS = frozenset(("healthz", "readyz"))
+
+
+class Lifecycle:
+
+    def __init__(self, app, drain_timeout=None):
+        """
+        :param app: Flask app whose requests are counted
+        :param drain_timeout: Seconds to wait for in-flight requests (TRAVEL_DRAIN_TIMEOUT by default)
+        """
+        self.app = app
+        self.drain_timeout = DRAIN_TIMEOUT if drain_timeout is None else drain_timeout
+        self.flush_steps = []
+        self.draining = False
+        self.stopped = False
+        self.in_flight = 0
+        self._idle = threading.Condition()
+        self._shutdown_lock = threading.Lock()
+
+        app.before_request(self._enter)
+        app.teardown_request(self._leave)
+
+    def add_flush(self, name, func):
+        """Add a step run once the requests are drained; steps run in the order they were added."""
+        self.flush_steps.append((name, func))
+
+    def _enter(self):
+        if request.endpoint in PROBE_ENDPOINTS:
+            return None
+        with self._idle:
+            if self.draining:
+                return {"error": "Service is shutting down"}, 503, {"Retry-After": "1"}
+            self.in_flight += 1
+        g.lifecycle_counted = True
+        return None
+
+    def _leave(self, exc=None):
+        if g.pop("lifecycle_counted", False):
+            with self._idle:
+                self.in_flight -= 1
+                if not self.in_flight:
+                    self._idle.notify_all()
+
+    def drain(self, timeout=None):
+        """
+        Stop accepting requests and wait for the running ones to finish.
+        :return: Whether every request finished within the timeout
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        with self._idle:
+            self.draining = True
+            return self._idle.wait_for(lambda: not self.in_flight, timeout)
+
+    def flush(self):
+        """Run every flush step; a failing step is logged and does not stop the others."""
+        failed = []
+        for name, func in self.flush_steps:
+            try:
+                func()
+            except Exception:
+                logger.exception("Flush step %r failed during shutdown", name)
+                failed.append(name)
+        return failed
+
+    def shutdown(self, timeout=None):
+        """
+        Drain, then flush (once; later calls return immediately).
+        :return: Whether the requests drained in time and every flush step succeeded
+        """
+        with self._shutdown_lock:
+            if self.stopped:
+                return True
+            if _is_reloader_parent(self.app):
+                # The reloader's parent only restarts the server; its copy of the stores is stale
+                return True
+            started = time.perf_counter()
+            drained = self.drain(timeout)
+            if not drained:
+                logger.warning("%d request(s) still running after the drain timeout", self.in_flight)
+            failed = self.flush()
+            self.stopped = True
+            logger.info("Shut down in %.3fs", time.perf_counter() - started)
+            return drained and not failed
+
+    def install(self, signals=(signal.SIGTERM,)):
+        """
+        Shut down gracefully when the process exits. The signals are turned into
+        a normal exit (SystemExit) so the server stops accepting connections and
+        the shutdown runs from atexit, where the request threads are still alive.
+        Handlers already set (by a reloader or a WSGI server) are left in place.
+        """
+        atexit.register(self.shutdown)
+        if threading.current_thread() is not threading.main_thread():
+            return self
+        for signum in signals:
+            if signal.getsignal(signum) in (signal.SIG_DFL, None):
+                signal.signal(signum, _exit_on_signal)
+        return self
+
+
+def _is_reloader_parent(app):
+    # app.run(debug=True) serves from a child process that has WERKZEUG_RUN_MAIN set
+    return app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(0)
+
+
+def register_lifecycle(app, drain_timeout=None):
+    """
+    Count an app's requests for graceful shutdown.
+    :return: The Lifecycle, also stored as app.extensions["lifecycle"]
+    """
+    lifecycle = Lifecycle(app, drain_timeout)
+    app.extensions["lifecycle"] = lifecycle
+    return lifecycle
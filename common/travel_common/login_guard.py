@@ -0,0 +1,90 @@
+# travel_common/login_guard.py
+"""
+Keeps logins for unknown emails as slow as logins for known ones.
+
+Without this, a login for an unknown email returns immediately while a real account costs a
+full bcrypt check, which lets attackers enumerate accounts by timing. Unknown
+emails are verified against a precomputed dummy hash instead. To stop credential
+stuffing from doubling the bcrypt load, a token bucket admits only a limited
+number of dummy checks per second. Misses over that budget sleep for the
+observed bcrypt duration, which takes the same time but uses no CPU.
+"""
+import os
+import secrets
+import threading
+import time
+
+from travel_common.auth_service import AuthService
+from travel_common.rate_limit import InMemoryBackend, parse_rate
+
+_dummy_hash = None
+_dummy_lock = threading.Lock()
+
+
+def dummy_password_hash():
+    """
+    bcrypt hash of a random password, created once per process.
+    Uses the same cost factor as real password hashes.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        with _dummy_lock:
+            if _dummy_hash is None:
+                _dummy_hash = AuthService.hash_password(secrets.token_urlsafe(16))
+    return _dummy_hash
+
+
+class LoginGuard:
+    """Equalizes the time of failed lookups with the time of real password checks."""
+
+    def __init__(self, dummy_rate=None, smoothing=0.2, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param dummy_rate: "<checks>/<seconds>" of dummy bcrypt checks admitted
+        :param smoothing: Weight of the newest sample in the moving average
+        """
+        rate = dummy_rate or os.getenv("LOGIN_DUMMY_CHECK_RATE", "10/1")
+        self._capacity, self._refill = parse_rate(rate)
+        self._bucket = InMemoryBackend(max_keys=1, clock=clock)
+        self._smoothing = smoothing
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.average_seconds = None
+        self.dummy_checks = 0
+        self.throttled = 0
+
+    def record(self, seconds):
+        """Feed the duration of a real password check into the moving average."""
+        with self._lock:
+            if self.average_seconds is None:
+                self.average_seconds = seconds
+            else:
+                self.average_seconds += self._smoothing * (seconds - self.average_seconds)
+
+    def verify_password(self, password, hashed_password):
+        """Check a real user's password and record how long bcrypt took."""
+        start = self._clock()
+        try:
+            return AuthService.verify_password(password, hashed_password)
+        finally:
+            self.record(self._clock() - start)
+
+    def reject_unknown_user(self, password):
+        """Spend about as long as a real password check for an email with no account."""
+        allowed, _ = self._bucket.consume("dummy", self._capacity, self._refill)
+        if allowed or self.average_seconds is None:
+            with self._lock:
+                self.dummy_checks += 1
+            self.verify_password(password, dummy_password_hash())
+        else:
+            with self._lock:
+                self.throttled += 1
+            self._sleep(self.average_seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "average_check_seconds": self.average_seconds,
+                "dummy_checks": self.dummy_checks,
+                "throttled": self.throttled,
+            }
@@ -0,0 +1,4 @@
+from travel_common.models.destination import Destination
+from travel_common.models.user import User
+
+__all__ = ["Destination", "User"]
@@ -0,0 +1,51 @@
+# travel_common/models/destination.py
+import sys
+
+from travel_common import serialization
+
+
+class Destination:
+    # Fixed slots instead of a per-instance __dict__ keep large catalogues compact
+    __slots__ = ("id", "name", "description", "location", "latitude", "longitude")
+
+    def __init__(self, id, name, description, location, latitude=None, longitude=None):
+        self.id = id
+        self.name = name
+        self.description = description
+        # Locations repeat across many records; interning shares one string per value
+        self.location = sys.intern(location) if type(location) is str else location
+        # Optional coordinates in decimal degrees
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @classmethod
+    def from_dict(cls, record):
+        """Build a destination from a decoded JSON record."""
+        return cls(record["id"], record["name"], record["description"], record["location"],
+                   record.get("latitude"), record.get("longitude"))
+
+    @property
+    def has_coordinates(self):
+        return self.latitude is not None and self.longitude is not None
+
+    def to_dict(self):
+        """Return the destination as a plain dict (for responses and persistence)."""
+        record = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "location": self.location,
+        }
+        # Coordinates are optional and left out when unset, keeping old records unchanged
+        if self.latitude is not None:
+            record["latitude"] = self.latitude
+        if self.longitude is not None:
+            record["longitude"] = self.longitude
+        return record
+
+    def to_json(self):
+        """Return the destination encoded as a compact JSON string."""
+        return serialization.dumps(self.to_dict()).decode("utf-8")
+
+    def __repr__(self):
+        return f"Destination(id={self.id}, name='{self.name}', location='{self.location}')"
@@ -0,0 +1,51 @@
+# travel_common/models/user.py
+import sys
+
+from travel_common import serialization
+
+
+class User:
+    # Fixed slots instead of a per-instance __dict__ keep large user stores compact
+    __slots__ = ("name", "email", "password", "role", "token_version")
+
+    def __init__(self, name, email, password, role="user", token_version=0):
+        self.name = name
+        self.email = email
+        self.password = password  # This should already be hashed
+        # Only a handful of distinct roles exist; interning shares one string per role
+        self.role = sys.intern(role) if type(role) is str else role
+        # Carried in issued tokens; bumping it revokes every token issued before
+        self.token_version = token_version
+
+    @classmethod
+    def from_dict(cls, record):
+        """Build a user from a decoded JSON record (role defaults to 'user')."""
+        return cls(record["name"], record["email"], record["password"], record.get("role", "user"),
+                   record.get("token_version", 0))
+
+    def to_dict(self):
+        """Return the user as a plain dict, including the password hash (for persistence)."""
+        data = {
+            "name": self.name,
+            "email": self.email,
+            "password": self.password,
+            "role": self.role,
+        }
+        if self.token_version:
+            data["token_version"] = self.token_version
+        return data
+
+    def to_profile(self):
+        """Return the public profile fields of the user."""
+        return {
+            "name": self.name,
+            "email": self.email,
+            "role": self.role,
+        }
+
+    def to_json(self):
+        """Return the user encoded as a compact JSON string."""
+        return serialization.dumps(self.to_dict()).decode("utf-8")
+
+    def __repr__(self):
+        return f"User(name='{self.name}', email='{self.email}', role='{self.role}')"
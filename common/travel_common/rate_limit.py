@@ -0,0 +1,165 @@
+# travel_common/rate_limit.py
+"""
+Token-bucket rate limiting with pluggable storage.
+
+InMemoryBackend keeps the buckets in the process (one dict lookup per check).
+RedisBackend shares them between workers with an atomic Lua script.
+"""
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+def parse_rate(rate):
+    """
+    Parse a "<requests>/<seconds>" string such as "5/60".
+    :return: (capacity, refill_per_second)
+    """
+    requests, seconds = rate.split("/")
+    capacity, seconds = int(requests), float(seconds)
+    if capacity <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate: {rate}")
+    return capacity, capacity / seconds
+
+
+class InMemoryBackend:
+    """Buckets held in this process; least recently used keys are evicted past max_keys."""
+
+    def __init__(self, max_keys=100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost=1):
+        """
+        Take cost tokens from the bucket for key.
+        :return: (allowed, tokens left after the attempt)
+        """
+        now = self.clock()
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                tokens = capacity
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(capacity, state[0] + (now - state[1]) * rate)
+                self._buckets.move_to_end(key)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBackend:
+    """Buckets shared by every worker through Redis, updated atomically by a Lua script."""
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix="ratelimit:", clock=time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+        self._script = client.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def consume(self, key, capacity, rate, cost=1):
+        allowed, tokens = self._script(
+            keys=[self.prefix + key], args=[capacity, rate, self.clock(), cost]
+        )
+        return bool(int(allowed)), float(tokens)
+
+
+def create_backend(url="memory"):
+    """Build a backend from a URL: "memory" or "redis://host:port/db"."""
+    if not url or url == "memory":
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unsupported rate limit backend: {url}")
+
+
+class RateLimitExceeded:
+    """Details of a rejected check, used to build the 429 response."""
+
+    __slots__ = ("rule", "retry_after")
+
+    def __init__(self, rule, retry_after):
+        self.rule = rule
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Applies named token-bucket rules (e.g. per IP, per email) to each attempt."""
+
+    def __init__(self, rules, backend=None, namespace="login"):
+        """
+        :param rules: Mapping of rule name to a "<requests>/<seconds>" rate
+        :param backend: Bucket storage; defaults to an InMemoryBackend
+        :param namespace: Prefix keeping these buckets apart from other limiters
+        """
+        self.rules = {name: parse_rate(rate) for name, rate in rules.items()}
+        self.backend = backend or InMemoryBackend()
+        self.namespace = namespace
+        self.allowed = 0
+        self.rejected = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, **keys):
+        """
+        Count one attempt against every rule whose key is given.
+        :param keys: Rule name to key value, e.g. ip="10.0.0.1", email="a@b.com"
+        :return: None if allowed, otherwise a RateLimitExceeded
+        """
+        for rule, value in keys.items():
+            if value is None or rule not in self.rules:
+                continue
+            capacity, rate = self.rules[rule]
+            allowed, tokens = self.backend.consume(
+                f"{self.namespace}:{rule}:{value}", capacity, rate
+            )
+            if not allowed:
+                with self._lock:
+                    self.rejected[rule] += 1
+                return RateLimitExceeded(rule, math.ceil((1 - tokens) / rate))
+        with self._lock:
+            self.allowed += 1
+        return None
+
+    def stats(self):
+        """Counters of allowed and rejected attempts (rejections broken down per rule)."""
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rejected": sum(self.rejected.values()),
+                "rejected_by_rule": dict(self.rejected),
+            }
@@ -0,0 +1,268 @@
+# travel_common/request_validation.py
+"""
+Request body validation compiled from flask_restx models.
+
+Each api.model is turned once (when the route is declared) into a flat tuple of
+field checks, so validating a request is a single loop with isinstance calls.
+The body size is checked against the route's limit before any JSON parsing, and
+handlers read the validated payload from flask.g instead of request.json.
+
+Collection endpoints use validate_items, which decodes a JSON array one item at
+a time straight from the request stream, so the raw body is never buffered.
+"""
+import os
+from functools import wraps
+
+from flask import current_app, g, request
+from flask_restx import fields
+
+from travel_common import serialization
+
+# Largest JSON body accepted when neither the route nor the app sets a limit
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+# Largest request of any kind (Flask's MAX_CONTENT_LENGTH), e.g. a bulk upload
+DEFAULT_MAX_CONTENT_LENGTH = 8 * 1024 * 1024
+# Largest number of records accepted by one bulk request
+DEFAULT_MAX_BULK_ITEMS = 10_000
+
+# Field class -> (accepted Python types, description used in error messages).
+# Checked in order, so subclasses (Integer is a Number) come first.
+_FIELD_TYPES = (
+    (fields.String, (str,), "a string"),
+    (fields.Boolean, (bool,), "a boolean"),
+    (fields.Integer, (int,), "an integer"),
+    (fields.Float, (int, float), "a number"),
+    (fields.Arbitrary, (int, float), "a number"),
+    (fields.Fixed, (int, float), "a number"),
+)
+
+
+class FieldCheck:
+    __slots__ = ("name", "required", "types", "label", "choices")
+
+    def __init__(self, name, required, types, label, choices):
+        self.name = name
+        self.required = required
+        self.types = types
+        self.label = label
+        self.choices = choices
+
+
+def _field_check(name, field):
+    if isinstance(field, type):  # Model declared with the class, e.g. fields.Integer
+        field = field()
+    types, label = None, None
+    for field_class, accepted, description in _FIELD_TYPES:
+        if isinstance(field, field_class):
+            types, label = accepted, description
+            break
+    choices = getattr(field, "enum", None)
+    return FieldCheck(name, bool(field.required), types, label,
+                      frozenset(choices) if choices else None)
+
+
+class CompiledModel:
+    """Validator for one flask_restx model."""
+
+    __slots__ = ("name", "checks")
+
+    def __init__(self, name, checks):
+        self.name = name
+        self.checks = checks
+
+    def validate(self, data, partial=False):
+        """
+        Check a decoded JSON body against the model.
+        :param data: Decoded request body
+        :param partial: Allow required fields to be left out (PATCH); a required
+            field that is sent must still have a value
+        :return: (payload, errors) where payload keeps only the model's fields
+        """
+        if not isinstance(data, dict):
+            return None, ["Request body must be a JSON object"]
+        payload = {}
+        errors = []
+        for check in self.checks:
+            value = data.get(check.name)
+            if value is None or value == "":
+                if check.required and not partial:
+                    errors.append(f"'{check.name}' is a required field")
+                elif check.required and check.name in data:
+                    errors.append(f"'{check.name}' cannot be empty")
+                elif check.name in data:
+                    payload[check.name] = value
+                continue
+            if check.types is not None and (
+                not isinstance(value, check.types)
+                # bool is an int subclass but never a valid number here
+                or (isinstance(value, bool) and bool not in check.types)
+            ):
+                errors.append(f"'{check.name}' must be {check.label}")
+                continue
+            if check.choices is not None and value not in check.choices:
+                errors.append(f"'{check.name}' must be one of: {', '.join(sorted(map(str, check.choices)))}")
+                continue
+            payload[check.name] = value
+        return payload, errors
+
+
+_compiled = {}
+
+
+def compile_model(model):
+    """
+    Compile a flask_restx model into a CompiledModel (cached per model).
+    :param model: Result of api.model(...)
+    :return: CompiledModel
+    """
+    compiled = _compiled.get(id(model))
+    if compiled is None or compiled[0] is not model:
+        checks = tuple(_field_check(name, field) for name, field in model.items())
+        compiled = (model, CompiledModel(model.name, checks))
+        _compiled[id(model)] = compiled
+    return compiled[1]
+
+
+def configure_body_limits(app):
+    """
+    Fill in the body size settings (from the environment unless already set)
+    and reject requests whose Content-Length exceeds MAX_CONTENT_LENGTH before
+    any view runs.
+    """
+    defaults = {
+        "MAX_CONTENT_LENGTH": DEFAULT_MAX_CONTENT_LENGTH,
+        "MAX_JSON_BODY_BYTES": DEFAULT_MAX_BODY_BYTES,
+        "MAX_BULK_ITEMS": DEFAULT_MAX_BULK_ITEMS,
+    }
+    for key, default in defaults.items():
+        if app.config.get(key) is None:
+            app.config[key] = int(os.getenv(key, default))
+
+    @app.before_request
+    def reject_oversized_body():
+        limit = app.config["MAX_CONTENT_LENGTH"]
+        if request.content_length is not None and request.content_length > limit:
+            return {"error": f"Request body exceeds {limit} bytes"}, 413
+        return None
+
+
+def _limit(value, default_key, default):
+    """Resolve a per-route limit given as a number or as an app config key."""
+    if isinstance(value, int):
+        return value
+    return current_app.config.get(value or default_key) or default
+
+
+class _LimitedReader:
+    """Wraps the request stream and stops once more than max_bytes were read."""
+
+    __slots__ = ("stream", "remaining", "exceeded")
+
+    def __init__(self, stream, max_bytes):
+        self.stream = stream
+        self.remaining = max_bytes
+        self.exceeded = False
+
+    def read(self, size):
+        chunk = self.stream.read(min(size, self.remaining + 1))
+        self.remaining -= len(chunk)
+        if self.remaining < 0:
+            self.exceeded = True
+            return b""
+        return chunk
+
+
+def read_body(max_bytes):
+    """
+    Read the raw request body, refusing to buffer more than max_bytes.
+    :return: Body bytes, or None if the body is over the limit
+    """
+    length = request.content_length
+    if length is not None:
+        return request.get_data(cache=True) if length <= max_bytes else None
+    # No Content-Length (chunked upload): read one byte past the limit at most
+    body = request.stream.read(max_bytes + 1)
+    return body if len(body) <= max_bytes else None
+
+
+def validate_body(model, partial=False, max_bytes=None):
+    """
+    Decorate a resource method so it only runs with a valid JSON body.
+    The validated payload is stored as flask.g.payload.
+    :param model: flask_restx model describing the body
+    :param partial: Allow missing required fields (PATCH)
+    :param max_bytes: Body size limit in bytes, or the config key holding it;
+        defaults to the app's MAX_JSON_BODY_BYTES
+    """
+    compiled = compile_model(model)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            limit = _limit(max_bytes, "MAX_JSON_BODY_BYTES", DEFAULT_MAX_BODY_BYTES)
+            if not request.is_json:
+                return {"error": "Content-Type must be application/json"}, 415
+            body = read_body(limit)
+            if body is None:
+                return {"error": f"Request body exceeds {limit} bytes"}, 413
+            try:
+                data = serialization.loads(body)
+            except serialization.SerializationError:
+                return {"error": "Malformed JSON body"}, 400
+            payload, errors = compiled.validate(data, partial=partial)
+            if errors:
+                return {"error": errors[0], "errors": errors}, 400
+            g.payload = payload
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def validate_items(model, max_bytes=None, max_item_bytes=None, max_items=None):
+    """
+    Decorate a resource method taking a JSON array of model records.
+    Items are decoded and validated as they are read from the request stream;
+    the first invalid item stops the upload. The validated payloads are stored
+    as a list in flask.g.payload.
+    :param model: flask_restx model describing one item
+    :param max_bytes: Body size limit (bytes or config key); defaults to MAX_CONTENT_LENGTH
+    :param max_item_bytes: Size limit of one item (bytes or config key); defaults to MAX_JSON_BODY_BYTES
+    :param max_items: Item count limit (number or config key); defaults to MAX_BULK_ITEMS
+    """
+    compiled = compile_model(model)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            limit = _limit(max_bytes, "MAX_CONTENT_LENGTH", DEFAULT_MAX_CONTENT_LENGTH)
+            item_limit = _limit(max_item_bytes, "MAX_JSON_BODY_BYTES", DEFAULT_MAX_BODY_BYTES)
+            count_limit = _limit(max_items, "MAX_BULK_ITEMS", DEFAULT_MAX_BULK_ITEMS)
+            if not request.is_json:
+                return {"error": "Content-Type must be application/json"}, 415
+            if request.content_length is not None and request.content_length > limit:
+                return {"error": f"Request body exceeds {limit} bytes"}, 413
+
+            reader = _LimitedReader(request.stream, limit)
+            payloads = []
+            try:
+                for index, item in enumerate(
+                    serialization.iter_array(reader, max_item_size=item_limit)
+                ):
+                    if index >= count_limit:
+                        return {"error": f"Too many items (at most {count_limit})"}, 413
+                    payload, errors = compiled.validate(item)
+                    if errors:
+                        return {"error": f"Item {index}: {errors[0]}", "errors": errors}, 400
+                    payloads.append(payload)
+            except serialization.SerializationError as e:
+                if reader.exceeded:
+                    return {"error": f"Request body exceeds {limit} bytes"}, 413
+                return {"error": f"Malformed JSON body: {e}"}, 400
+            g.payload = payloads
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,245 @@
+# travel_common/serialization.py
+"""
+Pluggable JSON encoding used for persistence and HTTP responses.
+
+The fastest installed backend is picked at import time (orjson, then msgspec,
+then the standard library). Set TRAVEL_JSON_BACKEND to force one. The
+backends agree on strings, integers, layout and most floats, but not on the
+notation of very small or large floats: the standard library writes 8.5e-05
+and 1e+20 where orjson and msgspec write 0.000085 and 1e20. Every backend reads
+the others' output back to the same values, but switching backends can rewrite
+such coordinates in the files on disk.
+"""
+import codecs
+import json
+import os
+import re
+
+
+class SerializationError(ValueError):
+    """Raised when data cannot be decoded into the expected records."""
+
+
+def _stdlib_backend():
+    compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    pretty = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+    def dumps(obj, pretty_print=False):
+        encoder = pretty if pretty_print else compact
+        return encoder.encode(obj).encode("utf-8")
+
+    def loads(data):
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise SerializationError(str(e))
+
+    return dumps, loads
+
+
+def _orjson_backend():
+    import orjson
+
+    compact = orjson.OPT_NON_STR_KEYS
+    pretty = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+
+    def dumps(obj, pretty_print=False):
+        return orjson.dumps(obj, option=pretty if pretty_print else compact)
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(str(e))
+
+    return dumps, loads
+
+
+def _msgspec_backend():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj, pretty_print=False):
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty_print else data
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise SerializationError(str(e))
+
+    return dumps, loads
+
+
+_BACKENDS = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _stdlib_backend,
+}
+
+# The fast backends have no partial decoding, so streamed arrays use the stdlib decoder
+_ARRAY_DECODER = json.JSONDecoder()
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+_ITEM_DELIMITERS = frozenset(",] \t\n\r")
+
+backend = None
+_dumps = None
+_loads = None
+
+
+def set_backend(name=None):
+    """
+    Select the JSON backend.
+    :param name: 'orjson', 'msgspec' or 'json'; None picks the fastest one installed
+    :return: Name of the backend now in use
+    """
+    global backend, _dumps, _loads
+    candidates = [name] if name else list(_BACKENDS)
+    for candidate in candidates:
+        if candidate not in _BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {candidate}")
+        try:
+            _dumps, _loads = _BACKENDS[candidate]()
+        except ImportError:
+            if name:
+                raise
+            continue
+        backend = candidate
+        return backend
+
+
+def dumps(obj, pretty=False):
+    """
+    Encode an object as UTF-8 JSON bytes.
+    :param obj: JSON-compatible object (int dict keys are allowed)
+    :param pretty: Indent with two spaces (used for files kept on disk)
+    """
+    return _dumps(obj, pretty)
+
+
+def loads(data):
+    """
+    Decode JSON from bytes or str.
+    :raises SerializationError: If the data is not valid JSON
+    """
+    return _loads(data)
+
+
+def decode_mapping(data, model, key_type=str):
+    """
+    Decode a JSON object of records straight into model instances.
+    :param data: JSON bytes or str holding {key: record}
+    :param model: Model class providing from_dict()
+    :param key_type: Callable applied to each key (e.g. int for destination ids)
+    :return: Dict of converted key to model instance
+    """
+    raw = loads(data)
+    if not isinstance(raw, dict):
+        raise SerializationError(f"Expected a JSON object of {model.__name__} records")
+    from_dict = model.from_dict
+    try:
+        return {key_type(key): from_dict(record) for key, record in raw.items()}
+    except (KeyError, TypeError, ValueError) as e:
+        raise SerializationError(f"Invalid {model.__name__} record: {e}")
+
+
+def iter_array(stream, chunk_size=64 * 1024, max_item_size=None):
+    """
+    Decode a JSON array item by item while reading it in chunks.
+    Only the item being decoded is buffered, never the whole document.
+    :param stream: Binary file-like object holding a JSON array
+    :param chunk_size: Bytes read per call to stream.read()
+    :param max_item_size: Largest item accepted, in characters of JSON text (None for no limit)
+    :raises SerializationError: If the data is not a JSON array or an item is too large
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    raw_decode = _ARRAY_DECODER.raw_decode
+    buffer, pos, eof = "", 0, False
+    state = "start"  # start -> item -> separator -> item ... -> end
+
+    while True:
+        # Skip whitespace, reading more input whenever the buffer runs out
+        while True:
+            pos = _skip_whitespace(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                break
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + decoder.decode(chunk, final=eof), 0
+        if pos == len(buffer):
+            raise SerializationError("Unexpected end of JSON array")
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise SerializationError("Expected a JSON array")
+            pos += 1
+            state = "first"
+        elif state in ("first", "separator") and char == "]":
+            _check_rest_is_whitespace(stream, buffer[pos + 1:], decoder, chunk_size)
+            return
+        elif state == "separator":
+            if char != ",":
+                raise SerializationError(f"Expected ',' or ']' in JSON array, got {char!r}")
+            pos += 1
+            state = "item"
+        else:
+            try:
+                item, end = raw_decode(buffer, pos)
+                # A number cut off by the chunk ("1." or "12") continues in the next one,
+                # so an item only counts once a delimiter follows it
+                complete = eof or (end < len(buffer) and buffer[end] in _ITEM_DELIMITERS)
+            except ValueError:
+                if eof:
+                    raise SerializationError("Invalid item in JSON array")
+                complete = False
+            if not complete:
+                if max_item_size is not None and len(buffer) - pos > max_item_size:
+                    raise SerializationError(f"JSON array item exceeds {max_item_size} characters")
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + decoder.decode(chunk, final=eof), 0
+                continue
+            if max_item_size is not None and end - pos > max_item_size:
+                raise SerializationError(f"JSON array item exceeds {max_item_size} characters")
+            yield item
+            buffer, pos = buffer[end:], 0
+            state = "separator"
+
+
+def _check_rest_is_whitespace(stream, rest, decoder, chunk_size):
+    """
+    Read the stream to its end after a JSON document.
+    :raises SerializationError: If anything but whitespace follows the document
+    """
+    while True:
+        if _skip_whitespace(rest).end() < len(rest):
+            raise SerializationError("Unexpected data after JSON array")
+        chunk = stream.read(chunk_size)
+        try:
+            rest = decoder.decode(chunk, final=not chunk)
+        except UnicodeDecodeError:
+            raise SerializationError("Unexpected data after JSON array")
+        if not chunk:
+            return
+
+
+def output_json(data, code, headers=None):
+    """flask_restx representation that encodes responses with the selected backend."""
+    from flask import make_response
+
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
+
+
+def register_json_representation(api):
+    """Make a flask_restx Api encode its JSON responses with the selected backend."""
+    api.representations["application/json"] = output_json
+
+
+set_backend(os.getenv("TRAVEL_JSON_BACKEND") or None)
@@ -0,0 +1,278 @@
+# travel_common/service_client.py
+"""
+Clients for calling the users, auth and destination services.
+
+Requests go over a keep-alive ConnectionPool with a timeout. Failed idempotent
+requests (connection errors, timeouts, 5xx) are retried with exponentially
+growing, fully jittered delays, so callers that failed together do not retry
+in lockstep. A circuit breaker stops calling a service that keeps failing and
+fails fast instead, letting one trial request through after reset_timeout.
+Identical GETs made at the same time from several threads share one upstream
+request (request coalescing); the decoded result is shared, so treat it as
+read-only.
+
+Test against travel_common.stub_server.StubServer, or pass a WSGI app instead
+of a URL to call a service in process.
+"""
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+from travel_common import serialization
+from travel_common.http_pool import UpstreamError, transport_for
+from travel_common.models.destination import Destination
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+class ServiceError(Exception):
+    """Raised for an error response (4xx/5xx) from a service."""
+
+    def __init__(self, status, body, url=""):
+        message = body.get("error") if isinstance(body, dict) else None
+        super().__init__(f"{url} returned {status}: {message or body!r}")
+        self.status = status
+        self.body = body
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling the service while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        :param failure_threshold: Consecutive failures that open the circuit
+        :param reset_timeout: Seconds the circuit stays open before one trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                # Only one trial request at a time; the rest keep failing fast
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+            self._trial_running = False
+
+
+class _Call:
+    """An upstream request that concurrent identical requests wait for."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ServiceClient:
+
+    def __init__(self, target, timeout=5.0, retries=2, backoff=0.05, max_backoff=1.0,
+                 breaker=None, pool_size=10, sleep=time.sleep, jitter=random.random):
+        """
+        :param target: Base URL of the service, or a WSGI app to call in process
+        :param timeout: Seconds allowed to connect and for each read
+        :param retries: Extra attempts for failed idempotent requests
+        :param backoff: Base delay before a retry; doubled per attempt, capped at max_backoff
+        :param breaker: CircuitBreaker shared by the requests (a new one by default)
+        """
+        self.transport = transport_for(target, max_size=pool_size, timeout=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.sleep = sleep
+        self.jitter = jitter
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def request(self, method, path, params=None, json=None, token=None):
+        """
+        Call the service.
+        :param params: Query string parameters
+        :param json: Request body, sent as JSON
+        :param token: JWT sent in the Authorization header
+        :return: Decoded JSON response (None for an empty body)
+        :raises ServiceError: For 4xx responses, and 5xx once retries are used up
+        :raises UpstreamError: If the service cannot be reached (CircuitOpenError while the circuit is open)
+        """
+        if params:
+            path += "?" + urlencode(params, doseq=True)
+        if method == "GET":
+            return self._coalesced((path, token), lambda: self._send(method, path, None, token))
+        return self._send(method, path, json, token)
+
+    def _coalesced(self, key, send):
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = send()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def _send(self, method, path, json, token):
+        headers = {"Accept": "application/json"}
+        body = None
+        if json is not None:
+            body = serialization.dumps(json)
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = token
+
+        attempts = self.retries + 1 if method in IDEMPOTENT_METHODS else 1
+        for attempt in range(attempts):
+            if attempt:
+                # Full jitter: anywhere between no delay and the exponential backoff
+                self.sleep(self.jitter() * min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.transport.base_url}: circuit open")
+            try:
+                response = self.transport.request(method, path, body=body, headers=headers)
+                data = response.read()
+            except UpstreamError as e:
+                self.breaker.record_failure()
+                error = e
+                continue
+            payload = self._decode(data)
+            if response.status >= 500:
+                self.breaker.record_failure()
+                error = ServiceError(response.status, payload, self.transport.base_url + path)
+                continue
+            # A 4xx is the caller's mistake, not a sign the service is unhealthy
+            self.breaker.record_success()
+            if response.status >= 400:
+                raise ServiceError(response.status, payload, self.transport.base_url + path)
+            return payload
+        raise error
+
+    @staticmethod
+    def _decode(data):
+        if not data:
+            return None
+        try:
+            return serialization.loads(data)
+        except serialization.SerializationError:
+            return data.decode("utf-8", "replace")
+
+    def close(self):
+        self.transport.close()
+
+
+class UsersClient(ServiceClient):
+    """Client for the users service."""
+
+    def login(self, email, password):
+        """:return: JWT for the user"""
+        return self.request("POST", "/users/login", json={"email": email, "password": password})["token"]
+
+    def profile(self, token):
+        """Profile of the token's user (name, email, role)."""
+        return self.request("GET", "/users/profile", token=token)
+
+    def verify_token(self, token):
+        """
+        Ask the users service whether a token is (still) valid, instead of decoding it locally.
+        :return: The user's profile, or None if the token is invalid or revoked
+        """
+        try:
+            return self.profile(token)
+        except ServiceError as e:
+            if e.status in (401, 404):
+                return None
+            raise
+
+    def search(self, token, prefix, limit=20):
+        """Users whose email starts with prefix (admin token required)."""
+        return self.request("GET", "/users/search", params={"prefix": prefix, "limit": limit}, token=token)["users"]
+
+
+class DestinationsClient(ServiceClient):
+    """Client for the destination service; destinations are returned as Destination models."""
+
+    def list(self):
+        return [Destination.from_dict(record) for record in self.request("GET", "/destinations")]
+
+    def get(self, dest_id):
+        return Destination.from_dict(self.request("GET", f"/destinations/{int(dest_id)}"))
+
+    def get_many(self, ids):
+        """:return: (destinations, ids not found)"""
+        data = self.request("GET", "/destinations", params={"ids": ",".join(str(int(i)) for i in ids)})
+        return [Destination.from_dict(record) for record in data["destinations"]], data["missing"]
+
+    def nearby(self, latitude, longitude, radius_km=50, limit=20):
+        """:return: List of (Destination, distance_km), nearest first"""
+        data = self.request("GET", "/destinations/nearby",
+                            params={"lat": latitude, "lon": longitude, "radius": radius_km, "limit": limit})
+        return [(Destination.from_dict(record), record["distance_km"]) for record in data]
+
+    def changes(self, since=0, wait=0):
+        """Change feed events after a sequence number (see GET /destinations/changes)."""
+        return self.request("GET", "/destinations/changes", params={"since": since, "wait": wait})
+
+    def create(self, token, name, description, location, latitude=None, longitude=None):
+        record = {"name": name, "description": description, "location": location}
+        if latitude is not None or longitude is not None:
+            record.update(latitude=latitude, longitude=longitude)
+        return Destination.from_dict(self.request("POST", "/destinations", json=record, token=token))
+
+    def delete(self, token, dest_id):
+        self.request("DELETE", f"/destinations/{int(dest_id)}", token=token)
+
+
+class AuthClient(ServiceClient):
+    """Client for the auth service."""
+
+    def profile(self, token):
+        return self.request("GET", "/users/profile", token=token)
+
+    def delete_destination(self, token, dest_id):
+        self.request("DELETE", f"/destinations/{int(dest_id)}", token=token)
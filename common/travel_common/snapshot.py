@@ -0,0 +1,297 @@
+# travel_common/snapshot.py
+"""
+Binary snapshot format for fast cold starts of large stores.
+
+Layout (little-endian):
+
+    header   magic b"TRVSNAP\\0", format version (u16), reserved (u16),
+             record count (u32), keys length (u64), data length (u64),
+             CRC32 of everything after the header (u32)
+    offsets  count + 1 u64 record boundaries, relative to the data section
+    keys     JSON array of the record keys, in store order
+    data     each record encoded as compact JSON, back to back
+
+Opening a snapshot maps the file and reads only the header, offsets and keys.
+Records are decoded the first time they are accessed. The CRC32 is checked on
+open by default, which reads the whole file once; TRAVEL_SNAPSHOT_VERIFY=0
+skips it (a corrupt record then fails when it is decoded).
+
+On Windows a memory-mapped file cannot be replaced, and every save replaces the
+snapshot, so there the file is read into memory instead of mapped (records are
+still decoded lazily).
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import MutableMapping
+
+from travel_common import serialization
+
+MAGIC = b"TRVSNAP\0"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHIQQI")
+_OFFSET_TYPECODE = "Q"
+
+# Check the CRC32 of the whole file when a store opens its snapshot
+VERIFY_ON_LOAD = os.getenv("TRAVEL_SNAPSHOT_VERIFY", "1").lower() not in ("0", "false", "no")
+# Map snapshots instead of reading them; a mapped file cannot be replaced on Windows
+MEMORY_MAP = os.name != "nt"
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is truncated, corrupt or of an unknown version."""
+
+
+def _offsets_array(values=()):
+    offsets = array(_OFFSET_TYPECODE, values)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+def write_snapshot(path, records):
+    """
+    Write a snapshot atomically (to a temporary file, then renamed over path).
+    :param path: Destination file path
+    :param records: Iterable of (key, encoded_record_bytes) pairs, in store order
+    :return: Number of records written
+    """
+    keys = []
+    chunks = []
+    offsets = [0]
+    position = 0
+    for key, data in records:
+        keys.append(key)
+        chunks.append(data)
+        position += len(data)
+        offsets.append(position)
+
+    offsets_bytes = _offsets_array(offsets).tobytes()
+    keys_bytes = serialization.dumps(keys)
+    data_bytes = b"".join(chunks)
+
+    checksum = zlib.crc32(offsets_bytes)
+    checksum = zlib.crc32(keys_bytes, checksum)
+    checksum = zlib.crc32(data_bytes, checksum)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(keys), len(keys_bytes),
+                          len(data_bytes), checksum)
+
+    write_atomic(path, (header, offsets_bytes, keys_bytes, data_bytes))
+    return len(keys)
+
+
+def write_atomic(path, chunks):
+    """
+    Write byte chunks to a file so that a crash leaves either the old or the new
+    file, never a truncated one: to a temporary file, fsynced, then renamed over path.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        for chunk in chunks:
+            file.write(chunk)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class SnapshotReader:
+    """Memory-mapped, read-only view of a snapshot file."""
+
+    def __init__(self, path, verify=True):
+        """
+        :param path: Snapshot file path
+        :param verify: Check the CRC32 of the whole file before use
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size:
+                raise SnapshotError(f"Snapshot {path} is truncated")
+            if MEMORY_MAP:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = file.read()
+
+        magic, version, _, count, keys_length, data_length, checksum = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} in {path}")
+
+        offsets_start = _HEADER.size
+        keys_start = offsets_start + (count + 1) * 8
+        self._data_start = keys_start + keys_length
+        if self._data_start + data_length != size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        if verify:
+            # Checksum through a memoryview so the payload is not copied
+            with memoryview(self._map) as view, view[offsets_start:] as payload:
+                valid = zlib.crc32(payload) == checksum
+            if not valid:
+                raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+        offsets = _offsets_array()
+        offsets.frombytes(self._map[offsets_start:keys_start])
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        self._offsets = offsets
+        self.keys = serialization.loads(self._map[keys_start:self._data_start])
+        if len(self.keys) != count:
+            raise SnapshotError(f"Snapshot {path} has a corrupt key table")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def raw(self, position):
+        """Return the encoded bytes of the record at a position."""
+        start = self._data_start + self._offsets[position]
+        end = self._data_start + self._offsets[position + 1]
+        return self._map[start:end]
+
+    def record(self, position):
+        """Decode the record at a position into a dict."""
+        return serialization.loads(self.raw(position))
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+
+class LazyRecords(MutableMapping):
+    """
+    Dict-like store whose records are decoded from a snapshot on first access.
+
+    Values that have not been decoded yet are kept as their int position in
+    the snapshot; models are never ints, so the two cannot be confused.
+    """
+
+    def __init__(self, reader, model):
+        self._reader = reader
+        self._model = model
+        self._records = dict(zip(reader.keys, range(len(reader.keys))))
+
+    def __getitem__(self, key):
+        value = self._records[key]
+        if type(value) is int:
+            value = self._model.from_dict(self._reader.record(value))
+            self._records[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key in self._records:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        self._records[key] = value
+
+    def __delitem__(self, key):
+        del self._records[key]
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def copy(self):
+        """Shallow copy sharing the snapshot; records not decoded yet stay encoded."""
+        clone = LazyRecords.__new__(LazyRecords)
+        clone._reader = self._reader
+        clone._model = self._model
+        clone._records = dict(self._records)
+        return clone
+
+    def decoded_count(self):
+        """Number of records decoded into model objects so far."""
+        return sum(1 for value in self._records.values() if type(value) is not int)
+
+    def encoded_items(self):
+        """
+        Yield (key, encoded_record_bytes) for writing a new snapshot.
+        Records never decoded are copied from the old snapshot as raw bytes.
+        """
+        reader = self._reader
+        for key, value in self._records.items():
+            if type(value) is int:
+                yield key, reader.raw(value)
+            else:
+                yield key, serialization.dumps(value.to_dict())
+
+
+def encode_records(records):
+    """Yield (key, encoded_record_bytes) pairs for any mapping of models."""
+    if isinstance(records, LazyRecords):
+        yield from records.encoded_items()
+        return
+    for key, value in records.items():
+        yield key, serialization.dumps(value.to_dict())
+
+
+def load_snapshot(path, model, verify=None):
+    """
+    Open a snapshot as a LazyRecords mapping of model instances.
+    :param verify: Check the CRC32 of the whole file (VERIFY_ON_LOAD by default)
+    """
+    return LazyRecords(SnapshotReader(path, verify=VERIFY_ON_LOAD if verify is None else verify), model)
+
+
+def save_snapshot(path, records):
+    """Write any mapping of models (lazy or not) to a snapshot file."""
+    return write_snapshot(path, encode_records(records))
+
+
+def json_to_snapshot(json_path, snapshot_path, model, key_type=str):
+    """Import a JSON store file into a snapshot file."""
+    with open(json_path, "rb") as file:
+        records = serialization.decode_mapping(file.read(), model, key_type=key_type)
+    return save_snapshot(snapshot_path, records)
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    """Export a snapshot file to a pretty-printed JSON store file."""
+    reader = SnapshotReader(snapshot_path)
+    try:
+        data = {key: reader.record(position) for position, key in enumerate(reader.keys)}
+    finally:
+        reader.close()
+    with open(json_path, "wb") as file:
+        file.write(serialization.dumps(data, pretty=True))
+    return len(data)
+
+
+def main(argv=None):
+    """Command line entry point for converting between JSON and snapshots."""
+    import argparse
+    from travel_common.models import Destination, User
+
+    models = {"destination": (Destination, int), "user": (User, str)}
+    parser = argparse.ArgumentParser(prog="python -m travel_common.snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Convert a JSON store into a snapshot")
+    import_cmd.add_argument("model", choices=sorted(models))
+    import_cmd.add_argument("json_path")
+    import_cmd.add_argument("snapshot_path")
+    export_cmd = commands.add_parser("export", help="Convert a snapshot into a JSON store")
+    export_cmd.add_argument("snapshot_path")
+    export_cmd.add_argument("json_path")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        model, key_type = models[args.model]
+        count = json_to_snapshot(args.json_path, args.snapshot_path, model, key_type)
+    else:
+        count = snapshot_to_json(args.snapshot_path, args.json_path)
+    print(f"Wrote {count} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# travel_common/startup.py
+"""
+Import-time profiling and cold-start budget for the service entry points.
+
+From a service directory:
+    python -m travel_common.startup            # profile "import app"
+    python -m travel_common.startup --budget 0.5 --code "import app; app.create_app()"
+
+The process exits with status 1 when the cold start exceeds the budget.
+"""
+import os
+import subprocess
+import sys
+import time
+
+# Cold start (interpreter + imports + app construction) allowed per service, in seconds
+DEFAULT_BUDGET_SECONDS = float(os.getenv("TRAVEL_STARTUP_BUDGET", "1.5"))
+
+
+class ImportRecord:
+    __slots__ = ("module", "self_us", "cumulative_us", "depth")
+
+    def __init__(self, module, self_us, cumulative_us, depth):
+        self.module = module
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+
+class StartupProfile:
+    """Result of one cold start: wall time plus the parsed -X importtime log."""
+
+    def __init__(self, wall_seconds, records):
+        self.wall_seconds = wall_seconds
+        self.records = records
+
+    @property
+    def modules(self):
+        return {record.module for record in self.records}
+
+    @property
+    def import_seconds(self):
+        return sum(record.self_us for record in self.records) / 1e6
+
+    def direct_imports(self, limit=10):
+        """Modules imported directly by the entry point, slowest (cumulative) first."""
+        direct = [record for record in self.records if record.depth == 1]
+        return sorted(direct, key=lambda record: record.cumulative_us, reverse=True)[:limit]
+
+    def slowest(self, limit=10):
+        """Individual modules sorted by their own import time, slowest first."""
+        return sorted(self.records, key=lambda record: record.self_us, reverse=True)[:limit]
+
+    def report(self, limit=10):
+        lines = [
+            f"cold start {self.wall_seconds:.3f}s, imports {self.import_seconds:.3f}s "
+            f"({len(self.records)} modules)",
+            "direct imports (cumulative):",
+        ]
+        lines += [f"  {r.cumulative_us / 1000:8.1f} ms  {r.module}" for r in self.direct_imports(limit)]
+        lines.append("slowest modules (self):")
+        lines += [f"  {r.self_us / 1000:8.1f} ms  {r.module}" for r in self.slowest(limit)]
+        return "\n".join(lines)
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of `python -X importtime`.
+    :return: List of ImportRecord, in the order the imports finished
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        records.append(ImportRecord(stripped, int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def profile_startup(code="import app", cwd=None, env=None):
+    """
+    Run code in a fresh interpreter and profile its imports.
+    :param code: Python statements performing the service start-up
+    :param cwd: Directory to run in (the service directory)
+    :param env: Extra environment variables for the child process
+    :return: StartupProfile
+    """
+    child_env = dict(os.environ, **(env or {}))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=child_env, capture_output=True, text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Start-up code failed:\n{result.stderr}")
+    return StartupProfile(wall_seconds, parse_importtime(result.stderr))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m travel_common.startup")
+    parser.add_argument("--code", default="import app")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    profile = profile_startup(args.code, cwd=os.getcwd())
+    print(profile.report(args.top))
+    within = profile.wall_seconds <= args.budget
+    print(f"budget {args.budget:.3f}s: {'ok' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# travel_common/stub_server.py
+"""
+Local HTTP server with canned responses, for testing service clients offline.
+
+Unlike the Flask development server it keeps connections alive (HTTP/1.1), so
+connection pooling behaves as it does against a production server.
+
+    with StubServer() as stub:
+        stub.add("GET", "/users/profile", {"email": "a@example.com"})
+        stub.add("GET", "/flaky", [(503, {"error": "busy"}), (200, {"ok": True})])
+        client = UsersClient(stub.url)
+
+A response is a body (dict/list sent as JSON, bytes or str as is, a generator
+streamed with chunked encoding), a (status, body) or (status, body, headers)
+tuple, or a callable taking the StubRequest and returning one of those. A list
+of such tuples or callables is served in order, the last one repeating.
+"""
+import json
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubRequest:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    def __repr__(self):
+        return f"StubRequest({self.method} {self.path})"
+
+
+def _normalize(response):
+    if not isinstance(response, tuple):
+        response = (200, response)
+    status, body = response[0], response[1]
+    headers = dict(response[2]) if len(response) > 2 else {}
+    if isinstance(body, (dict, list)) or body is None:
+        body = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers.setdefault("Content-Type", "application/json")
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    return status, body, headers
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        request = StubRequest(self.command, parts.path, parse_qs(parts.query), dict(self.headers), body)
+        stub.requests.append(request)
+
+        response = stub.next_response(self.command, parts.path)
+        if response is None:
+            response = (404, {"error": "No stub for this route"})
+        if callable(response):
+            response = response(request)
+        status, body, headers = _normalize(response)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if isinstance(body, types.GeneratorType):
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in body:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.requests = []
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, method, path, response):
+        """Set the response(s) for a route, replacing earlier ones."""
+        responses = list(response) if isinstance(response, list) and response and (
+            isinstance(response[0], tuple) or callable(response[0])) else [response]
+        with self._lock:
+            self._routes[(method.upper(), path)] = responses
+
+    def next_response(self, method, path):
+        with self._lock:
+            responses = self._routes.get((method, path))
+            if not responses:
+                return None
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    def calls(self, method, path):
+        """Number of requests received for a route."""
+        return sum(1 for r in self.requests if r.method == method and r.path == path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
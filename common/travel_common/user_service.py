@@ -0,0 +1,442 @@
+# travel_common/user_service.py
+import itertools
+import os
+import secrets
+import threading
+from travel_common import serialization, snapshot
+from travel_common.cache import MISSING, TTLCache
+from travel_common.indexes import DuplicateKeyError, GroupedSortedIndex, HashIndex, SortedIndex, normalize
+from travel_common.models.user import User
+from travel_common.auth_service import AuthService
+from travel_common.login_guard import LoginGuard
+from travel_common.validators import DEFAULT_PASSWORD_POLICY, validate_email, validate_password
+
+
+# Upper bound for range scans over string keys
+_KEY_MAX = "\U0010ffff"
+
+# One message for unknown emails and wrong passwords, so logins cannot enumerate accounts
+LOGIN_FAILED = "Invalid email or password"
+
+
+def _email_key(user):
+    return user.email.lower()
+
+
+def _role_key(user):
+    return user.role
+
+
+class UserService:
+    # Path to the JSON file; each service points this at its own data file
+    users_file = "users.json"
+    # Persistence format: "json", or "snapshot" for a lazily decoded binary file
+    storage_format = os.getenv("TRAVEL_STORAGE_FORMAT", "json")
+    # Password strength rules applied on registration (a validators.PasswordPolicy)
+    password_policy = DEFAULT_PASSWORD_POLICY
+    # Seconds an encoded profile (and a missing user) is served from the profile cache
+    profile_cache_ttl = float(os.getenv("TRAVEL_PROFILE_CACHE_TTL", "30"))
+    profile_cache_negative_ttl = float(os.getenv("TRAVEL_PROFILE_CACHE_NEGATIVE_TTL", "5"))
+    # Journal entries appended before the whole store is rewritten and the journal emptied
+    journal_compact_entries = int(os.getenv("TRAVEL_JOURNAL_COMPACT_ENTRIES", "1000"))
+    # Number of per-user locks; emails are spread over them by hash
+    lock_stripes = 64
+
+    def __init__(self, users_file=None):
+        if users_file is not None:
+            self.users_file = users_file
+        self._journal_entries = 0
+        self._write_lock = threading.Lock()
+        # Held while the indexes are built and while users are added, replaced or removed
+        self._index_lock = threading.RLock()
+        # Profile and password changes of one user are applied under its stripe lock
+        self._locks = tuple(threading.Lock() for _ in range(self.lock_stripes))
+        self.users = self._load_users_from_file()
+        self.login_guard = LoginGuard()
+        # Secondary indexes are built on first use, so a lazily loaded snapshot stays lazy
+        self._indexes = None
+        self._role_index = None
+        # Encoded profiles by lowercased email; invalidated whenever a user changes
+        self.profile_cache = TTLCache(self.profile_cache_ttl, self.profile_cache_negative_ttl)
+
+    @property
+    def snapshot_file(self):
+        """Path of the binary snapshot kept next to the JSON file."""
+        return os.path.splitext(self.users_file)[0] + ".snap"
+
+    @property
+    def journal_file(self):
+        """Path of the journal of changes made since the store was last written in full."""
+        return os.path.splitext(self.users_file)[0] + ".journal"
+
+    @property
+    def indexes(self):
+        """
+        Secondary indexes over lowercased emails: email (exact lookups, unique)
+        and email_sorted (prefix search). The store is keyed by email, so they
+        are built from the keys without decoding any record.
+        """
+        if self._indexes is None:
+            with self._index_lock:
+                if self._indexes is None:
+                    indexes = {
+                        "email": HashIndex(_email_key, unique=True, label="email"),
+                        "email_sorted": SortedIndex(_email_key),
+                    }
+                    keys = [(email.lower(), email) for email in self.users.keys()]
+                    for key, email in keys:
+                        indexes["email"].add_key(email, key)
+                    # One sort instead of an insort per user
+                    indexes["email_sorted"].build_keys(keys)
+                    self._indexes = indexes
+        return self._indexes
+
+    @property
+    def role_index(self):
+        """Users of each role in email order; built on first use, decoding every record."""
+        if self._role_index is None:
+            with self._index_lock:
+                if self._role_index is None:
+                    role_index = GroupedSortedIndex(_role_key, _email_key)
+                    role_index.build(self.users.items())
+                    self._role_index = role_index
+        return self._role_index
+
+    def _index(self, email, user):
+        if self._indexes is not None:
+            for index in self._indexes.values():
+                index.add(email, user)
+        if self._role_index is not None:
+            self._role_index.add(email, user)
+
+    def _unindex(self, email, user):
+        if self._indexes is not None:
+            for index in self._indexes.values():
+                index.remove(email, user)
+        if self._role_index is not None:
+            self._role_index.remove(email, user)
+
+    def _load_users_from_file(self):
+        """Load users from the snapshot or JSON file if it exists, then replay the journal."""
+        if self.storage_format == "snapshot" and os.path.exists(self.snapshot_file):
+            # Records are decoded on first access instead of all up front
+            users = snapshot.load_snapshot(self.snapshot_file, User)
+        else:
+            try:
+                with open(self.users_file, "rb") as file:
+                    data = file.read()
+            except FileNotFoundError:
+                data = None  # Start empty if the file doesn't exist
+
+            try:
+                # Decode the records straight into User objects
+                users = serialization.decode_mapping(data, User) if data is not None else {}
+            except serialization.SerializationError:
+                raise ValueError("Error decoding the users file")
+        self._replay_journal(users)
+        return users
+
+    def _replay_journal(self, users):
+        """Apply the journaled changes to users loaded from the last full save."""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "rb+") as file:
+            data = file.read()
+            # A write cut short by a crash leaves a partial last line; drop it
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                file.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                entry = serialization.loads(line)
+            except serialization.SerializationError:
+                raise ValueError("Error decoding the users journal")
+            if entry.get("deleted"):
+                users.pop(entry["email"], None)
+            else:
+                users[entry["email"]] = User.from_dict(entry["user"])
+            self._journal_entries += 1
+
+    def _save_users_to_file(self, changed=None):
+        """
+        Save users to the snapshot or JSON file.
+        :param changed: Email of the one user that changed; only that record is
+            appended to the journal, and the store is rewritten once the journal is long
+        """
+        with self._write_lock:
+            if (changed is not None and self._journal_entries < self.journal_compact_entries
+                    # The first change after switching formats writes the snapshot
+                    and (self.storage_format != "snapshot" or os.path.exists(self.snapshot_file))):
+                user = self.users.get(changed)
+                entry = {"email": changed, "user": user.to_dict()} if user else {"email": changed, "deleted": True}
+                with open(self.journal_file, "ab") as file:
+                    file.write(serialization.dumps(entry) + b"\n")
+                self._journal_entries += 1
+                return
+
+            with self._index_lock:
+                # Users are replaced, never changed in place, so a shallow copy is a consistent view
+                users = self.users.copy()
+            if self.storage_format == "snapshot":
+                snapshot.save_snapshot(self.snapshot_file, users)
+            else:
+                data = serialization.dumps(
+                    {email: user.to_dict() for email, user in users.items()},
+                    pretty=True
+                )
+                # Compaction runs on the normal write path; never leave a truncated file
+                snapshot.write_atomic(self.users_file, (data,))
+            # Everything in the journal is now part of the full save
+            try:
+                os.remove(self.journal_file)
+            except FileNotFoundError:
+                pass
+            self._journal_entries = 0
+
+    def flush(self):
+        """Fold the journal into a full save (at shutdown), so the next start has nothing to replay."""
+        if self._journal_entries:
+            self._save_users_to_file()
+
+    def register_user(self, name, email, password, role="user"):
+        """Register a new user."""
+        # Validate inputs
+        if not validate_email(email):
+            raise ValueError("Invalid email format")
+        if not validate_password(password, self.password_policy):
+            raise ValueError("Password does not meet requirements")
+
+        # Check if email already exists (in any letter case)
+        self._check_email_free(email)
+
+        # Hash password (stored as text so it survives JSON persistence)
+        hashed_password = AuthService.hash_password(password).decode("utf-8")
+
+        # Create a user object; checked again in case the email was taken while hashing.
+        # The token version starts at a random value: tokens issued to an earlier,
+        # deleted account with this email carry that account's version and never match
+        user = User(name, email, hashed_password, role, token_version=secrets.randbelow(2 ** 31) + 1)
+        with self._index_lock:
+            self._check_email_free(email)
+            self.users[email] = user
+            self._index(email, user)
+        self.profile_cache.invalidate(email.lower())  # Drop a cached "not found"
+
+        # Append the new record to the journal
+        self._save_users_to_file(changed=email)
+
+        return user
+
+    def _lock_for(self, email):
+        return self._locks[hash(email.lower()) % len(self._locks)]
+
+    def _replace_user(self, user, **changes):
+        """
+        Store a copy of a user with some fields changed. Must be called with the
+        user's lock held.
+        :raises ValueError: If the user was deleted (or re-registered) meanwhile
+        """
+        record = user.to_dict()
+        record.update(changes)
+        updated = User.from_dict(record)
+        with self._index_lock:
+            if self.users.get(user.email) is not user:
+                raise ValueError("User not found")
+            self._unindex(user.email, user)
+            self.users[user.email] = updated
+            self._index(user.email, updated)
+        self.profile_cache.invalidate(user.email.lower())
+        return updated
+
+    def _check_email_free(self, email):
+        try:
+            self.indexes["email"].check(None, email.lower())
+        except DuplicateKeyError:
+            raise ValueError("Email already registered")
+
+    def find_user(self, email):
+        """
+        Look up a user by email, ignoring letter case.
+        :return: User, or None
+        """
+        user = self.users.get(email)
+        if user is None and isinstance(email, str):
+            emails = self.indexes["email"].get(email.lower())
+            user = self.users.get(emails[0]) if emails else None
+        return user
+
+    def delete_user(self, email):
+        """
+        Remove a user.
+        :raises ValueError: If there is no such user
+        """
+        with self._index_lock:
+            user = self.find_user(email)
+            if user is None:
+                raise ValueError("User not found")
+            del self.users[user.email]
+            self._unindex(user.email, user)
+        self.profile_cache.invalidate(user.email.lower())
+        self._save_users_to_file(changed=user.email)
+        return user
+
+    def update_profile(self, email, name=None):
+        """
+        Change the editable profile fields of a user (currently the name).
+        :return: The updated profile
+        :raises ValueError: If there is no such user or a field is invalid
+        """
+        with self._lock_for(email):
+            user = self.find_user(email)
+            if user is None:
+                raise ValueError("User not found")
+            if name is not None:
+                if not isinstance(name, str) or not name.strip():
+                    raise ValueError("Name must not be empty")
+                user = self._replace_user(user, name=name.strip())
+        self._save_users_to_file(changed=user.email)
+        return user.to_profile()
+
+    def change_password(self, email, current_password, new_password):
+        """
+        Replace a user's password after checking the current one. Tokens issued
+        before the change stop being accepted (see token_is_current).
+        :return: A new token for the user
+        :raises ValueError: If there is no such user, the current password is
+            wrong or the new one does not meet the policy
+        """
+        if self.find_user(email) is None:
+            raise ValueError("User not found")
+        if not validate_password(new_password, self.password_policy):
+            raise ValueError("Password does not meet requirements")
+        # Checked and changed under the user's lock, so of two concurrent changes
+        # the second has to know the password the first one set
+        with self._lock_for(email):
+            user = self.find_user(email)
+            if user is None:
+                raise ValueError("User not found")
+            # bcrypt runs on the shared hashing pool, which bounds concurrent hashes
+            if not AuthService.verify_password_pooled(current_password, user.password):
+                raise ValueError("Invalid password")
+            password = AuthService.hash_password_pooled(new_password).decode("utf-8")
+            user = self._replace_user(user, password=password, token_version=user.token_version + 1)
+        self._save_users_to_file(changed=user.email)
+        return AuthService.generate_token(user)
+
+    def token_is_current(self, claims):
+        """
+        Whether a decoded token belongs to an existing user, predates no password
+        change, and was issued to this account rather than a deleted one with the same email.
+        """
+        user = self.find_user(claims.get("email"))
+        return user is not None and claims.get("tv", 0) == user.token_version
+
+    def login_user(self, email, password):
+        """Authenticate user and generate token."""
+        user = self.find_user(email)
+        if not user:
+            # Take as long as a real check, and fail with the same message, so
+            # neither the response time nor the body reveals which accounts exist
+            self.login_guard.reject_unknown_user(password)
+            raise ValueError(LOGIN_FAILED)
+
+        # Verify the password
+        if not self.login_guard.verify_password(password, user.password):
+            raise ValueError(LOGIN_FAILED)
+
+        # Generate a JWT token
+        return AuthService.generate_token(user)
+
+    def get_user_profile(self, email):
+        """Retrieve a user's profile."""
+        user = self.find_user(email)
+        if not user:
+            raise ValueError("User not found")
+
+        return user.to_profile()
+
+    def _encode_profile(self, key):
+        user = self.find_user(key)
+        return serialization.dumps(user.to_profile()) if user is not None else MISSING
+
+    def prime_profile_cache(self, limit=1000):
+        """
+        Encode the profiles of up to limit users (admins first) into the profile cache.
+        From a snapshot, the first users in store order are primed instead, so only
+        those records are decoded (ordering by role decodes the whole store).
+        """
+        if self.storage_format == "snapshot" and self._role_index is None:
+            emails = list(itertools.islice(self.users.keys(), limit))
+            for email in emails:
+                self.get_profile_json(email)
+            return len(emails)
+        primed = 0
+        for role in ("admin", "user"):
+            for user in self.iter_users(role):
+                if primed >= limit:
+                    return primed
+                self.get_profile_json(user.email)
+                primed += 1
+        return primed
+
+    def get_profile_json(self, email):
+        """
+        A user's profile encoded as JSON bytes, served from the profile cache.
+        :raises ValueError: If there is no such user
+        """
+        data = self.profile_cache.get(email.lower(), self._encode_profile)
+        if data is MISSING:
+            raise ValueError("User not found")
+        return data
+
+    def list_users(self, role="user", after=None, limit=100, email_prefix=None, name_prefix=None):
+        """
+        One page of the users with a role, in (case-insensitive) email order.
+        :param after: Cursor returned with the previous page (None for the first page)
+        :param limit: Page size
+        :param email_prefix: Only emails starting with this (case-insensitive)
+        :param name_prefix: Only names starting with this (case-insensitive)
+        :return: (users, cursor for the next page or None when this was the last page)
+        """
+        role_index = self.role_index
+        low = email_prefix.lower() if email_prefix else ""
+        high = low + _KEY_MAX if email_prefix else _KEY_MAX
+        if after is not None and after >= low:
+            low = after + "\0"  # Smallest key sorting after the cursor
+        name_prefix = normalize(name_prefix) if name_prefix else None
+
+        users = []
+        while True:
+            # One key more than needed tells whether another page follows
+            batch = max(limit - len(users) + 1, 64 if name_prefix else 1)
+            # Read under the index lock, which every change of the indexes holds
+            with self._index_lock:
+                emails = role_index.range(role, low, high, batch)
+            for email in emails:
+                user = self.users.get(email)
+                if user is None or (name_prefix and not normalize(user.name).startswith(name_prefix)):
+                    continue
+                if len(users) == limit:
+                    return users, _email_key(users[-1])
+                users.append(user)
+            if len(emails) < batch:
+                return users, None  # No more keys in range
+            low = emails[-1].lower() + "\0"
+
+    def search_users(self, prefix, limit=20):
+        """
+        Users of any role whose email starts with prefix (case-insensitive), in email order.
+        :param limit: Maximum number of users returned
+        """
+        with self._index_lock:
+            emails = self.indexes["email_sorted"].prefix(prefix.lower(), limit)
+        return [self.users[email] for email in emails if email in self.users]
+
+    def iter_users(self, role="user", email_prefix=None, name_prefix=None, page_size=1000):
+        """Yield every user with a role in email order, one index page at a time."""
+        after = None
+        while True:
+            users, after = self.list_users(role, after, page_size, email_prefix, name_prefix)
+            yield from users
+            if after is None:
+                return
@@ -0,0 +1,106 @@
+# travel_common/validators.py
+import re
+import string
+
+# Compiled once at import; fullmatch also rejects a trailing newline that "$" let through
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+_UPPERCASE = frozenset(string.ascii_uppercase)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+_SPECIAL = frozenset(string.punctuation)
+
+
+class PasswordPolicy:
+    """Password strength rules, checked in a single pass over the password."""
+
+    __slots__ = ("min_length", "max_length", "require_upper", "require_lower",
+                 "require_digit", "require_special")
+
+    def __init__(self, min_length=8, max_length=None, require_upper=True,
+                 require_lower=True, require_digit=True, require_special=False):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.require_upper = require_upper
+        self.require_lower = require_lower
+        self.require_digit = require_digit
+        self.require_special = require_special
+
+    def violations(self, password):
+        """
+        List the rules a password breaks.
+        :param password: Plain text password
+        :return: List of rule names (empty if the password is acceptable)
+        """
+        if not isinstance(password, str):
+            return ["type"]
+        failed = []
+        if len(password) < self.min_length:
+            failed.append("min_length")
+        if self.max_length is not None and len(password) > self.max_length:
+            failed.append("max_length")
+        # One C-level pass builds the character set; the class checks below only
+        # look at distinct characters
+        chars = set(password)
+        if self.require_upper and chars.isdisjoint(_UPPERCASE):
+            failed.append("upper")
+        if self.require_lower and chars.isdisjoint(_LOWERCASE):
+            failed.append("lower")
+        if self.require_digit and not any(map(str.isdecimal, chars)):
+            failed.append("digit")
+        if self.require_special and chars.isdisjoint(_SPECIAL):
+            failed.append("special")
+        return failed
+
+    def check(self, password):
+        """Return True if the password satisfies every rule."""
+        if not isinstance(password, str) or len(password) < self.min_length:
+            return False
+        if self.max_length is not None and len(password) > self.max_length:
+            return False
+        chars = set(password)
+        if self.require_upper and chars.isdisjoint(_UPPERCASE):
+            return False
+        if self.require_lower and chars.isdisjoint(_LOWERCASE):
+            return False
+        if self.require_digit and not any(map(str.isdecimal, chars)):
+            return False
+        if self.require_special and chars.isdisjoint(_SPECIAL):
+            return False
+        return True
+
+
+# At least 8 characters, one uppercase, one lowercase, one number
+DEFAULT_PASSWORD_POLICY = PasswordPolicy()
+
+
+def validate_email(email):
+    """Validate email format."""
+    return isinstance(email, str) and EMAIL_PATTERN.fullmatch(email) is not None
+
+
+def validate_password(password, policy=DEFAULT_PASSWORD_POLICY):
+    """Validate password strength."""
+    return policy.check(password)
+
+
+def validate_emails(emails):
+    """
+    Validate many emails at once (e.g. rows of a bulk import).
+    :return: List of booleans, one per email
+    """
+    if not isinstance(emails, (list, tuple)):
+        emails = list(emails)
+    fullmatch = EMAIL_PATTERN.fullmatch
+    try:
+        return [match is not None for match in map(fullmatch, emails)]
+    except TypeError:
+        # Some rows are not strings; fall back to checking them one by one
+        return [validate_email(email) for email in emails]
+
+
+def validate_passwords(passwords, policy=DEFAULT_PASSWORD_POLICY):
+    """
+    Validate many passwords at once against one policy.
+    :return: List of booleans, one per password
+    """
+    return list(map(policy.check, passwords))
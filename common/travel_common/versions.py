@@ -0,0 +1,139 @@
+# travel_common/versions.py
+"""
+Per-record modification versions and tombstones for delta sync.
+
+Every change takes the next number from one catalogue-wide counter. A client
+that remembers the counter value it last synced at asks for everything with a
+higher version. Records and tombstones are kept in version order, so answering
+walks back from the newest entry and stops at the first one the client already
+has: the work is proportional to the churn, not to the catalogue size.
+
+Tombstones (deleted ids) are dropped once they are older than the retention
+window. A client whose version predates a dropped tombstone might have missed a
+deletion, so it is told to reset (re-fetch everything).
+"""
+import threading
+import time
+
+
+class VersionTracker:
+
+    def __init__(self, retention_seconds=7 * 24 * 3600, clock=time.time):
+        """
+        :param retention_seconds: How long tombstones of deleted records are kept
+        :param clock: Wall clock used to timestamp tombstones
+        """
+        self.retention_seconds = retention_seconds
+        self.clock = clock
+        self.version = 0
+        # Highest version of a tombstone dropped by compaction
+        self.compacted_version = 0
+        # id -> version, and id -> (version, deleted_at); both in ascending version order
+        self.records = {}
+        self.tombstones = {}
+        self._lock = threading.RLock()
+
+    def touch(self, record_id):
+        """
+        Record that a record was created or changed.
+        :return: The record's new version
+        """
+        with self._lock:
+            self.version += 1
+            self.records.pop(record_id, None)
+            self.records[record_id] = self.version
+            self.tombstones.pop(record_id, None)  # An id may be reused after a restart
+            return self.version
+
+    def delete(self, record_id):
+        """
+        Replace a record's version with a tombstone.
+        :return: Version of the tombstone
+        """
+        with self._lock:
+            self.version += 1
+            self.records.pop(record_id, None)
+            self.tombstones[record_id] = (self.version, self.clock())
+            self.compact()
+            return self.version
+
+    def version_of(self, record_id):
+        """Version of a live record, or None."""
+        return self.records.get(record_id)
+
+    def changes_since(self, version):
+        """
+        Ids changed and deleted after a version.
+        :param version: Catalogue version the client last synced at
+        :return: (changed_ids, deleted_ids, reset, current_version); reset means the
+            client has to re-fetch everything because deletions it needs were already
+            compacted (or the version is from the future). current_version is read
+            under the same lock, so it covers exactly the changes returned
+        """
+        with self._lock:
+            self.compact()
+            if version < self.compacted_version or version > self.version:
+                return [], [], True, self.version
+            return (self._newer(self.records, version), self._newer(self.tombstones, version),
+                    False, self.version)
+
+    @staticmethod
+    def _newer(entries, version):
+        newer = []
+        for record_id in reversed(entries):
+            entry = entries[record_id]
+            if (entry[0] if type(entry) is tuple else entry) <= version:
+                break
+            newer.append(record_id)
+        newer.reverse()
+        return newer
+
+    def compact(self, now=None):
+        """
+        Drop tombstones older than the retention window.
+        :return: Number of tombstones dropped
+        """
+        cutoff = (self.clock() if now is None else now) - self.retention_seconds
+        dropped = 0
+        with self._lock:
+            for record_id in list(self.tombstones):
+                version, deleted_at = self.tombstones[record_id]
+                if deleted_at >= cutoff:
+                    break
+                del self.tombstones[record_id]
+                self.compacted_version = max(self.compacted_version, version)
+                dropped += 1
+        return dropped
+
+    def reconcile(self, record_ids):
+        """
+        Match the tracked versions to the records actually loaded: records
+        without a version get a new one and tracked records that disappeared
+        get a tombstone.
+        """
+        record_ids = set(record_ids)
+        for record_id in [rid for rid in self.records if rid not in record_ids]:
+            self.delete(record_id)
+        for record_id in sorted(record_ids.difference(self.records)):
+            self.touch(record_id)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "version": self.version,
+                "compacted_version": self.compacted_version,
+                "records": dict(self.records),
+                "tombstones": {rid: list(entry) for rid, entry in self.tombstones.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data, key_type=int, **kwargs):
+        """Rebuild a tracker saved with to_dict() (JSON turns the ids into strings)."""
+        tracker = cls(**kwargs)
+        tracker.version = data.get("version", 0)
+        tracker.compacted_version = data.get("compacted_version", 0)
+        records = ((key_type(rid), version) for rid, version in data.get("records", {}).items())
+        tracker.records = dict(sorted(records, key=lambda item: item[1]))
+        tombstones = ((key_type(rid), tuple(entry)) for rid, entry in data.get("tombstones", {}).items())
+        tracker.tombstones = dict(sorted(tombstones, key=lambda item: item[1][0]))
+        return tracker
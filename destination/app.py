@@ -1,9 +1,20 @@
-from flask import Flask, request
+from flask import Flask, Response, g, request
 from flask_restx import Api, Resource, fields
-from services.destination_service import DestinationService
-from services.auth_service import AuthService
+from travel_common.config import configure_proxies, swagger_doc_path
+from travel_common.health import register_health, warm_up_auth, warm_up_request, warm_up_unless_lazy
+from travel_common.lifecycle import register_lifecycle
+from travel_common.request_validation import configure_body_limits, validate_body, validate_items
+from travel_common.serialization import dumps, register_json_representation
+from services.destination_service import (
+    CoordinateError, DestinationService, DuplicateKeyError, VersionConflictError,
+)
+from utils.authorization import require_auth
 
 app = Flask(__name__)
+# Client addresses from X-Forwarded-For when behind the gateway (TRUSTED_PROXIES)
+configure_proxies(app)
+# Body size limits (MAX_CONTENT_LENGTH, MAX_JSON_BODY_BYTES) checked before parsing
+configure_body_limits(app)
 
 # Initialize Flask-RESTX API with Swagger UI enabled
 api = Api(
@@ -11,7 +22,7 @@ api = Api(
     version="1.0",
     title="Destination",
     description="Travel API Microservices",
-    doc="/swagger",  # Custom Swagger UI endpoint
+    doc=swagger_doc_path("/swagger"),  # Custom Swagger UI endpoint (TRAVEL_SWAGGER_DOCS=0 disables)
     security='BearerAuth'  # Add security definitions
 )
 
@@ -25,6 +36,9 @@ api.authorizations = {
     }
 }
 
+# Encode responses with the fastest available JSON backend
+register_json_representation(api)
+
 # Initialize services
 destination_service = DestinationService()
 
@@ -38,93 +52,298 @@ destination_model = api.model(
             required=True, description="Destination Description"
         ),
         "location": fields.String(required=True, description="Destination Location"),
+        "latitude": fields.Float(required=False, description="Latitude in decimal degrees"),
+        "longitude": fields.Float(required=False, description="Longitude in decimal degrees"),
     },
 )
 
 
+# Longest a long-poll request for changes may block, and the SSE keep-alive interval
+CHANGES_MAX_WAIT_SECONDS = 30
+CHANGES_HEARTBEAT_SECONDS = 15
+CHANGES_PAGE_SIZE = 500
+# Cache-Control for single destinations; clients revalidate with If-None-Match afterwards
+DESTINATION_CACHE_CONTROL = "public, max-age=30, must-revalidate"
+MAX_BATCH_IDS = 100
+# Defaults and caps for /destinations/nearby
+NEARBY_DEFAULT_RADIUS_KM = 50.0
+NEARBY_MAX_RADIUS_KM = 20_000.0
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
+
+
+def destination_etag(version):
+    """Strong ETag of a destination version."""
+    return f'"v{version}"'
+
+
+def if_match_version():
+    """
+    Version required by the request's If-Match header.
+    :return: None when there is no precondition (or "*"), otherwise the version;
+        -1 when the header names no version of ours, which never matches
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    for etag in request.if_match.as_set():
+        if etag[:1] == "v" and etag[1:].isdigit():
+            return int(etag[1:])
+    return -1
+
+
+def version_conflict(error):
+    """412 response telling the client which version is current."""
+    return {"error": str(error)}, 412, {"ETag": f'"v{error.current_version}"'}
+
+
+def stream_changes(since):
+    """Server-Sent Events: one event per change, forever (until the client disconnects)."""
+    changes = destination_service.changes
+    while True:
+        events, reset = changes.wait(since, timeout=CHANGES_HEARTBEAT_SECONDS, limit=CHANGES_PAGE_SIZE)
+        if reset:
+            # The client missed events; it has to re-fetch the list, then follow from here
+            since = changes.last_seq
+            yield f"id: {since}\nevent: reset\ndata: {{}}\n\n"
+            continue
+        if not events:
+            yield ": keep-alive\n\n"
+            continue
+        for event in events:
+            yield f"id: {event.seq}\nevent: {event.type}\ndata: {dumps(event.to_dict()).decode()}\n\n"
+        since = events[-1].seq
+
+
 # Destination List Route
 @destination_ns.route("")
 class DestinationList(Resource):
+    @api.doc(params={
+        "since_version": "Return only destinations changed or deleted after this catalogue version",
+        "ids": f"Comma separated ids to fetch in one request (at most {MAX_BATCH_IDS})",
+        "location": "Only destinations in this location (case-insensitive)",
+        "name_prefix": "Only destinations whose name starts with this (case-insensitive)",
+    })
     def get(self):
-        """Retrieve all destinations"""
-        destinations = destination_service.get_all_destinations()
-        return [vars(dest) for dest in destinations], 200
+        """Retrieve all destinations, some of them by id or location, or the changes since a catalogue version"""
+        location = request.args.get("location")
+        if location is not None:
+            return [dest.to_dict() for dest in destination_service.find_by_location(location)], 200
+        name_prefix = request.args.get("name_prefix")
+        if name_prefix is not None:
+            return [dest.to_dict() for dest in destination_service.find_by_name_prefix(name_prefix)], 200
+
+        ids = request.args.get("ids")
+        if ids is not None:
+            try:
+                dest_ids = [int(dest_id) for dest_id in ids.split(",") if dest_id.strip()]
+            except ValueError:
+                return {"error": "'ids' must be a comma separated list of integers"}, 400
+            if len(dest_ids) > MAX_BATCH_IDS:
+                return {"error": f"At most {MAX_BATCH_IDS} ids per request"}, 400
+            found, missing = destination_service.get_destinations(dest_ids)
+            return {"destinations": [dest.to_dict() for dest in found], "missing": missing}, 200
+
+        since_version = request.args.get("since_version")
+        if since_version is not None:
+            try:
+                delta = destination_service.changes_since(int(since_version))
+            except ValueError:
+                return {"error": "'since_version' must be an integer"}, 400
+            delta["changed"] = [dest.to_dict() for dest in delta["changed"]]
+            return delta, 200
+
+        destinations, version = destination_service.get_catalogue()
+        # Clients keep this version and pass it as since_version on their next sync
+        return [dest.to_dict() for dest in destinations], 200, {
+            "X-Catalogue-Version": str(version)
+        }
 
     @api.expect(destination_model)
+    @require_auth("destinations:write", missing=("Token required", 401))
+    @validate_body(destination_model)
     def post(self):
         """Add a new destination (Admin only)"""
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return {"error": "Token required"}, 401
-        token = auth_header
+        try:
+            data = g.payload
+            destination = destination_service.add_destination(
+                data["name"], data["description"], data["location"],
+                data.get("latitude"), data.get("longitude")
+            )
+            return destination.to_dict(), 201
+        except DuplicateKeyError as e:
+            return {"error": str(e)}, 409
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
-        if not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
 
+# Change feed: Server-Sent Events (Accept: text/event-stream) or JSON long-poll
+@destination_ns.route("/changes")
+class DestinationChanges(Resource):
+    @api.doc(params={
+        "since": "Last sequence number seen (0 for all retained events)",
+        "wait": f"Seconds to wait for a change when there is none yet (max {CHANGES_MAX_WAIT_SECONDS})",
+    })
+    def get(self):
+        """Changes to destinations after a sequence number"""
         try:
-            data = request.json
-            destination = destination_service.add_destination(
-                data["name"], data["description"], data["location"]
+            since = int(request.args.get("since") or request.headers.get("Last-Event-ID") or 0)
+            wait = min(float(request.args.get("wait", 0)), CHANGES_MAX_WAIT_SECONDS)
+        except ValueError:
+            return {"error": "'since' must be an integer and 'wait' a number"}, 400
+
+        if request.accept_mimetypes.best == "text/event-stream":
+            return Response(
+                stream_changes(since),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
-            return vars(destination), 201
+
+        changes = destination_service.changes
+        if wait > 0:
+            events, reset = changes.wait(since, timeout=wait, limit=CHANGES_PAGE_SIZE)
+        else:
+            events, reset = changes.since(since, limit=CHANGES_PAGE_SIZE)
+        return {
+            "events": [event.to_dict() for event in events],
+            "last_seq": events[-1].seq if events else (changes.last_seq if reset else since),
+            "reset": reset,
+        }, 200
+
+
+# Nearby route; served from the grid spatial index
+@destination_ns.route("/nearby")
+class DestinationNearby(Resource):
+    @api.doc(params={
+        "lat": "Latitude of the point", "lon": "Longitude of the point",
+        "radius": f"Search radius in km (default {NEARBY_DEFAULT_RADIUS_KM:g}, max {NEARBY_MAX_RADIUS_KM:g})",
+        "limit": f"Number of nearest destinations (default {NEARBY_DEFAULT_LIMIT}, max {NEARBY_MAX_LIMIT})",
+    })
+    def get(self):
+        """Destinations nearest to a point, within a radius"""
+        try:
+            latitude, longitude = float(request.args["lat"]), float(request.args["lon"])
+            radius = float(request.args.get("radius", NEARBY_DEFAULT_RADIUS_KM))
+            limit = int(request.args.get("limit", NEARBY_DEFAULT_LIMIT))
+        except (KeyError, ValueError):
+            return {"error": "'lat' and 'lon' are required numbers; 'radius' and 'limit' must be numbers"}, 400
+        if not 0 < radius <= NEARBY_MAX_RADIUS_KM or not 0 < limit <= NEARBY_MAX_LIMIT:
+            return {"error": f"'radius' must be in (0, {NEARBY_MAX_RADIUS_KM:g}] and 'limit' in [1, {NEARBY_MAX_LIMIT}]"}, 400
+        try:
+            nearby = destination_service.find_nearby(latitude, longitude, radius, limit)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [dict(dest.to_dict(), distance_km=round(distance, 3)) for dest, distance in nearby], 200
+
+
+# Bulk import route; the array is parsed item by item from the request stream
+@destination_ns.route("/bulk")
+class DestinationBulk(Resource):
+    @api.expect([destination_model])
+    @require_auth("destinations:write")
+    @validate_items(destination_model)
+    def post(self):
+        """Add many destinations in one request (Admin only)"""
+        try:
+            destinations = destination_service.add_destinations(g.payload)
+        except DuplicateKeyError as e:
+            return {"error": str(e)}, 409
         except ValueError as e:
             return {"error": str(e)}, 400
+        return [dest.to_dict() for dest in destinations], 201
 
 
-# Destination Resource Route (For delete, update, or partial update of destinations)
+# Destination Resource Route (For fetching, deleting, updating or partially updating one destination)
 @destination_ns.route("/<int:dest_id>")
 class DestinationResource(Resource):
+    def get(self, dest_id):
+        """Retrieve one destination"""
+        try:
+            record, version = destination_service.get_destination(dest_id, versioned=True)
+        except ValueError as e:
+            return {"error": str(e)}, 404
+        headers = {"ETag": destination_etag(version), "Cache-Control": DESTINATION_CACHE_CONTROL}
+        if request.if_none_match.contains_weak(headers["ETag"].strip('"')):
+            return None, 304, headers
+        return record, 200, headers
+
+    @require_auth(
+        "destinations:write",
+        missing=("Please! authorize with token first..", 401),
+        forbidden=("Admin access required.", 403),
+    )
     def delete(self, dest_id):
         """Delete a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if token is None:
-            return {"error": "Please! authorize with token first.."}, 401
-        if not AuthService.check_admin_access(token):
-            return {"error": "Admin access required."}, 403
-
         try:
-            destination_service.delete_destination(dest_id)
+            destination_service.delete_destination(dest_id, expected_version=if_match_version())
             return {"message": "Destination deleted successfully"}, 200
+        except VersionConflictError as e:
+            return version_conflict(e)
         except ValueError as e:
             return {"error": str(e)}, 404
 
     @api.expect(destination_model)
+    @require_auth("destinations:write")
+    @validate_body(destination_model)
     def put(self, dest_id):
         """Replace a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if not token or not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
-
-        data = request.json
+        data = g.payload
         try:
-            updated_destination = destination_service.update_destination(
-                dest_id, data["name"], data["description"], data["location"]
+            record, version = destination_service.update_destination(
+                dest_id, data["name"], data["description"], data["location"],
+                data.get("latitude"), data.get("longitude"),
+                expected_version=if_match_version(), versioned=True,
             )
-            return vars(updated_destination), 200
+            return record, 200, {"ETag": destination_etag(version)}
+        except VersionConflictError as e:
+            return version_conflict(e)
+        except DuplicateKeyError as e:
+            return {"error": str(e)}, 409
+        except CoordinateError as e:
+            return {"error": str(e)}, 400
         except ValueError as e:
             return {"error": str(e)}, 404
 
     @api.expect(destination_model, validate=False)
+    @require_auth("destinations:write")
+    @validate_body(destination_model, partial=True)
     def patch(self, dest_id):
         """Partially update a destination (Admin only)"""
-        token = request.headers.get("Authorization")
-        if not token or not AuthService.check_admin_access(token):
-            return {"error": "Admin access required"}, 403
-
-        data = request.json
+        data = g.payload
         try:
-            updated_destination = destination_service.partial_update_destination(
-                dest_id, data
+            record, version = destination_service.partial_update_destination(
+                dest_id, data, expected_version=if_match_version(), versioned=True
             )
-            return vars(updated_destination), 200
+            return record, 200, {"ETag": destination_etag(version)}
+        except VersionConflictError as e:
+            return version_conflict(e)
+        except DuplicateKeyError as e:
+            return {"error": str(e)}, 409
+        except CoordinateError as e:
+            return {"error": str(e)}, 400
         except ValueError as e:
             return {"error": str(e)}, 404
 
 
+# /healthz and /readyz; ready once the service is warmed up
+readiness = register_health(app)
+readiness.add_step("stores", lambda: len(destination_service.destinations))
+readiness.add_step("indexes", warm_up_unless_lazy(destination_service, lambda: destination_service.indexes))
+# Encodes the whole catalogue once through the list route
+readiness.add_step("catalogue", warm_up_unless_lazy(destination_service, warm_up_request(app, "/destinations")))
+readiness.add_step("auth", warm_up_auth)
+readiness.add_step("request", warm_up_request(app, "/swagger.json"))
+
+# On SIGTERM: drain requests, then write the destinations and versions out
+lifecycle = register_lifecycle(app)
+lifecycle.add_flush("destinations", destination_service.flush)
+
+
 if __name__ == "__main__":
     # Load initial data from the JSON file or seed default destinations if empty
     if not destination_service.get_all_destinations():
         destination_service.add_destination('Paris', 'Beautiful city of lights', 'France')
         destination_service.add_destination('Tokyo', 'Vibrant metropolitan city', 'Japan')
 
+    readiness.start()
+    lifecycle.install()
     app.run(debug=True, port=5002)
@@ -1,7 +1,2 @@
 # models/user.py
-class User:
-    def __init__(self, name, email, password, role='User'):
-        self.name = name
-        self.email = email
-        self.password = password
-        self.role = role
+from travel_common.models.user import User  # noqa: F401
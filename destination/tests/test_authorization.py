@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import patch
+from app import app
+from services.auth_service import AuthService
+from utils.authorization import compile_policy, current_claims, is_allowed
+
+
+@pytest.fixture
+def client():
+    with app.test_client() as client:
+        yield client
+
+
+def make_token(role):
+    user = type("User", (), {"email": f"{role}@travel.com", "role": role})
+    return AuthService.generate_token(user)
+
+
+def test_compile_policy_normalizes_roles():
+    compiled = compile_policy({"Admin": ["destinations:write"]})
+    assert compiled == {"admin": frozenset({"destinations:write"})}
+
+
+@pytest.mark.parametrize("role", ["admin", "Admin", "ADMIN"])
+def test_admin_role_is_case_insensitive(role):
+    assert is_allowed({"role": role}, "destinations:write")
+    assert AuthService.check_admin_access(make_token(role))
+
+
+def test_user_role_and_missing_claims_are_denied():
+    assert not is_allowed({"role": "user"}, "destinations:write")
+    assert not is_allowed({}, "destinations:write")
+    assert not is_allowed(None, "destinations:write")
+
+
+def test_token_is_decoded_once_per_request():
+    token = make_token("admin")
+    with app.test_request_context(headers={"Authorization": token}):
+        with patch.object(AuthService, "verify_token", wraps=AuthService.verify_token) as verify:
+            assert current_claims()["role"] == "admin"
+            assert current_claims()["role"] == "admin"
+            verify.assert_called_once_with(token)
+
+
+def test_put_with_capitalized_admin_role(client):
+    response = client.put(
+        "/destinations/999999",
+        json={"name": "Nowhere", "description": "Missing", "location": "None"},
+        headers={"Authorization": make_token("Admin")},
+    )
+    assert response.status_code == 404
+
+
+def test_put_without_token_is_forbidden(client):
+    response = client.put(
+        "/destinations/1",
+        json={"name": "Nowhere", "description": "Missing", "location": "None"},
+    )
+    assert response.status_code == 403
+    assert response.json["error"] == "Admin access required"
@@ -85,3 +85,186 @@ def test_delete_destination_with_valid_token(client, mock_admin_token, preload_d
     response = client.delete(f'/destinations/{destination_id}', headers={'Authorization': f'{mock_admin_token}'})
     assert response.status_code == 200
     assert response.json['message'] == 'Destination deleted successfully'
+
+
+def test_post_destination_missing_field(client, mock_admin_token):
+    response = client.post('/destinations', json={
+        'name': 'New York',
+        'location': 'USA'
+    }, headers={'Authorization': f'{mock_admin_token}'})
+    assert response.status_code == 400
+    assert response.json['error'] == "'description' is a required field"
+
+
+def test_post_destination_body_too_large(client, mock_admin_token):
+    response = client.post('/destinations', json={
+        'name': 'New York',
+        'description': 'x' * (app.config.get('MAX_JSON_BODY_BYTES', 64 * 1024) + 1),
+        'location': 'USA'
+    }, headers={'Authorization': f'{mock_admin_token}'})
+    assert response.status_code == 413
+
+
+def test_patch_destination_ignores_unknown_fields(client, mock_admin_token, preload_destination):
+    response = client.patch(f'/destinations/{preload_destination.id}', json={
+        'id': 999,
+        'description': 'Patched'
+    }, headers={'Authorization': f'{mock_admin_token}'})
+    assert response.status_code == 200
+    assert response.json['id'] == preload_destination.id
+    assert response.json['description'] == 'Patched'
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+
+
+def test_bulk_post_destinations(client, mock_admin_token):
+    response = client.post('/destinations/bulk', json=[
+        {'name': 'Rome', 'description': 'Eternal City', 'location': 'Italy'},
+        {'name': 'Oslo', 'description': 'Fjords', 'location': 'Norway'},
+    ], headers={'Authorization': f'{mock_admin_token}'})
+    assert response.status_code == 201
+    assert [dest['name'] for dest in response.json] == ['Rome', 'Oslo']
+    for dest in response.json:
+        client.delete(f"/destinations/{dest['id']}", headers={'Authorization': f'{mock_admin_token}'})
+
+
+def test_bulk_post_rejects_invalid_item(client, mock_admin_token):
+    response = client.post('/destinations/bulk', json=[
+        {'name': 'Rome', 'description': 'Eternal City', 'location': 'Italy'},
+        {'name': 'Oslo'},
+    ], headers={'Authorization': f'{mock_admin_token}'})
+    assert response.status_code == 400
+    assert response.json['error'] == "Item 1: 'description' is a required field"
+
+
+def test_changes_long_poll(client, mock_admin_token, preload_destination):
+    response = client.get('/destinations/changes?since=0')
+    assert response.status_code == 200
+    last_seq = response.json['last_seq']
+
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+    response = client.get(f'/destinations/changes?since={last_seq}&wait=1')
+    assert response.json['reset'] is False
+    assert [(e['type'], e['id']) for e in response.json['events']] == [('deleted', preload_destination.id)]
+
+
+def test_changes_server_sent_events(client, mock_admin_token, preload_destination):
+    last_seq = client.get('/destinations/changes').json['last_seq']
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+
+    response = client.get(f'/destinations/changes?since={last_seq - 1}',
+                          headers={'Accept': 'text/event-stream'}, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.response
+    first, second = next(chunks), next(chunks)
+    response.close()
+    assert first.startswith(f'id: {last_seq}\nevent: created\n'.encode())
+    assert second.startswith(f'id: {last_seq + 1}\nevent: deleted\n'.encode())
+
+
+def test_get_destinations_since_version(client, mock_admin_token, preload_destination):
+    response = client.get('/destinations')
+    version = int(response.headers['X-Catalogue-Version'])
+
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+    response = client.get(f'/destinations?since_version={version}')
+    assert response.status_code == 200
+    assert response.json['changed'] == []
+    assert response.json['deleted'] == [preload_destination.id]
+    assert response.json['version'] == version + 1
+    assert client.get('/destinations?since_version=abc').status_code == 400
+
+
+def test_get_destination_with_etag(client, mock_admin_token, preload_destination):
+    url = f'/destinations/{preload_destination.id}'
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json['name'] == 'Preloaded'
+    assert 'max-age' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    client.patch(url, json={'description': 'Changed'}, headers={'Authorization': f'{mock_admin_token}'})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    client.delete(url, headers={'Authorization': f'{mock_admin_token}'})
+    assert client.get(url).status_code == 404
+
+
+def test_get_destinations_by_ids(client, mock_admin_token, preload_destination):
+    response = client.get(f'/destinations?ids={preload_destination.id},99999')
+    assert response.status_code == 200
+    assert [dest['id'] for dest in response.json['destinations']] == [preload_destination.id]
+    assert response.json['missing'] == [99999]
+    assert client.get('/destinations?ids=1,x').status_code == 400
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+
+
+def test_if_match_rejects_stale_updates(client, mock_admin_token, preload_destination):
+    url = f'/destinations/{preload_destination.id}'
+    auth = {'Authorization': f'{mock_admin_token}'}
+    etag = client.get(url).headers['ETag']
+
+    response = client.patch(url, json={'description': 'First'}, headers=dict(auth, **{'If-Match': etag}))
+    assert response.status_code == 200
+    new_etag = response.headers['ETag']
+
+    # A second editor still holding the old ETag must not overwrite the first edit
+    response = client.put(url, json={'name': 'Stale', 'description': 'Second', 'location': 'Nowhere'},
+                          headers=dict(auth, **{'If-Match': etag}))
+    assert response.status_code == 412
+    assert response.headers['ETag'] == new_etag
+    assert client.get(url).json['description'] == 'First'
+
+    assert client.delete(url, headers=dict(auth, **{'If-Match': etag})).status_code == 412
+    assert client.delete(url, headers=dict(auth, **{'If-Match': new_etag})).status_code == 200
+
+
+def test_get_destinations_by_location(client, mock_admin_token, preload_destination):
+    response = client.get('/destinations?location=LOCATION')
+    assert response.status_code == 200
+    assert preload_destination.id in [dest['id'] for dest in response.json]
+    response = client.get('/destinations?name_prefix=preload')
+    assert preload_destination.id in [dest['id'] for dest in response.json]
+    client.delete(f'/destinations/{preload_destination.id}', headers={'Authorization': f'{mock_admin_token}'})
+    assert client.get('/destinations?location=LOCATION').json == []
+
+
+def test_nearby_destinations(client, mock_admin_token):
+    auth = {'Authorization': f'{mock_admin_token}'}
+    created = client.post('/destinations', json={
+        'name': 'Eiffel Tower', 'description': 'Landmark', 'location': 'France',
+        'latitude': 48.8584, 'longitude': 2.2945,
+    }, headers=auth).json
+    assert created['latitude'] == 48.8584
+
+    response = client.get('/destinations/nearby?lat=48.8566&lon=2.3522&radius=10&limit=5')
+    assert response.status_code == 200
+    assert response.json[0]['id'] == created['id']
+    assert 0 < response.json[0]['distance_km'] < 10
+
+    assert client.get('/destinations/nearby?lat=48.8').status_code == 400
+    assert client.get('/destinations/nearby?lat=95&lon=0').status_code == 400
+    response = client.patch(f"/destinations/{created['id']}", json={'latitude': 'north'}, headers=auth)
+    assert response.status_code == 400
+    response = client.patch(f"/destinations/{created['id']}", json={'latitude': 100.0}, headers=auth)
+    assert response.status_code == 400
+    for blank in (None, ''):
+        response = client.patch(f"/destinations/{created['id']}", json={'name': blank}, headers=auth)
+        assert response.status_code == 400
+    assert client.get(f"/destinations/{created['id']}").json['name'] == created['name']
+    client.delete(f"/destinations/{created['id']}", headers=auth)
+
+
+def test_health_and_readiness(client):
+    from app import readiness
+
+    assert client.get("/healthz").json == {"status": "ok"}
+    assert readiness.warm_up()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json["status"] == "ready"
+    assert "catalogue" in response.json["warmup_seconds"]
@@ -1,14 +1,42 @@
-from flask import Flask, request
+from flask import Flask, Response, g, request
 from flask_restx import Api, Resource, fields
+from travel_common.config import configure_proxies, load_environment, swagger_doc_path
+from travel_common.health import register_health, warm_up_auth, warm_up_request
+from travel_common.lifecycle import register_lifecycle
+from travel_common.rate_limit import RateLimiter, create_backend
+from travel_common.request_validation import configure_body_limits, validate_body
+from travel_common.serialization import dumps, register_json_representation
 from services.user_service import UserService
-from services.auth_service import AuthService
-from dotenv import load_dotenv
+from utils.authorization import current_claims, require_auth, set_token_check
+import base64
+import binascii
 import os
 
+# Page size of /users/get-users, and the largest page a client may ask for
+USERS_PAGE_SIZE = 100
+USERS_MAX_PAGE_SIZE = 1000
+# Default and largest number of /users/search results
+SEARCH_RESULTS = 20
+SEARCH_MAX_RESULTS = 100
+
+
+def encode_cursor(key):
+    """Opaque, URL-safe form of a pagination cursor."""
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """:raises ValueError: If the cursor was not produced by encode_cursor()"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
 
 def create_app(config=None):
-    # Load environment variables from .env file
-    load_dotenv()
+    # Load environment variables from .env file (only read once per process)
+    load_environment()
 
     app = Flask(__name__)
 
@@ -18,19 +46,38 @@ def create_app(config=None):
         JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "default_jwt_secret"),
         ADMIN_SECRET=123,
         # os.getenv("ADMIN_SECRET", "default_admin_secret")
+        # Login attempts allowed per client IP and per email ("<requests>/<seconds>")
+        LOGIN_RATE_LIMIT_IP=os.getenv("LOGIN_RATE_LIMIT_IP", "30/60"),
+        LOGIN_RATE_LIMIT_EMAIL=os.getenv("LOGIN_RATE_LIMIT_EMAIL", "5/60"),
+        # "memory" (per process) or a redis:// URL shared by all workers
+        RATE_LIMIT_BACKEND=os.getenv("RATE_LIMIT_BACKEND", "memory"),
     )
 
     # Apply custom configuration if provided
     if config:
         app.config.from_object(config)
 
+    # Client addresses from X-Forwarded-For when behind the gateway (TRUSTED_PROXIES),
+    # so the per-IP login limit counts each client rather than the gateway
+    configure_proxies(app)
+
+    # Body size limits (MAX_CONTENT_LENGTH, MAX_JSON_BODY_BYTES) checked before parsing
+    configure_body_limits(app)
+
+    # Login rate limiting runs before any bcrypt work is done
+    login_limiter = RateLimiter(
+        {"ip": app.config["LOGIN_RATE_LIMIT_IP"], "email": app.config["LOGIN_RATE_LIMIT_EMAIL"]},
+        backend=create_backend(app.config["RATE_LIMIT_BACKEND"]),
+    )
+    app.extensions["login_limiter"] = login_limiter
+
     # Initialize Flask-RESTX API with Swagger UI enabled
     api = Api(
         app,
         version="1.0",
         title="Users Service",
         description="Travel API Microservices",
-        doc="/swagger",  # Custom Swagger UI endpoint
+        doc=swagger_doc_path("/swagger"),  # Custom Swagger UI endpoint (TRAVEL_SWAGGER_DOCS=0 disables)
         security="BearerAuth",  # Add security definitions
     )
 
@@ -44,8 +91,13 @@ def create_app(config=None):
         }
     }
 
+    # Encode responses with the fastest available JSON backend
+    register_json_representation(api)
+
     # Initialize services
     user_service = UserService()
+    # Tokens of deleted users, or issued before a password change, are rejected
+    set_token_check(app, user_service.token_is_current)
 
     # Namespace definitions for user and destination endpoints
     user_ns = api.namespace("users", description="")
@@ -73,16 +125,11 @@ def create_app(config=None):
     @user_ns.route("/register")
     class UserRegistration(Resource):
         @api.expect(user_model)
+        @validate_body(user_model)
         def post(self):
             """Register a new user or admin"""
             try:
-                data = request.json
-
-                required_fields = ["name", "email", "password", "role"]
-                for field in required_fields:
-                    if not data.get(field):
-                        return {"error": f"'{field}' is a required field"}, 400
-
+                data = g.payload
                 role = data.get("role", "user")
 
                 if role not in ["user", "admin"]:
@@ -90,7 +137,8 @@ def create_app(config=None):
 
                 if role == "admin":
                     admin_token = data.get("admin_token")
-                    if not admin_token or admin_token != app.config["ADMIN_SECRET"]:
+                    # The secret may be configured as a number; the token is always a string
+                    if not admin_token or admin_token != str(app.config["ADMIN_SECRET"]):
                         return {"error": "Invalid admin token"}, 403
 
                 user = user_service.register_user(
@@ -105,80 +153,209 @@ def create_app(config=None):
     @user_ns.route("/login")
     class UserLogin(Resource):
         @api.expect(login_model)
+        @validate_body(login_model)
         def post(self):
             """Authenticate user and get token"""
             try:
-                data = request.json
+                data = g.payload
+                limited = login_limiter.check(
+                    ip=request.remote_addr, email=data["email"].strip().lower()
+                )
+                if limited:
+                    return (
+                        {"error": "Too many login attempts, try again later"},
+                        429,
+                        {"Retry-After": str(limited.retry_after)},
+                    )
+
                 token = user_service.login_user(data["email"], data["password"])
                 return {"token": token}, 200
             except ValueError as e:
                 return {"error": str(e)}, 401
 
+    @user_ns.route("/login/stats")
+    class LoginStats(Resource):
+        @api.doc(security="BearerAuth")
+        @require_auth(
+            "users:read",
+            missing=("Authorization token required (format:<token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        def get(self):
+            """Login rate limiting and unknown-user timing counters (Admin only)"""
+            return dict(login_limiter.stats(), unknown_user_guard=user_service.login_guard.stats()), 200
+
+    profile_model = api.model(
+        "ProfileUpdate",
+        {
+            "name": fields.String(required=False, description="Full Name"),
+        },
+    )
+
+    password_model = api.model(
+        "PasswordChange",
+        {
+            "current_password": fields.String(required=True, description="Current Password"),
+            "new_password": fields.String(required=True, description="New Password"),
+        },
+    )
+
     @user_ns.route("/profile")
     class UserProfile(Resource):
+        @require_auth(
+            missing=("Authorization token required (format: <token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
         def get(self):
             """Get user profile"""
-            token = request.headers.get("Authorization")
-            if not token:
-                return {"error": "Authorization token required (format: <token>)"}, 401
-
             try:
-                payload = AuthService.verify_token(token)
-                if not payload:
-                    return {"error": "Invalid or expired token"}, 401
-
-                email = payload.get("email")
+                email = current_claims().get("email")
                 if not email:
                     return {"error": "Email missing in token payload"}, 401
 
-                profile = user_service.get_user_profile(email)
-                return profile, 200
+                # Cached, already encoded bytes: no dict building or JSON encoding per request
+                return Response(user_service.get_profile_json(email), mimetype="application/json")
             except ValueError as e:
                 return {"error": str(e)}, 404
             except Exception as e:
                 print("Unexpected error in /profile:", e)
                 return {"error": "Internal Server Error"}, 500
 
+        @api.expect(profile_model)
+        @require_auth(
+            missing=("Authorization token required (format: <token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        @validate_body(profile_model, partial=True)
+        def patch(self):
+            """Update the caller's profile"""
+            try:
+                return user_service.update_profile(current_claims()["email"], **g.payload), 200
+            except ValueError as e:
+                return {"error": str(e)}, 404 if str(e) == "User not found" else 400
+
+        @require_auth(
+            missing=("Authorization token required (format: <token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        def delete(self):
+            """Delete the caller's account"""
+            try:
+                user_service.delete_user(current_claims()["email"])
+                return {"message": "Account deleted successfully"}, 200
+            except ValueError as e:
+                return {"error": str(e)}, 404
+
+    @user_ns.route("/change-password")
+    class ChangePassword(Resource):
+        @api.expect(password_model)
+        @require_auth(
+            missing=("Authorization token required (format: <token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        @validate_body(password_model)
+        def post(self):
+            """Change the caller's password; tokens issued before stop working"""
+            data = g.payload
+            try:
+                token = user_service.change_password(
+                    current_claims()["email"], data["current_password"], data["new_password"]
+                )
+            except ValueError as e:
+                message = str(e)
+                status = {"User not found": 404, "Invalid password": 403}.get(message, 400)
+                return {"error": message}, status
+            return {"message": "Password changed successfully", "token": token}, 200
+
     @user_ns.route("/get-users")
     class GetUsers(Resource):
         @api.doc(security="BearerAuth")
+        @require_auth(
+            "users:read",
+            missing=("Authorization token required (format:<token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        @api.doc(params={
+            "role": "Role to list (default 'user')",
+            "limit": f"Page size (default {USERS_PAGE_SIZE}, max {USERS_MAX_PAGE_SIZE})",
+            "cursor": "next_cursor from the previous page",
+            "email_prefix": "Only emails starting with this (case-insensitive)",
+            "name_prefix": "Only names starting with this (case-insensitive)",
+            "format": "'ndjson' streams every matching user, one JSON object per line",
+        })
         def get(self):
-            """Get all users with the role 'user' (Admin only)"""
-            token = request.headers.get("Authorization")
-            if not token:
-                return {"error": "Authorization token required (format:<token>)"}, 401
+            """Get the users of a role (default 'user'), a page at a time (Admin only)"""
+            args = request.args
+            role = args.get("role", "user")
+            email_prefix, name_prefix = args.get("email_prefix"), args.get("name_prefix")
+
+            if args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+                users = user_service.iter_users(role, email_prefix, name_prefix)
+                lines = (dumps({"email": user.email, "name": user.name}) + b"\n" for user in users)
+                return Response(lines, mimetype="application/x-ndjson")
 
             try:
-                payload = AuthService.verify_token(token)
-                if not payload:
-                    return {"error": "Invalid or expired token"}, 401
-
-                if payload.get("role") != "admin":
-                    return {"error": "Admin access required"}, 403
-
-                users_data = user_service.users
-                # print(users_data)
-                users = [
-                    {"email": email, "name": user.name}
-                    for email, user in users_data.items()
-                    if user.role == "user"
-                ]
-                print(users)
-
-                return {"users": users}, 200
-            except ValueError as e:
-                return {"error": str(e)}, 404
-            except Exception as e:
-                print("Unexpected error in /get-users:", e)
-                return {"error": "Internal Server Error", "details": str(e)}, 500
+                limit = int(args.get("limit", USERS_PAGE_SIZE))
+                after = decode_cursor(args["cursor"]) if args.get("cursor") else None
+            except ValueError:
+                return {"error": "'limit' must be an integer and 'cursor' a value returned by this endpoint"}, 400
+            if not 0 < limit <= USERS_MAX_PAGE_SIZE:
+                return {"error": f"'limit' must be between 1 and {USERS_MAX_PAGE_SIZE}"}, 400
+
+            users, next_key = user_service.list_users(role, after, limit, email_prefix, name_prefix)
+            return {
+                "users": [{"email": user.email, "name": user.name} for user in users],
+                "next_cursor": encode_cursor(next_key) if next_key is not None else None,
+            }, 200
+
+    @user_ns.route("/search")
+    class SearchUsers(Resource):
+        @api.doc(security="BearerAuth")
+        @require_auth(
+            "users:read",
+            missing=("Authorization token required (format:<token>)", 401),
+            invalid=("Invalid or expired token", 401),
+        )
+        @api.doc(params={
+            "prefix": "Start of the email address (case-insensitive)",
+            "limit": f"Maximum number of results (default {SEARCH_RESULTS}, max {SEARCH_MAX_RESULTS})",
+        })
+        def get(self):
+            """Find users of any role by email prefix, for autocomplete (Admin only)"""
+            prefix = request.args.get("prefix", "").strip()
+            if not prefix:
+                return {"error": "'prefix' is required"}, 400
+            try:
+                limit = int(request.args.get("limit", SEARCH_RESULTS))
+            except ValueError:
+                return {"error": "'limit' must be an integer"}, 400
+            if not 0 < limit <= SEARCH_MAX_RESULTS:
+                return {"error": f"'limit' must be between 1 and {SEARCH_MAX_RESULTS}"}, 400
+
+            users = user_service.search_users(prefix, limit)
+            return {"users": [{"email": user.email, "name": user.name, "role": user.role} for user in users]}, 200
 
     api.add_namespace(user_ns)
 
+    # /healthz and /readyz; ready once the service is warmed up
+    readiness = register_health(app)
+    readiness.add_step("stores", lambda: len(user_service.users))
+    readiness.add_step("indexes", lambda: user_service.indexes)
+    readiness.add_step("profile_cache", user_service.prime_profile_cache)
+    readiness.add_step("auth", warm_up_auth)
+    readiness.add_step("request", warm_up_request(app, "/swagger.json"))
+
+    # On SIGTERM: drain requests, then fold the journal into users.json
+    lifecycle = register_lifecycle(app)
+    lifecycle.add_flush("users", user_service.flush)
+
     return app
 
 
 if __name__ == "__main__":
     app = create_app()
+    app.extensions["readiness"].start()
+    app.extensions["lifecycle"].install()
 
     try:
         if not app.config["TESTING"]:
@@ -1,8 +1,2 @@
 # models/destination.py
-class Destination:
-    def __init__(self, id, name, description, location):
-        self.id = id
-        self.name = name
-        self.description = description
-        self.location = location
-        
\ No newline at end of file
+from travel_common.models.destination import Destination  # noqa: F401
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from app import create_app
 from tests.test_config import TestConfig
 from services.user_service import UserService
+import json
 import time
 
 
@@ -103,7 +104,7 @@ def test_login_invalid_password(client):
     print("Response status code:", response.status_code)
     print("Response data:", response.json)
     assert response.status_code == 401
-    assert response.json["error"] == "Invalid password"
+    assert response.json["error"] == "Invalid email or password"
 
 
 def test_register_missing_fields(client):
@@ -144,13 +145,32 @@ def test_register_admin_with_invalid_token(client):
     assert response.json["error"] == "Invalid admin token"
 
 
+def test_register_admin_with_the_default_secret():
+    app = create_app()
+    with patch.object(UserService, "_load_users_from_file", return_value={}), \
+         patch.object(UserService, "_save_users_to_file"):
+        UserService().users = {}
+        response = app.test_client().post(
+            "/users/register",
+            json={
+                "name": "Admin User",
+                "email": "defaultadmin@example.com",
+                "password": "AdminPass123",
+                "role": "admin",
+                "admin_token": str(app.config["ADMIN_SECRET"]),
+            },
+        )
+    assert response.status_code == 201
+    assert response.json["message"] == "Admin registered successfully"
+
+
 def test_login_nonexistent_user(client):
     response = client.post(
         "/users/login",
         json={"email": "nonexistent@example.com", "password": "Password123"},
     )
     assert response.status_code == 401
-    assert response.json["error"] == "User not found"
+    assert response.json["error"] == "Invalid email or password"
 
 
 def test_login_wrong_password(client):
@@ -169,7 +189,7 @@ def test_login_wrong_password(client):
         json={"email": email, "password": "WrongPass"},
     )
     assert response.status_code == 401
-    assert response.json["error"] == "Invalid password"
+    assert response.json["error"] == "Invalid email or password"
 
 
 def test_profile_no_token(client):
@@ -183,4 +203,179 @@ def test_profile_invalid_token(client):
         "/users/profile", headers={"Authorization": "Bearer invalid_token"}
     )
     assert response.status_code == 401
-    assert response.json["error"] == "Invalid or expired token"
\ No newline at end of file
+    assert response.json["error"] == "Invalid or expired token"
+
+
+class RateLimitedConfig(TestConfig):
+    LOGIN_RATE_LIMIT_EMAIL = "2/60"
+
+
+def test_login_rate_limited_before_password_check():
+    app = create_app(RateLimitedConfig)
+    with patch.object(UserService, "_load_users_from_file", return_value={}), \
+         patch.object(UserService, "login_user", side_effect=ValueError("Invalid password")) as login:
+        client = app.test_client()
+        statuses = [
+            client.post("/users/login", json={"email": "Victim@example.com", "password": "x"}).status_code
+            for _ in range(3)
+        ]
+        response = client.post("/users/login", json={"email": "victim@example.com", "password": "x"})
+
+    assert statuses == [401, 401, 429]
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert login.call_count == 2
+    assert app.extensions["login_limiter"].stats()["rejected_by_rule"] == {"email": 2}
+
+
+class GatewayConfig(TestConfig):
+    LOGIN_RATE_LIMIT_IP = "2/60"
+    TRUSTED_PROXIES = 1  # the gateway
+
+
+def test_login_ip_limit_counts_clients_behind_the_gateway():
+    from travel_common.gateway import create_gateway
+
+    app = create_app(GatewayConfig)
+    gateway = create_gateway([("/users", app, False)]).test_client()
+    with patch.object(UserService, "_load_users_from_file", return_value={}), \
+         patch.object(UserService, "login_user", side_effect=ValueError("Invalid email or password")):
+        def login(ip, n, **headers):
+            return gateway.post("/users/login", json={"email": f"user{n}@example.com", "password": "x"},
+                                headers=headers, environ_base={"REMOTE_ADDR": ip}).status_code
+
+        # Spoofed X-Forwarded-For values are replaced by the gateway
+        first = [login("10.0.0.1", n, **{"X-Forwarded-For": f"192.0.2.{n}"}) for n in range(3)]
+        second = [login("10.0.0.2", n) for n in range(2)]
+
+    assert first == [401, 401, 429]
+    assert second == [401, 401]
+
+
+def test_get_users_paginated_and_ndjson(client):
+    client.post(
+        "/users/register",
+        json={"name": "Admin", "email": "pager-admin@example.com", "password": "AdminPass123",
+              "role": "admin", "admin_token": "test_admin_secret"},
+    )
+    for n in range(3):
+        client.post(
+            "/users/register",
+            json={"name": f"Pager {n}", "email": f"pager{n}@example.com", "password": "TestPass123",
+                  "role": "user"},
+        )
+    token = client.post(
+        "/users/login", json={"email": "pager-admin@example.com", "password": "AdminPass123"}
+    ).json["token"]
+    headers = {"Authorization": token}
+
+    first = client.get("/users/get-users?email_prefix=pager&limit=2", headers=headers)
+    assert first.status_code == 200
+    assert [u["email"] for u in first.json["users"]] == ["pager0@example.com", "pager1@example.com"]
+    second = client.get(
+        f"/users/get-users?email_prefix=pager&limit=2&cursor={first.json['next_cursor']}", headers=headers
+    )
+    assert second.json == {"users": [{"email": "pager2@example.com", "name": "Pager 2"}], "next_cursor": None}
+
+    assert client.get("/users/get-users?limit=0", headers=headers).status_code == 400
+    assert client.get("/users/get-users?cursor=***", headers=headers).status_code == 400
+
+    export = client.get("/users/get-users?name_prefix=pager", headers=dict(headers, Accept="application/x-ndjson"))
+    assert export.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in export.data.splitlines()]
+    assert [line["name"] for line in lines] == ["Pager 0", "Pager 1", "Pager 2"]
+
+
+def test_search_users_by_email_prefix(client):
+    client.post(
+        "/users/register",
+        json={"name": "Admin", "email": "search-admin@example.com", "password": "AdminPass123",
+              "role": "admin", "admin_token": "test_admin_secret"},
+    )
+    client.post(
+        "/users/register",
+        json={"name": "Sam", "email": "Search-Sam@example.com", "password": "TestPass123", "role": "user"},
+    )
+    token = client.post(
+        "/users/login", json={"email": "SEARCH-ADMIN@example.com", "password": "AdminPass123"}
+    ).json["token"]
+    headers = {"Authorization": token}
+
+    response = client.get("/users/search?prefix=SEARCH-&limit=5", headers=headers)
+    assert response.status_code == 200
+    assert [u["email"] for u in response.json["users"]] == ["search-admin@example.com", "Search-Sam@example.com"]
+    assert client.get("/users/search?prefix=search&limit=1", headers=headers).json["users"][0]["role"] == "admin"
+    assert client.get("/users/search", headers=headers).status_code == 400
+    assert client.get("/users/search?prefix=s&limit=500", headers=headers).status_code == 400
+
+
+def test_profile_served_from_cache(client):
+    client.post(
+        "/users/register",
+        json={"name": "Cached", "email": "cached@example.com", "password": "TestPass123", "role": "user"},
+    )
+    token = client.post("/users/login", json={"email": "cached@example.com", "password": "TestPass123"}).json["token"]
+
+    first = client.get("/users/profile", headers={"Authorization": token})
+    second = client.get("/users/profile", headers={"Authorization": token})
+    assert first.status_code == 200 and first.mimetype == "application/json"
+    assert first.json == {"name": "Cached", "email": "cached@example.com", "role": "user"}
+    assert second.data == first.data
+
+
+def test_update_profile_change_password_and_delete_account(client):
+    client.post(
+        "/users/register",
+        json={"name": "Mutable", "email": "mutable@example.com", "password": "TestPass123", "role": "user"},
+    )
+    old_token = client.post(
+        "/users/login", json={"email": "mutable@example.com", "password": "TestPass123"}
+    ).json["token"]
+
+    response = client.patch("/users/profile", json={"name": "Renamed"}, headers={"Authorization": old_token})
+    assert response.status_code == 200 and response.json["name"] == "Renamed"
+    assert client.get("/users/profile", headers={"Authorization": old_token}).json["name"] == "Renamed"
+
+    response = client.post(
+        "/users/change-password",
+        json={"current_password": "Wrong1234", "new_password": "NewPass1234"},
+        headers={"Authorization": old_token},
+    )
+    assert response.status_code == 403
+    response = client.post(
+        "/users/change-password",
+        json={"current_password": "TestPass123", "new_password": "NewPass1234"},
+        headers={"Authorization": old_token},
+    )
+    assert response.status_code == 200
+    new_token = response.json["token"]
+    assert client.get("/users/profile", headers={"Authorization": old_token}).status_code == 401
+
+    assert client.delete("/users/profile", headers={"Authorization": new_token}).status_code == 200
+    assert client.get("/users/profile", headers={"Authorization": new_token}).status_code == 401
+
+
+def test_health_and_readiness():
+    app = create_app(TestConfig)
+    with patch.object(UserService, "_load_users_from_file", return_value={}):
+        client = app.test_client()
+        assert client.get("/healthz").status_code == 200
+
+        readiness = app.extensions["readiness"]
+        assert readiness.warm_up()
+        response = client.get("/readyz")
+    assert response.status_code == 200
+    assert set(response.json["warmup_seconds"]) == {"stores", "indexes", "profile_cache", "auth", "request"}
+
+
+def test_shutdown_drains_and_flushes():
+    app = create_app(TestConfig)
+    lifecycle = app.extensions["lifecycle"]
+    assert [name for name, _ in lifecycle.flush_steps] == ["users"]
+    with patch.object(UserService, "_save_users_to_file"):
+        assert lifecycle.shutdown(timeout=1)
+
+    client = app.test_client()
+    response = client.post("/users/login", json={"email": "a@example.com", "password": "Password123"})
+    assert response.status_code == 503
+    assert client.get("/readyz").json == {"status": "draining"}
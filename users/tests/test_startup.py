@@ -0,0 +1,19 @@
+import os
+import pytest
+from travel_common.startup import DEFAULT_BUDGET_SECONDS, profile_startup
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return profile_startup("import app; app.create_app()", cwd=SERVICE_DIR)
+
+
+def test_cold_start_within_budget(profile):
+    assert profile.wall_seconds < DEFAULT_BUDGET_SECONDS, profile.report()
+
+
+def test_heavy_dependencies_are_lazy(profile):
+    assert "jwt.api_jwt" not in profile.modules
+    assert "bcrypt._bcrypt" not in profile.modules
@@ -39,10 +39,10 @@ def test_login_user(user_service):
 
 def test_login_invalid_password(user_service):
     user_service.register_user("John Doe", "john@example.com", "Password123", "user")
-    with pytest.raises(ValueError, match="Invalid password"):
+    with pytest.raises(ValueError, match="Invalid email or password"):
         user_service.login_user("john@example.com", "WrongPass")
 
 
 def test_login_nonexistent_user(user_service):
-    with pytest.raises(ValueError, match="User not found"):
+    with pytest.raises(ValueError, match="Invalid email or password"):
         user_service.login_user("nonexistent@example.com", "Password123")